@@ -0,0 +1,158 @@
+import argparse
+import struct
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from IO.matrix_reader import iter_matrices
+
+# Binary matrix file layout (all values are little-endian):
+#   magic (4 bytes) "DETM", format version (uint8), dtype code (uint8), 2 reserved bytes,
+#   order of matrices (uint32), number of matrices (uint64), 12 bytes of padding,
+# followed by the elements of all matrices, one matrix after another, row by row.
+MAGIC = b"DETM"
+FORMAT_VERSION = 1
+FLOAT64_DTYPE = 1
+HEADER_FORMAT = "<4sBBHIQ12x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+class Binary_matrix_header:
+    """
+    Header of a binary matrix file.
+
+    Attributes:
+        order (int): order of all matrices in the file
+        count (int): number of matrices in the file
+        dtype (int): code of the type of elements, only float64 is supported
+    """
+
+    def __init__(self, order, count, dtype=FLOAT64_DTYPE):
+        self.order = order
+        self.count = count
+        self.dtype = dtype
+
+    def pack(self):
+        return struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, self.dtype, 0, self.order, self.count)
+
+def read_header(matrix_file_path):
+    """
+    Reads and validates the header of a binary matrix file.
+
+    Args:
+        matrix_file_path(string): path of the binary matrix file
+
+    Return:
+        header of the file (Binary_matrix_header)
+    """
+    with open(matrix_file_path, 'rb') as in_file:
+        header = in_file.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE or header[:len(MAGIC)] != MAGIC:
+        raise Exception("File {} is not a binary matrix file.".format(matrix_file_path))
+
+    _, version, dtype, _, order, count = struct.unpack(HEADER_FORMAT, header)
+    if version != FORMAT_VERSION:
+        raise Exception("Unsupported binary matrix format version {}, expected {}.".format(version, FORMAT_VERSION))
+    if dtype != FLOAT64_DTYPE:
+        raise Exception("Unsupported type of matrix elements: {}.".format(dtype))
+    return Binary_matrix_header(order, count, dtype)
+
+def is_binary_matrix_file(matrix_file_path):
+    """
+    Checks whether the given file is a binary matrix file, by reading its first bytes.
+
+    Args:
+        matrix_file_path(string): path of the file
+
+    Return:
+        True if the file starts with binary matrix header, False otherwise (bool)
+    """
+    with open(matrix_file_path, 'rb') as in_file:
+        return in_file.read(len(MAGIC)) == MAGIC
+
+def float64_bytes(row):
+    row_values = array('d', [float(el) for el in row])
+    if sys.byteorder != "little":
+        row_values.byteswap()
+    return row_values.tobytes()
+
+def write_binary_matrices(matrix_file_path, matrices):
+    """
+    Writes matrices of the same order into a binary matrix file: a small header with the order,
+    type of elements and number of matrices, followed by raw row-major float64 elements. Matrices
+    are written one by one, so they can be produced by a generator.
+
+    Args:
+        matrix_file_path(string): path of the binary matrix file to be created
+        matrices(iterable(list(list(float))|numpy.ndarray)): matrices to be written
+
+    Return:
+        number of written matrices (int)
+    """
+    order = None
+    count = 0
+    with open(matrix_file_path, 'wb') as out_file:
+        # header is written again when the number of matrices is known
+        out_file.write(Binary_matrix_header(0, 0).pack())
+        for matrix in matrices:
+            if order is None:
+                order = len(matrix)
+            elif len(matrix) != order:
+                raise Exception("All matrices in a binary file must have the same order. Found matrix of order {}, "
+                                "expected {}.".format(len(matrix), order))
+            for row in matrix:
+                if len(row) != order:
+                    raise Exception("Sqared matrix is required. Found {} columns, expected {}."
+                                    .format(len(row), order))
+                out_file.write(float64_bytes(row))
+            count += 1
+
+        out_file.seek(0)
+        out_file.write(Binary_matrix_header(order or 0, count).pack())
+
+    return count
+
+def load_binary_matrices(matrix_file_path):
+    """
+    Memory-maps a binary matrix file. Matrices are not read into memory, the returned array is
+    a view of the file and elements are loaded by the operating system when they are accessed.
+    Each matrix (array[i]) is a zero-copy view which can be given to determinant calculations.
+
+    Args:
+        matrix_file_path(string): path of the binary matrix file
+
+    Return:
+        read-only array of shape (count, n, n) backed by the file (numpy.memmap)
+    """
+    if np is None:
+        raise Exception("NumPy is required to load binary matrix files.")
+    header = read_header(matrix_file_path)
+    shape = (header.count, header.order, header.order)
+    if header.count == 0:
+        return np.empty(shape)
+    return np.memmap(matrix_file_path, dtype='<f8', mode='r', offset=HEADER_SIZE, shape=shape)
+
+def convert_text_to_binary(text_file_path, binary_file_path):
+    """
+    Converts a text matrix file (one or several matrices, see matrix_reader.iter_matrices)
+    into a binary matrix file. Matrices are converted one by one.
+
+    Args:
+        text_file_path(string): path of the text matrix file
+        binary_file_path(string): path of the binary matrix file to be created
+
+    Return:
+        number of converted matrices (int)
+    """
+    return write_binary_matrices(binary_file_path, iter_matrices(text_file_path))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts text matrix files into binary matrix files.")
+    parser.add_argument("text_file", help="path of the text file containing one or more matrices")
+    parser.add_argument("binary_file", help="path of the binary file to be created")
+    arguments = parser.parse_args()
+    matrices_num = convert_text_to_binary(arguments.text_file, arguments.binary_file)
+    print("Converted {} matrices from {} into {}.".format(matrices_num, arguments.text_file, arguments.binary_file))
@@ -1,5 +1,10 @@
 import re
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def read_matrix(matrix_file_path):
     """
     Loads and returns a regular matrix from given text file. The file must follow the convention:
@@ -27,7 +32,112 @@ def read_matrix(matrix_file_path):
 
     return matrix
 
+def parse_rows(rows, n):
+    """
+    Parses the given rows of a matrix one by one, exactly as read_matrix does, so invalid rows
+    are reported with the same errors.
+
+    Args:
+        rows(list(string)): rows of the matrix, as read from the file
+        n(int): order of the matrix
+
+    Return:
+        parsed matrix (list(list(float))
+    """
+    matrix = []
+    for row_idx, row in enumerate(rows):
+        row_cols = [float(num) for num in re.split(' +', row.strip())]
+        if len(row_cols) != n:
+            raise Exception("Sqared matrix is required. Found {} columns in row {}, expected {}."
+                            .format(len(row_cols), row_idx + 1, n))
+        matrix.append(row_cols)
+    return matrix
+
+def parse_matrix_rows(rows, n, as_array=False):
+    """
+    Converts the rows of a matrix, as read from the file, into a matrix. If NumPy is available,
+    all rows are parsed at once by NumPy, otherwise they are parsed row by row. Rows are validated
+    in the same way as in read_matrix.
+
+    Args:
+        rows(list(string)): rows of the matrix, as read from the file
+        n(int): order of the matrix
+        as_array(bool): if true, the matrix is returned as contiguous float64 NumPy array
+
+    Return:
+        parsed matrix (list(list(float))|numpy.ndarray)
+    """
+    if len(rows) < n:
+        raise Exception("Matrix has {} rows, expected {}.".format(len(rows), n))
+
+    if np is None:
+        if as_array:
+            raise Exception("NumPy is required to load a matrix as an array.")
+        return parse_rows(rows, n)
+
+    if n == 0:
+        matrix = np.empty((0, 0))
+    else:
+        try:
+            # read_matrix has no comments, so "#" is parsed (and rejected) like any other text
+            matrix = np.loadtxt(rows, dtype=np.float64, ndmin=2, comments=None)
+        except ValueError:
+            matrix = None
+        if matrix is None or matrix.shape != (n, n):
+            # report invalid rows the same way as read_matrix
+            parse_rows(rows, n)
+            raise Exception("Sqared matrix is required. Found matrix of shape {}, expected ({}, {})."
+                            .format(None if matrix is None else matrix.shape, n, n))
+
+    return matrix if as_array else matrix.tolist()
+
+def read_matrix_fast(matrix_file_path, as_array=False):
+    """
+    Loads a regular matrix from given text file, in the same format as read_matrix. The whole file
+    is read at once and all numbers are parsed in bulk (see parse_matrix_rows), which is much faster
+    than read_matrix for large matrices.
+
+    Args:
+        matrix_file_path(string): path of the file containing the matrix
+        as_array(bool): if true, the matrix is returned as contiguous float64 NumPy array
+
+    Return:
+        matrix loaded into memory and ready for use (list(list(float))|numpy.ndarray)
+    """
+    with open(matrix_file_path, 'r') as in_file:
+        lines = in_file.read().splitlines()
+
+    n = int(lines[0])
+    return parse_matrix_rows(lines[1:n + 1], n, as_array)
+
+def iter_matrices(matrix_file_path, as_array=False):
+    """
+    Loads matrices one by one from a text file which contains several matrices, one after another.
+    Each matrix is in the same format as in read_matrix: a row with its order (n) followed by n rows
+    with its elements. Empty rows between matrices are ignored. Only one matrix at a time is kept
+    in memory, so arbitrarily large files can be processed.
+
+    Args:
+        matrix_file_path(string): path of the file containing the matrices
+        as_array(bool): if true, matrices are returned as contiguous float64 NumPy arrays
+
+    Return:
+        generator of loaded matrices (generator(list(list(float))|numpy.ndarray))
+    """
+    with open(matrix_file_path, 'r') as in_file:
+        for line in in_file:
+            if not line.strip():
+                continue
+            n = int(line)
+            rows = []
+            for _ in range(n):
+                row = in_file.readline()
+                if not row:
+                    break
+                rows.append(row.strip())
+            yield parse_matrix_rows(rows, n, as_array)
+
 if __name__ == "__main__":
     test_matrix = read_matrix("../../Test data/matrica9x9.txt")
     assert len(test_matrix) == 9
-    assert test_matrix[3][2] == -24.9
\ No newline at end of file
+    assert test_matrix[3][2] == -24.9
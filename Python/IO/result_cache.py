@@ -0,0 +1,155 @@
+import hashlib
+import sqlite3
+import struct
+import time
+from fractions import Fraction
+from numbers import Integral
+
+from IO.binary_matrix import float64_bytes
+
+DEFAULT_MAX_ENTRIES = 10000
+# time in seconds to wait for other processes holding the cache database locked
+LOCK_TIMEOUT_S = 30.0
+
+class Cached_result:
+    """
+    Determinant calculation stored in the result cache.
+
+    Attributes:
+        determinant (float|int|Fraction): value of the determinant
+        exec_time_ms (float): duration of the original calculation in milliseconds
+        created (float): time when the result was stored (seconds since epoch)
+    """
+
+    def __init__(self, determinant, exec_time_ms, created):
+        self.determinant = determinant
+        self.exec_time_ms = exec_time_ms
+        self.created = created
+
+def matrix_key(matrix, engine):
+    """
+    Calculates the key of a determinant calculation: hash of the matrix contents (as float64 values)
+    together with the description of the engine used for calculation. Matrices with int or Fraction
+    elements are hashed by the type and exact value of each element, since different exact matrices
+    may have the same float64 values (e.g. 10**17 and 10**17 + 1) and their determinants are exact.
+
+    Args:
+        matrix (list(list(float))|numpy.ndarray): matrix for which the determinant is calculated
+        engine (string): description of implementation and method used for calculation, e.g. serial/laplace
+
+    Return:
+        hexadecimal key (string)
+    """
+    digest = hashlib.sha256()
+    digest.update(engine.encode("utf-8"))
+    digest.update(struct.pack("<Q", len(matrix)))
+    if any(isinstance(el, (Integral, Fraction)) for row in matrix for el in row):
+        digest.update(b"exact")
+        for row in matrix:
+            digest.update(";".join("{}:{}".format(type(el).__name__, el) for el in row).encode("utf-8"))
+            digest.update(b"\n")
+    else:
+        for row in matrix:
+            digest.update(float64_bytes(row))
+    return digest.hexdigest()
+
+def determinant_to_text(determinant):
+    if isinstance(determinant, Fraction):
+        return "fraction", str(determinant)
+    if isinstance(determinant, int):
+        return "int", str(determinant)
+    return "float", repr(float(determinant))
+
+def determinant_from_text(kind, text):
+    if kind == "fraction":
+        return Fraction(text)
+    if kind == "int":
+        return int(text)
+    return float(text)
+
+class Result_cache:
+    """
+    Persistent cache of determinant calculations, stored in a SQLite database file. Results are
+    identified by a hash of the matrix contents and the engine used for calculation (see matrix_key).
+    The cache holds at most max_entries results, when it is full the least recently used results are
+    evicted. SQLite locking makes it safe to use the same cache file from several processes at once.
+
+    Attributes:
+        path (string): path of the cache database file
+        max_entries (int): maximum number of stored results
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise Exception("Cache size must be positive, got {}.".format(max_entries))
+        self.path = path
+        self.max_entries = max_entries
+        # transactions are controlled explicitly
+        self._connection = sqlite3.connect(path, timeout=LOCK_TIMEOUT_S, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS results ("
+                                 "key TEXT PRIMARY KEY, "
+                                 "determinant_kind TEXT NOT NULL, "
+                                 "determinant TEXT NOT NULL, "
+                                 "exec_time_ms REAL NOT NULL, "
+                                 "created REAL NOT NULL, "
+                                 "last_access REAL NOT NULL)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+
+    def get(self, key):
+        """
+        Returns the result stored under given key and marks it as recently used.
+
+        Args:
+            key (string): key of the calculation (see matrix_key)
+
+        Return:
+            stored result, or None if there is no result for the key (Cached_result)
+        """
+        row = self._connection.execute("SELECT determinant_kind, determinant, exec_time_ms, created "
+                                       "FROM results WHERE key = ?", (key, )).fetchone()
+        if row is None:
+            return None
+        self._connection.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        kind, determinant, exec_time_ms, created = row
+        return Cached_result(determinant_from_text(kind, determinant), exec_time_ms, created)
+
+    def put(self, key, determinant, exec_time_ms):
+        """
+        Stores the result of a calculation and evicts the least recently used results if the cache is full.
+
+        Args:
+            key (string): key of the calculation (see matrix_key)
+            determinant (float|int|Fraction): value of the determinant
+            exec_time_ms (float): duration of the calculation in milliseconds
+
+        Return:
+            None
+        """
+        kind, text = determinant_to_text(determinant)
+        now = time.time()
+        connection = self._connection
+        # write lock is taken immediately, so that concurrent processes can not evict the same results
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                               (key, kind, text, exec_time_ms, now, now))
+            connection.execute("DELETE FROM results WHERE key IN (SELECT key FROM results "
+                               "ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (self.max_entries, ))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
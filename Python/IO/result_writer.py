@@ -1,5 +1,8 @@
 import os
 
+LEGACY_RESULTS_HEADER = "n,exec_time_ms,serial,implementation"
+RESULTS_HEADER = LEGACY_RESULTS_HEADER + ",cached"
+
 class ExecutionResults:
     """
     Contains information about execution times for determinant calculations, which
@@ -10,13 +13,16 @@ class ExecutionResults:
         determinant (float): value of the determinant of matrix
         exec_time_ms (int): duration of the calculation process in milliseconds
         serial (bool): if true the implementation is serial, otherwise implementation is parallel
+        cached (bool): if true the result was taken from the result cache, and exec_time_ms is the duration
+        of the original calculation
     """
 
-    def __init__(self, matrix_order, determinant, exec_time_ms, serial):
+    def __init__(self, matrix_order, determinant, exec_time_ms, serial, cached=False):
         self.n = matrix_order
         self.determinant = determinant
         self.exec_time_ms = exec_time_ms
         self.serial = serial
+        self.cached = cached
 
 def bool_to_string(bool):
     if bool:
@@ -29,8 +35,10 @@ def write_results(execution_results, results_file_path):
     different matrices, using serial and parallel implementation, to a specified csv file.
     The CSV file header contains: n (matrix order), exec_time_ms (execution time), serial (determines
     whether the implementation is serial or parallel), implementation (determines the programming language
-    of used implementation). If the file does not exist it will be created and initialized,
-    otherwise the new results will be added to the end of existing file.
+    of used implementation), cached (determines whether the result was taken from the result cache).
+    If the file does not exist it will be created and initialized, otherwise the new results will be
+    added to the end of existing file. Files created before the cached column was introduced are
+    migrated first: the cached column is added to the header and set to false in all existing rows.
 
     Args:
         execution_results (list(ExecutionResults)): information about determinant calculation processes
@@ -40,14 +48,84 @@ def write_results(execution_results, results_file_path):
     Return:
         None
     """
-    # Create results file if it does not exist, otherwise append to existing file
-    with open(results_file_path, mode='a+') as res_file:
+    with Results_stream(results_file_path) as results_stream:
+        for exec_res in execution_results:
+            results_stream.write(exec_res)
+
+class Results_stream:
+    """
+    Results file opened for writing results one by one, as soon as they are available (see write_results
+    for the format of the file). Each row is flushed immediately, so the file holds all finished
+    results even if the program is stopped.
+
+    Attributes:
+        results_file_path (string): path of the csv file to hold the informations
+    """
+
+    def __init__(self, results_file_path):
+        self.results_file_path = results_file_path
+        migrate_results_file(results_file_path)
+        # Create results file if it does not exist, otherwise append to existing file
+        self._file = open(results_file_path, mode='a')
         # if file is empty, initialize the file with header
         if os.path.getsize(results_file_path) == 0:
-            res_file.write("n,exec_time_ms,serial,implementation\n")
+            self._file.write("{}\n".format(RESULTS_HEADER))
 
-        # write new results
-        for exec_res in execution_results:
-                        res_file.write("{},{},{},{}\n"
-                           .format(exec_res.n, exec_res.exec_time_ms, bool_to_string(exec_res.serial), "python"))
+    def write(self, exec_res):
+        self._file.write(format_result_row(exec_res))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def migrate_results_file(results_file_path):
+    """
+    Adds the cached column to a results file created before the column was introduced. Existing
+    results were all calculated, so their cached column is set to false. Files which do not exist,
+    are empty or already contain the cached column are left unchanged.
+
+    Args:
+        results_file_path (string): path of the csv file holding the results
+
+    Return:
+        None
+    """
+    if not os.path.exists(results_file_path) or os.path.getsize(results_file_path) == 0:
+        return
+    with open(results_file_path, 'r') as file:
+        lines = file.read().splitlines()
+    header = lines[0].strip().split(",")
+    if "cached" in header:
+        return
+    if header != LEGACY_RESULTS_HEADER.split(","):
+        raise Exception("Unknown header of results file {}: {}.".format(results_file_path, lines[0]))
+
+    # the file is replaced only when it is completely rewritten, so an interrupted migration loses no results
+    migrated_path = results_file_path + ".migrating"
+    with open(migrated_path, 'w') as file:
+        file.write("{}\n".format(RESULTS_HEADER))
+        for line in lines[1:]:
+            if line.strip():
+                file.write("{},{}\n".format(line, bool_to_string(False)))
+    os.replace(migrated_path, results_file_path)
+
+def format_result_row(exec_res):
+    """
+    Formats a single row of the results file (see write_results).
+
+    Args:
+        exec_res (ExecutionResults): information about determinant calculation process
+
+    Return:
+        row of the CSV file, ending with a new line (string)
+    """
+    return "{},{},{},{},{}\n".format(exec_res.n, exec_res.exec_time_ms, bool_to_string(exec_res.serial), "python",
+                                     bool_to_string(exec_res.cached))
 
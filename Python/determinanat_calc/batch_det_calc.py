@@ -0,0 +1,120 @@
+import numpy as np
+
+def det_1x1(matrices):
+    return matrices[:, 0, 0].copy()
+
+def det_2x2(matrices):
+    return matrices[:, 0, 0] * matrices[:, 1, 1] - matrices[:, 0, 1] * matrices[:, 1, 0]
+
+def det_3x3(matrices):
+    # Laplace expansion over first row, calculated for all matrices at once
+    m = matrices
+    return (m[:, 0, 0] * (m[:, 1, 1] * m[:, 2, 2] - m[:, 1, 2] * m[:, 2, 1])
+            - m[:, 0, 1] * (m[:, 1, 0] * m[:, 2, 2] - m[:, 1, 2] * m[:, 2, 0])
+            + m[:, 0, 2] * (m[:, 1, 0] * m[:, 2, 1] - m[:, 1, 1] * m[:, 2, 0]))
+
+def det_4x4(matrices):
+    # Laplace expansion over first two rows: sum of products of complementary 2x2 minors
+    m = matrices
+
+    def minor(rows, cols):
+        (r1, r2), (c1, c2) = rows, cols
+        return m[:, r1, c1] * m[:, r2, c2] - m[:, r1, c2] * m[:, r2, c1]
+
+    top, bottom = (0, 1), (2, 3)
+    return (minor(top, (0, 1)) * minor(bottom, (2, 3))
+            - minor(top, (0, 2)) * minor(bottom, (1, 3))
+            + minor(top, (0, 3)) * minor(bottom, (1, 2))
+            + minor(top, (1, 2)) * minor(bottom, (0, 3))
+            - minor(top, (1, 3)) * minor(bottom, (0, 2))
+            + minor(top, (2, 3)) * minor(bottom, (0, 1)))
+
+# closed form determinant formulas for small matrix orders
+CLOSED_FORM_KERNELS = {1: det_1x1, 2: det_2x2, 3: det_3x3, 4: det_4x4}
+
+def batched_lu_det(matrices):
+    """
+    Calculates determinants of a stack of matrices of the same order using Gaussian elimination with
+    partial pivoting, where every elimination step is performed for all matrices at once.
+
+    Args:
+        matrices (numpy.ndarray): array of shape (count, n, n), it is not modified
+
+    Return:
+        determinants of given matrices (numpy.ndarray)
+    """
+    count, n, _ = matrices.shape
+    work = np.array(matrices, dtype=np.float64)
+    determinants = np.ones(count)
+    batch_idx = np.arange(count)
+
+    for k in range(n):
+        # choose the pivot with the largest absolute value in each matrix and swap it into row k
+        pivot_rows = k + np.argmax(np.abs(work[:, k:, k]), axis=1)
+        swapped = pivot_rows != k
+        if swapped.any():
+            pivot_cols = work[batch_idx, pivot_rows].copy()
+            work[batch_idx, pivot_rows] = work[:, k]
+            work[:, k] = pivot_cols
+            determinants[swapped] = -determinants[swapped]
+
+        pivots = work[:, k, k]
+        determinants *= pivots
+        if k == n - 1:
+            break
+
+        # singular matrices already have zero determinant, avoid dividing by zero pivot
+        safe_pivots = np.where(pivots == 0, 1.0, pivots)
+        factors = work[:, k + 1:, k] / safe_pivots[:, None]
+        work[:, k + 1:, k + 1:] -= factors[:, :, None] * work[:, k, None, k + 1:]
+
+    return determinants
+
+def det_same_order(matrices):
+    """
+    Calculates determinants of a stack of matrices of the same order. Closed form formulas
+    are used for orders up to 4 and batched elimination for larger orders.
+
+    Args:
+        matrices (numpy.ndarray): array of shape (count, n, n)
+
+    Return:
+        determinants of given matrices (numpy.ndarray)
+    """
+    count, n, _ = matrices.shape
+    if n == 0:
+        return np.ones(count)
+    kernel = CLOSED_FORM_KERNELS.get(n, batched_lu_det)
+    return kernel(matrices)
+
+def det_batch(matrices):
+    """
+    Calculates determinants of many matrices using vectorized array operations instead of
+    calculating them one by one. Matrices are grouped by their order and determinants of each
+    group are calculated at once (see det_same_order).
+
+    Args:
+        matrices (numpy.ndarray|list): three dimensional array of matrices of the same order
+        (count, n, n), or list of matrices of possibly different orders, where each matrix is
+        a list of lists (as returned by read_matrix) or a two dimensional array
+
+    Return:
+        determinants of given matrices, in the same order as the matrices (numpy.ndarray)
+    """
+    if isinstance(matrices, np.ndarray):
+        if matrices.ndim != 3 or matrices.shape[1] != matrices.shape[2]:
+            raise Exception("Stack of square matrices is required. Found array of shape {}."
+                            .format(matrices.shape))
+        return det_same_order(np.asarray(matrices, dtype=np.float64))
+
+    # group matrices by their order, remembering their positions in the input
+    groups = {}
+    for idx, matrix in enumerate(matrices):
+        groups.setdefault(len(matrix), []).append(idx)
+
+    determinants = np.empty(len(matrices))
+    for n, indexes in groups.items():
+        stack = np.array([matrices[idx] for idx in indexes], dtype=np.float64).reshape(len(indexes), n, n)
+        determinants[indexes] = det_same_order(stack)
+
+    return determinants
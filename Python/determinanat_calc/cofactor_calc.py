@@ -0,0 +1,146 @@
+from fractions import Fraction
+
+from determinanat_calc import tracing
+from determinanat_calc.tracing import COMPUTE_CATEGORY, TRANSFER_CATEGORY, REDUCE_CATEGORY
+from determinanat_calc.incremental_det import det_and_inverse, is_exact_matrix
+from determinanat_calc.memo_det_calc import Minor_cache, DEFAULT_CACHE_SIZE
+from determinanat_calc.parallel_det_calc import Minor_calc_task, Process_executor, is_float_matrix
+from determinanat_calc.serial_det_calc import LAPLACE_METHOD, LU_METHOD, SPARSE_METHOD
+from determinanat_calc.shared_matrix import Shared_matrix
+from determinanat_calc.sparse_det_calc import sparse_minor_calc, nonzero_masks
+
+# methods for calculating cofactors: Laplace expansion sharing sub-minors, or a single elimination
+COFACTOR_METHODS = [LAPLACE_METHOD, LU_METHOD]
+
+def cofactor_tasks(matrix):
+    """
+    Creates the tasks of calculating all n^2 minors of the matrix without one row and one column,
+    ordered by rows, so the task with index i * n + j calculates the minor without row i and column j.
+    """
+    n = len(matrix)
+    indexes = [i for i in range(n)]
+    tasks = []
+    for row in range(n):
+        minor_rows = indexes[:row] + indexes[row + 1:]
+        for col in range(n):
+            minor_cols = indexes[:col] + indexes[col + 1:]
+            tasks.append(Minor_calc_task(matrix, minor_cols, None, row * n + col, row_indexes=minor_rows))
+    return tasks
+
+def laplace_minors(matrix, tasks_num, pool, executor, cache_size):
+    """
+    Calculates all minors of the matrix without one row and one column using Laplace expansion
+    (see cofactors), serially or in parallel.
+
+    Return:
+        values of the minors, ordered by rows (list(float))
+    """
+    tasks = cofactor_tasks(matrix)
+    if tasks_num == 1 and executor is None:
+        # one cache of sub-minors is shared by all n^2 minors
+        cache = Minor_cache(cache_size)
+        masks = nonzero_masks(matrix)
+        with tracing.span("minors", COMPUTE_CATEGORY, minors=len(tasks)):
+            return [sparse_minor_calc(matrix, task.row_indexes, task.column_indexes, cache, masks) for task in tasks]
+
+    if executor is None:
+        executor = Process_executor(pool)
+    shared_matrix = None
+    if not executor.shares_memory and is_float_matrix(matrix):
+        with tracing.span("share matrix", TRANSFER_CATEGORY):
+            shared_matrix = Shared_matrix(matrix)
+    try:
+        if shared_matrix is not None:
+            for task in tasks:
+                task.matrix = shared_matrix.handle
+        return executor.calculate_minors(tasks, tasks_num, SPARSE_METHOD, True, cache_size)
+    finally:
+        if shared_matrix is not None:
+            shared_matrix.release()
+
+def normalize_exact(value):
+    # integral Fractions are returned as int, like in elimination_det_calc.bareiss_det, so the type
+    # of results does not depend on the method
+    if isinstance(value, Fraction) and value.denominator == 1:
+        return value.numerator
+    return value
+
+def cofactors(matrix, method=LAPLACE_METHOD, tasks_num=1, pool=None, executor=None, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Calculates the cofactor matrix C of given matrix, where C[i][j] = (-1)^(i + j) * M[i][j] and M[i][j]
+    is the minor without row i and column j, together with the determinant, which is the expansion
+    of C over the first row.
+    With the laplace method all n^2 minors are calculated in one pass of memoized Laplace expansion:
+    sub-minors are cached by the bitmasks of their rows and columns (see sparse_det_calc.sparse_minor_calc),
+    so sub-minors shared by many minors are calculated once, and zero elements are skipped. With more than
+    one task the minors are calculated in parallel, row by row, by the executor of det_parallel (processes
+    of the pool by default), each process sharing the sub-minors of the minors it calculates.
+    With the lu method the determinant and the inverse are calculated by a single Gauss-Jordan elimination
+    (exact for int and Fraction matrices) and C = det * (A^-1)^T. Singular matrices have no inverse, so
+    their cofactors are calculated using the laplace method. Exact results which are integers are
+    returned as int by both methods.
+
+    Args:
+        matrix (list(list(float))): matrix for which the cofactors are calculated
+        method (string): one of COFACTOR_METHODS: laplace (memoized cofactor expansion) or lu (elimination)
+        tasks_num (int): number of parallel tasks of the laplace method
+        pool (Worker_pool): started pool of worker processes, by default new processes are started
+        executor (Process_executor|Thread_executor): executes the tasks, processes of the pool by default
+        cache_size (int): maximum number of cached sub-minors per task
+
+    Return:
+        cofactor matrix and the determinant ( (list(list(float)), float) )
+    """
+    if method not in COFACTOR_METHODS:
+        raise Exception("Unknown cofactor calculation method: {}. Available methods are: {}."
+                        .format(method, ", ".join(COFACTOR_METHODS)))
+    if tasks_num < 1:
+        raise Exception("Number of tasks must be positive, got {}.".format(tasks_num))
+    n = len(matrix)
+    for row_idx, row in enumerate(matrix):
+        if len(row) != n:
+            raise Exception("Sqared matrix is required. Found {} columns in row {}, expected {}."
+                            .format(len(row), row_idx + 1, n))
+
+    if method == LU_METHOD:
+        with tracing.span("det and inverse", COMPUTE_CATEGORY, n=n):
+            determinant, inverse_matrix = det_and_inverse(matrix)
+        if inverse_matrix is not None:
+            return [[normalize_exact(determinant * inverse_matrix[col][row]) for col in range(n)]
+                    for row in range(n)], normalize_exact(determinant)
+
+    minors = laplace_minors(matrix, tasks_num, pool, executor, cache_size)
+    with tracing.span("reduce", REDUCE_CATEGORY, minors=len(minors)):
+        cofactor_matrix = [[normalize_exact(minors[row * n + col] if (row + col) % 2 == 0 else -minors[row * n + col])
+                            for col in range(n)] for row in range(n)]
+        determinant = 0
+        for col in range(n):
+            determinant += matrix[0][col] * cofactor_matrix[0][col]
+    return cofactor_matrix, normalize_exact(determinant)
+
+def adjugate(matrix, method=LAPLACE_METHOD, tasks_num=1, pool=None, executor=None, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Calculates the adjugate of given matrix, the transposed cofactor matrix, together with the determinant
+    (see cofactors for the arguments).
+
+    Return:
+        adjugate matrix and the determinant ( (list(list(float)), float) )
+    """
+    cofactor_matrix, determinant = cofactors(matrix, method, tasks_num, pool, executor, cache_size)
+    n = len(matrix)
+    return [[cofactor_matrix[col][row] for col in range(n)] for row in range(n)], determinant
+
+def inverse(matrix, method=LAPLACE_METHOD, tasks_num=1, pool=None, executor=None, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Calculates the inverse of given matrix as adj(A) / det(A), together with the determinant
+    (see cofactors for the arguments). The inverse of an int or Fraction matrix has exact Fraction elements.
+
+    Return:
+        inverse matrix and the determinant ( (list(list(float|Fraction)), float) )
+    """
+    adjugate_matrix, determinant = adjugate(matrix, method, tasks_num, pool, executor, cache_size)
+    if determinant == 0:
+        raise Exception("Matrix is singular, it has no inverse.")
+    if is_exact_matrix(matrix):
+        return [[Fraction(el) / determinant for el in row] for row in adjugate_matrix], determinant
+    return [[el / determinant for el in row] for row in adjugate_matrix], determinant
@@ -0,0 +1,269 @@
+import json
+import os
+import platform
+
+from determinanat_calc.incremental_det import is_exact_matrix
+from determinanat_calc.iterative_laplace import expansion_nodes
+from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc.serial_det_calc import det_serial, check_method, LAPLACE_METHOD, LU_METHOD, BAREISS_METHOD, \
+    SPARSE_METHOD, ITERATIVE_METHOD
+from determinanat_calc.structure import analyze_structure
+
+SERIAL_ENGINE = "serial"
+PARALLEL_ENGINE = "parallel"
+STRUCTURE_ENGINE = "structure"
+
+# methods based on Laplace expansion, their cost is proportional to the number of visited submatrices
+EXPANSION_METHODS = [LAPLACE_METHOD, SPARSE_METHOD, ITERATIVE_METHOD]
+# methods which are considered when the method is not given
+FLOAT_CANDIDATE_METHODS = [LU_METHOD, ITERATIVE_METHOD]
+EXACT_CANDIDATE_METHODS = [BAREISS_METHOD, ITERATIVE_METHOD]
+
+# costs used when there is no calibration profile for the host, measured on a typical machine
+DEFAULT_METHOD_COSTS = {
+    LAPLACE_METHOD: {"call_ms": 0.01, "ns_per_op": 2200.0},
+    SPARSE_METHOD: {"call_ms": 0.02, "ns_per_op": 2500.0},
+    ITERATIVE_METHOD: {"call_ms": 0.01, "ns_per_op": 550.0},
+    LU_METHOD: {"call_ms": 0.02, "ns_per_op": 60.0},
+    BAREISS_METHOD: {"call_ms": 0.02, "ns_per_op": 250.0},
+}
+# split depths considered for parallel calculation
+SPLIT_DEPTHS = [1, 2]
+DEFAULT_PARALLEL_COSTS = {"pool_call_ms": 1.0, "pool_task_ms": 0.5, "spawn_task_ms": 15.0, "efficiency": 0.8}
+
+def default_profile_path():
+    """
+    Returns the path of the calibration profile of this host: a JSON file in the .determinant_calc
+    directory of the user's home directory, named after the host.
+    """
+    return os.path.join(os.path.expanduser("~"), ".determinant_calc", "profile_{}.json".format(platform.node()))
+
+class Calibration_profile:
+    """
+    Costs of determinant calculation on one host, measured once by the calibration command
+    (see scaling.calibration) and used by the dispatcher to predict execution times.
+    The serial cost of a method is call_ms + ns_per_op * operations, where operations are the
+    number of submatrices visited by Laplace expansion, or n^3 for elimination methods.
+
+    Attributes:
+        host (string): name of the host the profile was measured on
+        cpus (int): number of CPUs of the host
+        methods (dict): for each method, its fixed cost in milliseconds (call_ms) and cost of one
+        operation in nanoseconds (ns_per_op)
+        parallel (dict): fixed cost of a parallel calculation with a worker pool (pool_call_ms), additional
+        cost per task with a pool (pool_task_ms) and when processes are started (spawn_task_ms), and
+        the share of ideal speedup which is achieved (efficiency)
+    """
+
+    def __init__(self, host=None, cpus=None, methods=None, parallel=None):
+        self.host = host if host is not None else platform.node()
+        self.cpus = cpus if cpus is not None else os.cpu_count() or 1
+        self.methods = {method: dict(costs) for method, costs in DEFAULT_METHOD_COSTS.items()}
+        if methods is not None:
+            self.methods.update(methods)
+        self.parallel = dict(DEFAULT_PARALLEL_COSTS)
+        if parallel is not None:
+            self.parallel.update(parallel)
+
+    def to_dict(self):
+        return {"host": self.host, "cpus": self.cpus, "methods": self.methods, "parallel": self.parallel}
+
+    @staticmethod
+    def from_dict(profile_dict):
+        return Calibration_profile(profile_dict["host"], profile_dict["cpus"], profile_dict["methods"],
+                                   profile_dict["parallel"])
+
+    def save(self, profile_path=None):
+        profile_path = profile_path if profile_path is not None else default_profile_path()
+        directory = os.path.dirname(profile_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(profile_path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+def load_profile(profile_path=None):
+    """
+    Loads the calibration profile of this host.
+
+    Args:
+        profile_path (string): path of the profile, by default the path of this host (see default_profile_path)
+
+    Return:
+        the profile, or None if it does not exist or was measured on another host (Calibration_profile)
+    """
+    profile_path = profile_path if profile_path is not None else default_profile_path()
+    if not os.path.exists(profile_path):
+        return None
+    with open(profile_path) as file:
+        profile = Calibration_profile.from_dict(json.load(file))
+    if profile.host != platform.node():
+        return None
+    return profile
+
+# profile used by det when no profile is given, loaded on first use
+_profile = None
+
+def active_profile():
+    """
+    Returns the calibration profile of this host, or the default profile if the host is not calibrated.
+    """
+    global _profile
+    if _profile is None:
+        _profile = load_profile() or Calibration_profile()
+    return _profile
+
+class Dispatch_plan:
+    """
+    Calculation chosen by the dispatcher for a matrix (see plan_calculation).
+
+    Attributes:
+        engine (string): structure (determinant is known from the structure), serial or parallel
+        method (string): method used to calculate the determinant (one of serial_det_calc.METHODS)
+        tasks_num (int): number of tasks of parallel calculation, 1 for serial calculation
+        split_depth (int): number of rows used for splitting the determinant into minors
+        predicted_ms (float): predicted execution time in milliseconds
+        structure (Matrix_structure): result of the structure analysis of the matrix
+    """
+
+    def __init__(self, engine, method, tasks_num, split_depth, predicted_ms, structure):
+        self.engine = engine
+        self.method = method
+        self.tasks_num = tasks_num
+        self.split_depth = split_depth
+        self.predicted_ms = predicted_ms
+        self.structure = structure
+
+    def description(self):
+        if self.engine == STRUCTURE_ENGINE:
+            return "{} matrix, determinant known from structure".format(self.structure.description())
+        if self.engine == SERIAL_ENGINE:
+            return "serial {} ({}), predicted {:.3f} ms".format(self.method, self.structure.description(),
+                                                                 self.predicted_ms)
+        return "parallel {} with {} tasks and split depth {} ({}), predicted {:.3f} ms".format(
+            self.method, self.tasks_num, self.split_depth, self.structure.description(), self.predicted_ms)
+
+def method_operations(method, n):
+    """
+    Returns the number of operations of calculating a determinant of order n using the given method.
+    """
+    if method in EXPANSION_METHODS:
+        return expansion_nodes(n)
+    return n ** 3
+
+def serial_cost_ms(profile, method, block_orders):
+    costs = profile.methods[method]
+    return costs["call_ms"] + sum(costs["ns_per_op"] * method_operations(method, n) for n in block_orders) / 1e6
+
+def parallel_cost_ms(profile, method, block_orders, tasks_num, split_depth, pooled):
+    """
+    Predicts the execution time of parallel calculation: fixed and per-task costs, plus the work of
+    all minors divided among the tasks which can run at the same time (minors of different blocks are
+    assumed to cost the same).
+    """
+    costs = profile.methods[method]
+    parallel = profile.parallel
+    minors_num = 0
+    work_ms = 0.0
+    for n in block_orders:
+        if n == 1:
+            continue
+        depth = min(split_depth, n - 1)
+        block_minors = 1
+        for k in range(depth):
+            block_minors *= n - k
+        minors_num += block_minors
+        work_ms += block_minors * costs["ns_per_op"] * method_operations(method, n - depth) / 1e6
+    # minors are calculated in rounds of concurrently running tasks, the last round may be incomplete
+    concurrent_tasks = max(1, min(tasks_num, profile.cpus, minors_num))
+    rounds = -(-minors_num // concurrent_tasks)
+    if pooled:
+        overhead_ms = parallel["pool_call_ms"] + parallel["pool_task_ms"] * tasks_num
+    else:
+        overhead_ms = parallel["pool_call_ms"] + parallel["spawn_task_ms"] * (tasks_num - 1)
+    return overhead_ms + costs["call_ms"] + work_ms / minors_num * rounds / parallel["efficiency"]
+
+def plan_calculation(matrix, method=None, profile=None, pooled=True, max_tasks=None, structure=None):
+    """
+    Chooses how the determinant of given matrix is calculated. If the structure of the matrix
+    determines the determinant, nothing is calculated. Otherwise, execution times of candidate
+    methods are predicted from the orders of diagonal blocks of the matrix and the calibration
+    profile of the host, for serial calculation and for parallel calculation with each number of
+    tasks up to the number of CPUs, and the fastest calculation is chosen. Small matrices are
+    calculated serially, since starting parallel tasks costs more than calculating them.
+    When the method is not given, the candidates are LU decomposition and iterative Laplace
+    expansion for float matrices, and Bareiss algorithm and iterative Laplace expansion for exact
+    (int or Fraction) matrices, so the result stays exact.
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        method (string): method to be used (one of serial_det_calc.METHODS), chosen by the dispatcher by default
+        profile (Calibration_profile): calibration profile, the profile of this host by default
+        pooled (bool): whether parallel calculation uses a started Worker_pool
+        max_tasks (int): maximum number of parallel tasks, the number of CPUs of the profile by default
+        structure (Matrix_structure): result of structure.analyze_structure of the matrix, if it was already
+        analyzed, by default the matrix is analyzed
+
+    Return:
+        chosen calculation (Dispatch_plan)
+    """
+    profile = profile if profile is not None else active_profile()
+    structure = structure if structure is not None else analyze_structure(matrix)
+    if structure.determinant is not None:
+        return Dispatch_plan(STRUCTURE_ENGINE, method, 1, 0, 0.0, structure)
+    if method is not None:
+        check_method(method)
+        methods = [method]
+    else:
+        methods = EXACT_CANDIDATE_METHODS if is_exact_matrix(matrix) else FLOAT_CANDIDATE_METHODS
+
+    if structure.blocks is not None:
+        block_orders = [end - begin for begin, end in structure.blocks]
+    else:
+        block_orders = [len(matrix)]
+    max_tasks = max_tasks if max_tasks is not None else profile.cpus
+
+    best_plan = None
+    for candidate in methods:
+        plan = Dispatch_plan(SERIAL_ENGINE, candidate, 1, 0, serial_cost_ms(profile, candidate, block_orders),
+                             structure)
+        if best_plan is None or plan.predicted_ms < best_plan.predicted_ms:
+            best_plan = plan
+        if len(matrix) < 3:
+            continue
+        for tasks_num in range(2, max_tasks + 1):
+            # deeper splitting gives more, smaller minors, which balances the work of more tasks
+            for split_depth in SPLIT_DEPTHS:
+                predicted_ms = parallel_cost_ms(profile, candidate, block_orders, tasks_num, split_depth, pooled)
+                if predicted_ms < best_plan.predicted_ms:
+                    best_plan = Dispatch_plan(PARALLEL_ENGINE, candidate, tasks_num, split_depth, predicted_ms,
+                                              structure)
+    return best_plan
+
+def det(matrix, method=None, pool=None, profile=None, structure=None):
+    """
+    Calculates the determinant of given matrix, choosing serial or parallel implementation, the
+    number of tasks and the method (see plan_calculation).
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        method (string): method to be used (one of serial_det_calc.METHODS), chosen by the dispatcher by default
+        pool (Worker_pool): started pool of worker processes for parallel calculation, parallel calculation
+        starts new processes if it is not given
+        profile (Calibration_profile): calibration profile, the profile of this host by default
+        structure (Matrix_structure): result of structure.analyze_structure of the matrix, if it was already
+        analyzed, by default the matrix is analyzed
+
+    Return:
+        value of the determinant and the chosen calculation ( (float, Dispatch_plan) )
+    """
+    max_tasks = pool.size if pool is not None else None
+    plan = plan_calculation(matrix, method, profile, pool is not None, max_tasks, structure)
+    if plan.engine == STRUCTURE_ENGINE:
+        return plan.structure.determinant, plan
+    if plan.engine == SERIAL_ENGINE:
+        # the structure of the matrix was analyzed by plan_calculation
+        determinant, _, _ = det_serial(matrix, plan.method, structure=plan.structure)
+        return determinant, plan
+    determinant, _ = det_parallel(matrix, plan.tasks_num, plan.method, pool=pool, split_depth=plan.split_depth,
+                                  structure=plan.structure)
+    return determinant, plan
@@ -0,0 +1,140 @@
+from fractions import Fraction
+from numbers import Integral
+
+def submatrix(matrix, begin_row_index, column_indexes):
+    """
+    Copies the square submatrix of the given minor out of the original matrix. Elimination methods
+    modify the matrix in place, so they can not work directly on the original matrix.
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix of the minor
+        begin_row_index (int): index of the first row of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+
+    Return:
+        copy of the submatrix (list(list(float)))
+    """
+    n = len(column_indexes)
+    return [[matrix[row][col] for col in column_indexes] for row in range(begin_row_index, begin_row_index + n)]
+
+def lu_det(matrix):
+    """
+    Calculates the determinant of given matrix using Gaussian elimination (LU decomposition) with
+    partial pivoting. In each step the element with the largest absolute value in the current column
+    is chosen as the pivot. The determinant is the product of pivots, with sign changed for every
+    row swap. Complexity is O(n^3). The given matrix is modified.
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+
+    Return:
+        value of the determinant (float)
+    """
+    n = len(matrix)
+    determinant = 1.0
+
+    for k in range(n):
+        # choose the pivot with the largest absolute value
+        pivot_row = max(range(k, n), key=lambda row: abs(matrix[row][k]))
+        pivot = matrix[pivot_row][k]
+        if pivot == 0:
+            return 0.0
+        if pivot_row != k:
+            matrix[k], matrix[pivot_row] = matrix[pivot_row], matrix[k]
+            determinant = -determinant
+        determinant *= pivot
+
+        # eliminate elements below the pivot
+        pivot_cols = matrix[k]
+        for row in range(k + 1, n):
+            row_cols = matrix[row]
+            factor = row_cols[k] / pivot
+            if factor != 0:
+                for col in range(k + 1, n):
+                    row_cols[col] -= factor * pivot_cols[col]
+
+    return determinant
+
+def bareiss_det(matrix):
+    """
+    Calculates the determinant of given matrix using fraction-free Bareiss elimination. All divisions
+    in the algorithm are exact, so for integer matrices all intermediate values stay integers and for
+    Fraction matrices the result is exact, without factorial cost (complexity is O(n^3) arithmetic
+    operations). Float elements are converted to Fraction, so the result is the exact determinant of
+    the given binary values, rounded to float only once at the end. The given matrix is modified.
+
+    Args:
+        matrix (list(list(int|Fraction|float))): matrix for which the determinant is calculated
+
+    Return:
+        value of the determinant, int or Fraction for exact input and float otherwise (int|Fraction|float)
+    """
+    n = len(matrix)
+    if n == 0:
+        return 1
+
+    integral = all(isinstance(el, Integral) for row in matrix for el in row)
+    has_floats = any(isinstance(el, float) for row in matrix for el in row)
+    if not integral:
+        for row in matrix:
+            for col in range(n):
+                row[col] = Fraction(row[col])
+
+    sgn = 1
+    prev_pivot = 1
+    for k in range(n - 1):
+        # pivot must not be zero, find a row below with non-zero element in current column
+        if matrix[k][k] == 0:
+            swap_row = next((row for row in range(k + 1, n) if matrix[row][k] != 0), None)
+            if swap_row is None:
+                return 0.0 if has_floats else 0
+            matrix[k], matrix[swap_row] = matrix[swap_row], matrix[k]
+            sgn = -sgn
+
+        pivot_cols = matrix[k]
+        pivot = pivot_cols[k]
+        for row in range(k + 1, n):
+            row_cols = matrix[row]
+            row_k = row_cols[k]
+            for col in range(k + 1, n):
+                value = row_cols[col] * pivot - row_k * pivot_cols[col]
+                # division is exact in Bareiss algorithm
+                row_cols[col] = value // prev_pivot if integral else value / prev_pivot
+        prev_pivot = pivot
+
+    determinant = sgn * matrix[n - 1][n - 1]
+    if has_floats:
+        return float(determinant)
+    if not integral and determinant.denominator == 1:
+        return determinant.numerator
+    return determinant
+
+def lu_minor_calc(matrix, begin_row_index, column_indexes):
+    """
+    Calculates an arbitrary minor of given matrix using LU decomposition with partial pivoting.
+    The original matrix is not modified.
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix of the minor
+        begin_row_index (int): index of the first row of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+
+    Return:
+        value of the given minor (float)
+    """
+    return lu_det([[float(el) for el in row] for row in submatrix(matrix, begin_row_index, column_indexes)])
+
+def bareiss_minor_calc(matrix, begin_row_index, column_indexes):
+    """
+    Calculates an arbitrary minor of given matrix using Bareiss fraction-free elimination.
+    The original matrix is not modified.
+
+    Args:
+        matrix (list(list(int|Fraction|float))): matrix containing the submatrix of the minor
+        begin_row_index (int): index of the first row of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+
+    Return:
+        value of the given minor (int|Fraction|float)
+    """
+    return bareiss_det(submatrix(matrix, begin_row_index, column_indexes))
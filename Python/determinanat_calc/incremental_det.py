@@ -0,0 +1,273 @@
+import sys
+from fractions import Fraction
+from numbers import Integral
+
+# number of updates after which the inverse is recalculated from the matrix, since rounding errors
+# of float updates accumulate
+DEFAULT_REFACTOR_INTERVAL = 100
+# updates whose determinant ratio is smaller than this, or larger than its reciprocal (in absolute
+# value), lose too much precision, so the inverse is recalculated instead
+DEFAULT_MIN_RATIO = 1e-8
+
+def is_exact_matrix(matrix):
+    return all(isinstance(el, (Integral, Fraction)) for row in matrix for el in row)
+
+def det_and_inverse(matrix):
+    """
+    Calculates the determinant and the inverse of given matrix using Gauss-Jordan elimination with
+    partial pivoting (for exact elements the first non-zero pivot is used and the result is exact).
+    A float matrix is considered singular if a pivot is not larger than n * eps * ||A|| (the largest
+    sum of absolute values of a row), since rounding errors of elimination of a singular matrix
+    leave such pivots instead of zero.
+    Complexity is O(n^3). The given matrix is not modified.
+
+    Args:
+        matrix (list(list(float|int|Fraction))): matrix for which the determinant is calculated
+
+    Return:
+        value of the determinant and the inverse, or None instead of the inverse if the matrix is
+        singular ( (float|Fraction, list(list(float|Fraction))) )
+    """
+    n = len(matrix)
+    exact = is_exact_matrix(matrix)
+    convert = Fraction if exact else float
+    work = [[convert(el) for el in row] for row in matrix]
+    inverse = [[convert(1 if row == col else 0) for col in range(n)] for row in range(n)]
+    determinant = convert(1)
+    # pivots which are not larger than this are rounding errors
+    norm = max((sum(abs(el) for el in row) for row in work), default=0.0)
+    singular_pivot = 0 if exact else n * sys.float_info.epsilon * norm
+
+    for k in range(n):
+        if exact:
+            pivot_row = next((row for row in range(k, n) if work[row][k] != 0), k)
+        else:
+            pivot_row = max(range(k, n), key=lambda row: abs(work[row][k]))
+        pivot = work[pivot_row][k]
+        if abs(pivot) <= singular_pivot:
+            return convert(0), None
+        if pivot_row != k:
+            work[k], work[pivot_row] = work[pivot_row], work[k]
+            inverse[k], inverse[pivot_row] = inverse[pivot_row], inverse[k]
+            determinant = -determinant
+        determinant *= pivot
+
+        pivot_cols = work[k]
+        pivot_inverse = inverse[k]
+        for col in range(n):
+            pivot_cols[col] /= pivot
+            pivot_inverse[col] /= pivot
+        for row in range(n):
+            factor = work[row][k]
+            if row == k or factor == 0:
+                continue
+            row_cols = work[row]
+            row_inverse = inverse[row]
+            for col in range(n):
+                row_cols[col] -= factor * pivot_cols[col]
+                row_inverse[col] -= factor * pivot_inverse[col]
+
+    return determinant, inverse
+
+class DeterminantTracker:
+    """
+    Keeps the determinant of a matrix which is edited many times, together with the inverse of the
+    matrix. Replacing a row or a column, changing an element or adding a rank-one matrix u * v^T is
+    a rank-one change, so by the matrix determinant lemma the new determinant is
+        det(A + u * v^T) = det(A) * (1 + v^T * A^-1 * u)
+    and the inverse is updated by the Sherman-Morrison formula, both in O(n^2) instead of O(n^3)
+    of recalculation (or O(n!) of Laplace expansion).
+    Float updates accumulate rounding errors, so the inverse and the determinant are recalculated
+    from the matrix (refactored) after every refactor_interval updates, and also when an update has
+    a determinant ratio (1 + v^T * A^-1 * u) close to zero, when the formula cancels most significant
+    digits, or a very large ratio, when the inverse was nearly singular. While the matrix is singular
+    the inverse does not exist, so updates are applied to the matrix and it is refactored after each
+    of them. Integer and Fraction matrices are tracked exactly, using Fraction arithmetic, and they
+    are never refactored.
+
+    Attributes:
+        n (int): order of the matrix
+        exact (bool): whether the matrix is tracked exactly
+        determinant (float|Fraction): determinant of the current matrix
+        refactor_interval (int): maximum number of float updates between two refactorizations
+        min_ratio (float): smallest absolute determinant ratio applied by float update, the largest
+        is 1 / min_ratio
+        updates (int): number of applied updates
+        refactors (int): number of refactorizations, including the initial one
+    """
+
+    def __init__(self, matrix, refactor_interval=DEFAULT_REFACTOR_INTERVAL, min_ratio=DEFAULT_MIN_RATIO):
+        if refactor_interval < 1:
+            raise Exception("Refactor interval must be positive, got {}.".format(refactor_interval))
+        self.n = len(matrix)
+        for row_idx, row in enumerate(matrix):
+            if len(row) != self.n:
+                raise Exception("Sqared matrix is required. Found {} columns in row {}, expected {}."
+                                .format(len(row), row_idx + 1, self.n))
+        self.exact = is_exact_matrix(matrix)
+        self._convert = Fraction if self.exact else float
+        self._matrix = [[self._convert(el) for el in row] for row in matrix]
+        self.refactor_interval = refactor_interval
+        self.min_ratio = min_ratio
+        self.updates = 0
+        self.refactors = 0
+        self._updates_since_refactor = 0
+        self.determinant = None
+        self._inverse = None
+        self.refactor()
+
+    @property
+    def matrix(self):
+        return [list(row) for row in self._matrix]
+
+    def refactor(self):
+        """
+        Recalculates the determinant and the inverse from the current matrix.
+
+        Return:
+            value of the determinant (float|Fraction)
+        """
+        self.determinant, self._inverse = det_and_inverse(self._matrix)
+        self.refactors += 1
+        self._updates_since_refactor = 0
+        return self.determinant
+
+    def rank_one_update(self, u, v):
+        """
+        Adds the outer product u * v^T to the matrix.
+
+        Args:
+            u (list(float)): column vector of the update
+            v (list(float)): row vector of the update
+
+        Return:
+            value of the new determinant (float|Fraction)
+        """
+        self._check_vector(u)
+        self._check_vector(v)
+        u = [self._convert(el) for el in u]
+        v = [self._convert(el) for el in v]
+        for row in range(self.n):
+            if u[row] != 0:
+                row_cols = self._matrix[row]
+                for col in range(self.n):
+                    row_cols[col] += u[row] * v[col]
+        if self._inverse is None:
+            return self._after_update(None, None, None)
+
+        inverse = self._inverse
+        # A^-1 * u and v^T * A^-1
+        inverse_u = [sum(inverse[row][k] * u[k] for k in range(self.n) if u[k] != 0) for row in range(self.n)]
+        v_inverse = [0] * self.n
+        for k in range(self.n):
+            if v[k] != 0:
+                inverse_row = inverse[k]
+                for col in range(self.n):
+                    v_inverse[col] += v[k] * inverse_row[col]
+        ratio = 1 + sum(v[k] * inverse_u[k] for k in range(self.n))
+        return self._after_update(ratio, inverse_u, v_inverse)
+
+    def replace_row(self, row_idx, row):
+        """
+        Replaces a row of the matrix. It is a rank-one update with u = e_i and v = new row - old row,
+        where A^-1 * e_i is the column i of the inverse.
+
+        Args:
+            row_idx (int): index of the row to be replaced
+            row (list(float)): new elements of the row
+
+        Return:
+            value of the new determinant (float|Fraction)
+        """
+        self._check_index(row_idx)
+        self._check_vector(row)
+        new_row = [self._convert(el) for el in row]
+        v = [new_row[col] - self._matrix[row_idx][col] for col in range(self.n)]
+        self._matrix[row_idx] = new_row
+        if self._inverse is None:
+            return self._after_update(None, None, None)
+
+        inverse = self._inverse
+        inverse_u = [inverse[row][row_idx] for row in range(self.n)]
+        v_inverse = [0] * self.n
+        for k in range(self.n):
+            if v[k] != 0:
+                inverse_row = inverse[k]
+                for col in range(self.n):
+                    v_inverse[col] += v[k] * inverse_row[col]
+        ratio = 1 + v_inverse[row_idx]
+        return self._after_update(ratio, inverse_u, v_inverse)
+
+    def replace_column(self, col_idx, column):
+        """
+        Replaces a column of the matrix. It is a rank-one update with u = new column - old column
+        and v = e_j, where e_j^T * A^-1 is the row j of the inverse.
+
+        Args:
+            col_idx (int): index of the column to be replaced
+            column (list(float)): new elements of the column
+
+        Return:
+            value of the new determinant (float|Fraction)
+        """
+        self._check_index(col_idx)
+        self._check_vector(column)
+        new_column = [self._convert(el) for el in column]
+        u = [new_column[row] - self._matrix[row][col_idx] for row in range(self.n)]
+        for row in range(self.n):
+            self._matrix[row][col_idx] = new_column[row]
+        if self._inverse is None:
+            return self._after_update(None, None, None)
+
+        inverse = self._inverse
+        inverse_u = [sum(inverse[row][k] * u[k] for k in range(self.n) if u[k] != 0) for row in range(self.n)]
+        v_inverse = list(inverse[col_idx])
+        ratio = 1 + inverse_u[col_idx]
+        return self._after_update(ratio, inverse_u, v_inverse)
+
+    def set_element(self, row_idx, col_idx, value):
+        """
+        Changes a single element of the matrix, which is a rank-one update with u = delta * e_i and v = e_j.
+
+        Args:
+            row_idx (int): index of the row of the element
+            col_idx (int): index of the column of the element
+            value (float): new value of the element
+
+        Return:
+            value of the new determinant (float|Fraction)
+        """
+        self._check_index(row_idx)
+        self._check_index(col_idx)
+        row = list(self._matrix[row_idx])
+        row[col_idx] = value
+        return self.replace_row(row_idx, row)
+
+    def _after_update(self, ratio, inverse_u, v_inverse):
+        # applies the determinant lemma and Sherman-Morrison formula, or refactors the matrix
+        self.updates += 1
+        self._updates_since_refactor += 1
+        if ratio is None or ratio == 0:
+            # the matrix was singular or became singular, the inverse can not be updated
+            return self.refactor()
+        if not self.exact and (abs(ratio) < self.min_ratio or abs(ratio) * self.min_ratio > 1
+                               or self._updates_since_refactor >= self.refactor_interval):
+            return self.refactor()
+
+        self.determinant *= ratio
+        inverse = self._inverse
+        for row in range(self.n):
+            factor = inverse_u[row] / ratio
+            if factor != 0:
+                inverse_row = inverse[row]
+                for col in range(self.n):
+                    inverse_row[col] -= factor * v_inverse[col]
+        return self.determinant
+
+    def _check_index(self, idx):
+        if not 0 <= idx < self.n:
+            raise Exception("Index {} is out of range for matrix of order {}.".format(idx, self.n))
+
+    def _check_vector(self, vector):
+        if len(vector) != self.n:
+            raise Exception("Vector of {} elements is required, got {} elements.".format(self.n, len(vector)))
@@ -0,0 +1,84 @@
+def iterative_minor_calc(matrix, begin_row_index, column_indexes):
+    """
+    Calculates an arbitrary minor of given matrix using Laplace expansion over the first row, like
+    serial_det_calc.minor_calc, but without recursion and without allocating anything per visited
+    submatrix. The expansion is driven by an explicit stack with one preallocated slot per row:
+    the set of remaining columns of each level is a bitmask of positions in column_indexes, the columns
+    still to be expanded are another bitmask, and each level keeps its sign, current coefficient and
+    partial sum. Submatrices of order one are read directly instead of being pushed to the stack.
+    Columns are expanded in the same order and terms are added in the same order as in minor_calc,
+    so the result is identical to the result of minor_calc, bit for bit.
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix of the minor
+        begin_row_index (int): index of the first row of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+
+    Return:
+        value of the given minor (float)
+    """
+    k = len(column_indexes)
+    if k == 1:
+        return matrix[begin_row_index][column_indexes[0]]
+
+    rows = [matrix[begin_row_index + level] for level in range(k)]
+    cols = list(column_indexes)
+    last_level = k - 1
+    last_row = rows[last_level]
+
+    # preallocated stack, one slot per level (row) of the expansion
+    masks = [0] * k
+    remaining = [0] * k
+    signs = [1] * k
+    coefficients = [0] * k
+    sums = [0] * k
+
+    masks[0] = remaining[0] = (1 << k) - 1
+    level = 0
+    while True:
+        level_remaining = remaining[level]
+        if level_remaining:
+            # expand the next column (in the order of column_indexes) of the current level
+            lowest = level_remaining & -level_remaining
+            remaining[level] = level_remaining ^ lowest
+            sign = signs[level]
+            coefficient = sign * rows[level][cols[lowest.bit_length() - 1]]
+            signs[level] = -sign
+            minor_mask = masks[level] ^ lowest
+            if level + 1 == last_level:
+                sums[level] += coefficient * last_row[cols[minor_mask.bit_length() - 1]]
+            else:
+                coefficients[level] = coefficient
+                level += 1
+                masks[level] = remaining[level] = minor_mask
+                signs[level] = 1
+                sums[level] = 0
+        else:
+            # all columns of the level are expanded, its sum is the minor of the level above
+            if level == 0:
+                return sums[0]
+            minor = sums[level]
+            level -= 1
+            sums[level] += coefficients[level] * minor
+
+def expansion_nodes(n):
+    """
+    Returns the number of submatrices (nodes of the recursion tree) visited by Laplace expansion of
+    a matrix of order n, including the matrix itself: nodes(1) = 1, nodes(n) = 1 + n * nodes(n - 1).
+    """
+    nodes = 1
+    for k in range(2, n + 1):
+        nodes = 1 + k * nodes
+    return nodes
+
+def iterative_det(matrix):
+    """
+    Calculates the determinant of given matrix using iterative Laplace expansion (see iterative_minor_calc).
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+
+    Return:
+        value of the determinant (float)
+    """
+    return iterative_minor_calc(matrix, 0, [i for i in range(len(matrix))])
@@ -0,0 +1,153 @@
+from collections import OrderedDict
+import time
+
+from determinanat_calc import tracing
+from determinanat_calc.tracing import COMPUTE_CATEGORY
+
+DEFAULT_CACHE_SIZE = 1 << 20
+
+class Minor_cache:
+    """
+    Bounded cache holding already calculated minors of a single matrix. A minor is identified by
+    the index of its first row in the original matrix and the bitmask of its remaining columns.
+    When the cache is full, the least recently used minor is evicted.
+
+    Attributes:
+        max_size (int): maximum number of minors kept in the cache
+        hits (int): number of lookups that found a calculated minor
+        misses (int): number of lookups that did not find a calculated minor
+        evictions (int): number of minors removed from the cache because it was full
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE):
+        if max_size < 1:
+            raise Exception("Cache size must be positive, got {}.".format(max_size))
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._minors = OrderedDict()
+
+    def __len__(self):
+        return len(self._minors)
+
+    def get(self, key):
+        """
+        Returns the minor stored under given key and marks it as recently used.
+
+        Args:
+            key ((int, int)): index of the first row and bitmask of columns of the minor
+
+        Return:
+            value of the minor, or None if it is not cached (float)
+        """
+        minor = self._minors.get(key)
+        if minor is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._minors.move_to_end(key)
+        return minor
+
+    def put(self, key, minor):
+        """
+        Stores a calculated minor, evicting the least recently used one if the cache is full.
+
+        Args:
+            key ((int, int)): index of the first row and bitmask of columns of the minor
+            minor (float): value of the minor
+
+        Return:
+            None
+        """
+        self._minors[key] = minor
+        self._minors.move_to_end(key)
+        if len(self._minors) > self.max_size:
+            self._minors.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._minors.clear()
+
+def columns_to_mask(column_indexes):
+    """
+    Converts a list of column indexes into a bitmask where bit i is set if column i is present.
+
+    Args:
+        column_indexes (list(int)): indexes of columns
+
+    Return:
+        bitmask of columns (int)
+    """
+    mask = 0
+    for col in column_indexes:
+        mask |= 1 << col
+    return mask
+
+def _memo_minor(matrix, row, cols_mask, cache):
+    # expansion over first row of the submatrix, columns are visited in ascending order
+    cached = cache.get((row, cols_mask))
+    if cached is not None:
+        return cached
+
+    if cols_mask & (cols_mask - 1) == 0:
+        result = matrix[row][cols_mask.bit_length() - 1]
+    else:
+        result = 0
+        sgn = 1
+        remaining = cols_mask
+        while remaining:
+            lowest = remaining & -remaining
+            remaining ^= lowest
+            col = lowest.bit_length() - 1
+            minor = _memo_minor(matrix, row + 1, cols_mask ^ lowest, cache)
+            result += sgn * matrix[row][col] * minor
+            sgn = -sgn
+
+    cache.put((row, cols_mask), result)
+    return result
+
+def memo_minor_calc(matrix, begin_row_index, column_indexes, cache=None, measure_parallel_code=False):
+    """
+    Calculates an arbitrary minor of given matrix, just like serial_det_calc.minor_calc, but every
+    calculated sub-minor is stored in a cache keyed by its first row and the bitmask of its columns.
+    Sub-minors which appear in several branches of the expansion are calculated only once, which
+    reduces the complexity from O(n!) to O(n * 2^n) as long as the cache is large enough to hold them.
+    Returns two values:
+        1. the value of the minor
+        2. time in milliseconds spent calculating the minors of the first row if argument
+        measure_parallel_code is True, and zero otherwise (it will not be measured)
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix of the minor
+        begin_row_index (int): index of the first row of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+        cache (Minor_cache): cache of already calculated minors of the same matrix, a new one is
+        created if it is not specified
+        measure_parallel_code (bool): indicates whether the execution time for code that can be parallelized
+        should be measured, it is False by default for better performance
+
+    Return:
+        value of the given minor, time spent executing code that can be parallelized ( (float, float) )
+    """
+    if cache is None:
+        cache = Minor_cache()
+    cols_mask = columns_to_mask(column_indexes)
+
+    if not measure_parallel_code or len(column_indexes) == 1:
+        return _memo_minor(matrix, begin_row_index, cols_mask, cache), 0.0
+
+    # same expansion as in _memo_minor, with timing of the first row minors
+    result = 0
+    sgn = 1
+    parallel_code_exec_time = 0
+    for col in sorted(column_indexes):
+        start_time = time.perf_counter()
+        with tracing.span("minor", COMPUTE_CATEGORY, column=col):
+            minor = _memo_minor(matrix, begin_row_index + 1, cols_mask ^ (1 << col), cache)
+        end_time = time.perf_counter()
+        parallel_code_exec_time += (end_time - start_time) * 1000
+        result += sgn * matrix[begin_row_index][col] * minor
+        sgn = -sgn
+
+    return result, parallel_code_exec_time
@@ -0,0 +1,294 @@
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from IO.binary_matrix import read_header, HEADER_SIZE
+
+# size of one matrix element (float64) in bytes
+ELEMENT_SIZE = 8
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+# width of column tiles of the trailing matrix, None to use a third of the memory budget
+DEFAULT_TILE_SIZE = None
+# operations on non-contiguous arrays are done through buffers of NumPy (np.getbufsize() elements
+# per operand), at most this many of them are used at the same time
+ITERATOR_BUFFERS = 3
+MEMORY_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+def parse_memory_size(size):
+    """
+    Parses a memory size given as a number of bytes with an optional unit: K, M, G or T (powers of 1024),
+    e.g. 512M or 2G.
+
+    Args:
+        size (string): memory size
+
+    Return:
+        number of bytes (int)
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)B?\s*", size.upper())
+    if match is None:
+        raise Exception("Invalid memory size: {}. Expected a number of bytes with optional unit K, M, G or T."
+                        .format(size))
+    return int(float(match.group(1)) * MEMORY_UNITS[match.group(2)])
+
+class Io_stats:
+    """
+    Statistics of reading and writing the on-disk matrix during out-of-core elimination.
+
+    Attributes:
+        bytes_read (int): number of bytes read from the scratch matrix
+        bytes_written (int): number of bytes written to the scratch matrix
+        panel_loads (int): number of loaded panels
+        tile_loads (int): number of loaded tiles of the trailing matrix
+        io_time_ms (float): time spent reading and writing in milliseconds
+        compute_time_ms (float): time spent calculating in milliseconds
+    """
+
+    def __init__(self):
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.panel_loads = 0
+        self.tile_loads = 0
+        self.io_time_ms = 0.0
+        self.compute_time_ms = 0.0
+
+    def description(self):
+        return "read {:.1f} MiB in {} panels and {} tiles, written {:.1f} MiB, I/O {:.1f} ms, compute {:.1f} ms" \
+            .format(self.bytes_read / 1024 ** 2, self.panel_loads, self.tile_loads, self.bytes_written / 1024 ** 2,
+                    self.io_time_ms, self.compute_time_ms)
+
+class Out_of_core_result:
+    """
+    Result of out-of-core determinant calculation. The determinant of a large matrix often does not fit
+    into a float, so its sign and the logarithm of its absolute value are kept as well.
+
+    Attributes:
+        determinant (float): value of the determinant, infinite if it is too large for a float
+        sign (int): sign of the determinant (-1, 0 or 1)
+        log_abs_determinant (float): natural logarithm of the absolute value of the determinant
+        panel_width (int): number of columns eliminated in one panel
+        tile_size (int): number of columns of trailing matrix tiles
+        stats (Io_stats): statistics of reading and writing the matrix
+    """
+
+    def __init__(self, sign, log_abs_determinant, panel_width, tile_size, stats):
+        self.sign = sign
+        self.log_abs_determinant = log_abs_determinant
+        if sign == 0:
+            self.determinant = 0.0
+        elif log_abs_determinant > math.log(sys.float_info.max):
+            self.determinant = sign * math.inf
+        else:
+            self.determinant = sign * math.exp(log_abs_determinant)
+        self.panel_width = panel_width
+        self.tile_size = tile_size
+        self.stats = stats
+
+def blocking(n, memory_limit, tile_size=DEFAULT_TILE_SIZE):
+    """
+    Chooses the width of panels and of trailing matrix tiles, so that all arrays of the elimination
+    fit into the memory budget: a panel and a tile (n rows each), a work array of the size of a tile,
+    which holds products calculated in chunks of rows, two columns for temporary vectors and the
+    buffers which NumPy uses for operations on parts of the panel and the tile.
+
+    Args:
+        n (int): order of the matrix
+        memory_limit (int): memory budget in bytes
+        tile_size (int): requested width of tiles, by default a third of the budget is used for tiles
+
+    Return:
+        panel width and tile width ( (int, int) )
+    """
+    column_bytes = n * ELEMENT_SIZE
+    buffers_bytes = ITERATOR_BUFFERS * min(np.getbufsize(), n * n) * ELEMENT_SIZE
+    budget_columns = (memory_limit - buffers_bytes) // column_bytes
+    if budget_columns < 5:
+        raise Exception("Memory limit of {} bytes is too small for matrix of order {}, at least {} bytes are required."
+                        .format(memory_limit, n, 5 * column_bytes + buffers_bytes))
+    if tile_size is None:
+        tile_size = budget_columns // 3
+    tile_size = max(1, min(tile_size, (budget_columns - 3) // 2, n))
+    panel_width = max(1, min(budget_columns - 2 * tile_size - 2, n))
+    return panel_width, tile_size
+
+def copy_to_scratch(matrix_file_path, matrix_idx, n, scratch_path, memory_limit, stats):
+    # rows are copied in chunks which fit into the memory budget
+    source = np.memmap(matrix_file_path, dtype='<f8', mode='r', offset=HEADER_SIZE + matrix_idx * n * n * ELEMENT_SIZE,
+                       shape=(n, n))
+    scratch = np.memmap(scratch_path, dtype='<f8', mode='w+', shape=(n, n))
+    rows_per_chunk = max(1, memory_limit // (n * ELEMENT_SIZE))
+    start_time = time.perf_counter()
+    for begin in range(0, n, rows_per_chunk):
+        end = min(n, begin + rows_per_chunk)
+        scratch[begin:end] = source[begin:end]
+        stats.bytes_read += (end - begin) * n * ELEMENT_SIZE
+        stats.bytes_written += (end - begin) * n * ELEMENT_SIZE
+    scratch.flush()
+    stats.io_time_ms += (time.perf_counter() - start_time) * 1000
+    del source
+    return scratch
+
+def buffer_view(buffer, rows, cols):
+    # contiguous array of given shape at the beginning of a preallocated buffer
+    return buffer[:rows * cols].reshape(rows, cols)
+
+def swap_rows(array, first, second):
+    temp = array[first].copy()
+    array[first] = array[second]
+    array[second] = temp
+
+def factor_panel(panel, work):
+    """
+    LU decomposition with partial pivoting of a panel of m rows and b columns (m >= b), in place:
+    the unit lower triangular factor L is stored below the diagonal and U on and above it.
+    The rank-one updates are calculated in chunks of rows into the work buffer, so no temporary
+    array of the size of the panel is created.
+
+    Return:
+        pivot row of each column (relative to the panel) and sign and log of absolute value of the
+        product of the diagonal of U, sign 0 if the panel is singular ( (list(int), int, float) )
+    """
+    rows, cols = panel.shape
+    chunk_rows = max(1, len(work) // cols)
+    pivots = []
+    sign = 1
+    log_abs = 0.0
+    for col in range(cols):
+        pivot_row = col + int(np.argmax(np.abs(panel[col:, col])))
+        pivot = panel[pivot_row, col]
+        pivots.append(pivot_row)
+        if pivot == 0:
+            return pivots, 0, 0.0
+        if pivot_row != col:
+            swap_rows(panel, col, pivot_row)
+            sign = -sign
+        if pivot < 0:
+            sign = -sign
+        log_abs += math.log(abs(pivot))
+        panel[col + 1:, col] /= pivot
+        for begin in range(col + 1, rows, chunk_rows):
+            end = min(rows, begin + chunk_rows)
+            product = buffer_view(work, end - begin, cols - col - 1)
+            np.multiply.outer(panel[begin:end, col], panel[col, col + 1:], out=product)
+            panel[begin:end, col + 1:] -= product
+    return pivots, sign, log_abs
+
+def update_tile(tile, panel, pivots, work):
+    """
+    Applies an eliminated panel to a tile of the trailing matrix with the same rows, in place:
+    the row interchanges of the panel are applied, the first b rows are solved with the unit lower
+    triangular L11 by forward substitution (U12 = L11^-1 * A12) and the remaining rows are updated
+    with A22 - L21 * U12, in chunks of rows calculated into the work buffer.
+    """
+    rows, cols = tile.shape
+    b = len(pivots)
+    for col, pivot_row in enumerate(pivots):
+        if pivot_row != col:
+            swap_rows(tile, col, pivot_row)
+    row_product = work[:cols]
+    for row in range(1, b):
+        np.matmul(panel[row, :row], tile[:row], out=row_product)
+        tile[row] -= row_product
+    chunk_rows = max(1, len(work) // cols)
+    for begin in range(b, rows, chunk_rows):
+        end = min(rows, begin + chunk_rows)
+        product = buffer_view(work, end - begin, cols)
+        np.matmul(panel[begin:end], tile[:b], out=product)
+        tile[begin:end] -= product
+
+def out_of_core_det(matrix_file_path, matrix_idx=0, memory_limit=DEFAULT_MEMORY_LIMIT, tile_size=DEFAULT_TILE_SIZE,
+                    scratch_dir=None, progress=None):
+    """
+    Calculates the determinant of a matrix from a binary matrix file (see binary_matrix) which may be
+    larger than the available memory, using blocked right-looking LU decomposition with partial pivoting.
+    The matrix is first copied into a memory-mapped scratch file, which is then eliminated in place.
+    In each step a panel of the next b columns (rows from the diagonal down) is loaded and factorized
+    in memory, then the trailing matrix is updated tile by tile: each tile of columns is loaded and
+    updated (see update_tile) and written back. Only one panel, one tile and a work array of the
+    size of a tile are in memory, they are allocated once and their width is chosen so that they
+    fit into the memory limit (see blocking).
+    The determinant is the product of the diagonal of U with the sign of the row interchanges.
+
+    Args:
+        matrix_file_path (string): path of the binary matrix file
+        matrix_idx (int): index of the matrix in the file
+        memory_limit (int): memory budget for panels and tiles in bytes
+        tile_size (int): number of columns of trailing matrix tiles, by default a third of the budget is used
+        scratch_dir (string): directory of the scratch file, by default the system temporary directory
+        progress (function): called after each panel with the number of eliminated columns and the order
+
+    Return:
+        determinant with statistics of the calculation (Out_of_core_result)
+    """
+    if np is None:
+        raise Exception("NumPy is required for out-of-core determinant calculation.")
+    header = read_header(matrix_file_path)
+    if not 0 <= matrix_idx < header.count:
+        raise Exception("Matrix index {} is out of range, file {} contains {} matrices."
+                        .format(matrix_idx, matrix_file_path, header.count))
+    n = header.order
+    panel_width, tile_size = blocking(n, memory_limit, tile_size)
+    stats = Io_stats()
+
+    scratch_file = tempfile.NamedTemporaryFile(prefix="det_scratch_", suffix=".bin", dir=scratch_dir, delete=False)
+    scratch_file.close()
+    try:
+        scratch = copy_to_scratch(matrix_file_path, matrix_idx, n, scratch_file.name, memory_limit, stats)
+        # all arrays are allocated once, panels and tiles are views of their beginning
+        panel_buffer = np.empty(n * panel_width)
+        tile_buffer = np.empty(n * tile_size)
+        work = np.empty(n * tile_size)
+        sign = 1
+        log_abs = 0.0
+        for k in range(0, n, panel_width):
+            b = min(panel_width, n - k)
+            panel = buffer_view(panel_buffer, n - k, b)
+            start_time = time.perf_counter()
+            panel[:] = scratch[k:, k:k + b]
+            stats.io_time_ms += (time.perf_counter() - start_time) * 1000
+            stats.bytes_read += panel.nbytes
+            stats.panel_loads += 1
+
+            start_time = time.perf_counter()
+            pivots, panel_sign, panel_log_abs = factor_panel(panel, work)
+            stats.compute_time_ms += (time.perf_counter() - start_time) * 1000
+            if panel_sign == 0:
+                sign = 0
+                break
+            sign *= panel_sign
+            log_abs += panel_log_abs
+
+            for j in range(k + b, n, tile_size):
+                w = min(tile_size, n - j)
+                tile = buffer_view(tile_buffer, n - k, w)
+                start_time = time.perf_counter()
+                tile[:] = scratch[k:, j:j + w]
+                stats.io_time_ms += (time.perf_counter() - start_time) * 1000
+                stats.bytes_read += tile.nbytes
+                stats.tile_loads += 1
+
+                start_time = time.perf_counter()
+                update_tile(tile, panel, pivots, work)
+                stats.compute_time_ms += (time.perf_counter() - start_time) * 1000
+
+                # rows of the panel are not needed anymore, only the trailing matrix is written back
+                start_time = time.perf_counter()
+                scratch[k + b:, j:j + w] = tile[b:]
+                stats.io_time_ms += (time.perf_counter() - start_time) * 1000
+                stats.bytes_written += tile[b:].nbytes
+
+            if progress is not None:
+                progress(k + b, n)
+        del scratch
+    finally:
+        os.remove(scratch_file.name)
+
+    return Out_of_core_result(sign, log_abs, panel_width, tile_size, stats)
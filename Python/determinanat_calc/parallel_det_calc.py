@@ -1,29 +1,56 @@
-from itertools import filterfalse
-from multiprocessing import Process, Array
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Process, Array, Queue
+
+from determinanat_calc import tracing
+from determinanat_calc.tracing import SPAWN_CATEGORY, TRANSFER_CATEGORY, COMPUTE_CATEGORY, WAIT_CATEGORY, \
+    REDUCE_CATEGORY
 
 from determinanat_calc.util import measure_exec_time
 from IO.matrix_reader import read_matrix
-from determinanat_calc.serial_det_calc import minor_calc
+from determinanat_calc.serial_det_calc import method_minor_calc, check_method, LAPLACE_METHOD, BAREISS_METHOD, \
+    SPARSE_METHOD
+from determinanat_calc.sparse_det_calc import split_sparse_minors
+from determinanat_calc.structure import analyze_structure
+from determinanat_calc.memo_det_calc import Minor_cache, DEFAULT_CACHE_SIZE
+from determinanat_calc.shared_matrix import Shared_matrix, Shared_matrix_handle
+from determinanat_calc.worker_pool import worker_task_queue
+
+# ways of making the matrix available to the processes calculating minors
+SHARED_MEMORY_TRANSPORT = "shared_memory"
+COPY_TRANSPORT = "copy"
+TRANSPORTS = [SHARED_MEMORY_TRANSPORT, COPY_TRANSPORT]
+# kinds of tasks which calculate minors in parallel
+PROCESS_BACKEND = "process"
+THREAD_BACKEND = "thread"
+BACKENDS = [PROCESS_BACKEND, THREAD_BACKEND]
 
 class Minor_calc_task:
     """
-    Holds information required to calculate a minor of a matrix, when the first
-    row is removed. For calculation, the original matrix is accessed (only the rows
+    Holds information required to calculate a minor of a matrix, when the first k rows
+    are removed. For calculation, the original matrix is accessed (only the rows
     and columns which are necessary to calculate the given minor). The result is written
     to a given sequence, at the given index.
 
     Attributes:
-        matrix (list(list(float)): original matrix for which the minor should be calculated
+        matrix (list(list(float)|Shared_matrix_handle): original matrix for which the minor should be calculated,
+        or the handle of the matrix placed in shared memory
         column_indexes (list(int)): indexes of columns in the original matrix containing the submatrix of given minor
-        results_holder (multiprocessing.Array): sequence to write the minor in (used for final determinant calculation)
+        results_holder (multiprocessing.Array): sequence to write the minor in (used for final determinant calculation),
+        None if the result is returned from the worker process instead (when a Worker_pool is used)
         result_idx (int): index of the given minor in the sequence that holds the result
+        begin_row_index (int): index of the first row of the submatrix of given minor (split depth k)
+        row_indexes (list(int)): indexes of rows in the original matrix containing the submatrix of given minor,
+        None if the submatrix consists of consecutive rows starting at begin_row_index
     """
 
-    def __init__(self, matrix, column_indexes, results_holder, result_idx):
+    def __init__(self, matrix, column_indexes, results_holder, result_idx, begin_row_index=1, row_indexes=None):
         self.matrix = matrix
         self.column_indexes = column_indexes
         self.results_holder = results_holder
         self.result_idx = result_idx
+        self.begin_row_index = begin_row_index
+        self.row_indexes = row_indexes
 
     def publish_result(self, result):
         """
@@ -35,98 +62,527 @@ class Minor_calc_task:
         Return:
             None
         """
-        self.results_holder[self.result_idx] = result
+        if self.results_holder is not None:
+            self.results_holder[self.result_idx] = result
+
+class Exact_results_holder:
+    """
+    Sequence of minors which keeps exact (int or Fraction) values calculated by other processes.
+    multiprocessing.Array can only hold floats, so the minors are sent through a queue instead.
+
+    Attributes:
+        size (int): number of minors to be collected
+    """
 
+    def __init__(self, size):
+        self.size = size
+        self._queue = Queue()
+
+    def __setitem__(self, idx, value):
+        self._queue.put((idx, value))
+
+    def collect(self):
+        """
+        Waits until all the minors are published and returns them. Must be called before
+        joining the processes which publish the minors.
+
+        Return:
+            values of the minors, ordered by their indexes (list(int|Fraction|float))
+        """
+        values = [None] * self.size
+        for _ in range(self.size):
+            idx, value = self._queue.get()
+            values[idx] = value
+        return values
 
-def serial_minor_calc(minor_calc_task):
+def serial_minor_calc(minor_calc_task, method=LAPLACE_METHOD, cache=None, matrix=None):
     """
-    Calculates a single minor of matrix using serial implementation. Since we are convolving over first row,
-    all minors begin at second row (with index 1). The result is stored in a sequence containing the minors
-    required to calculate the final determinant.
+    Calculates a single minor of matrix using serial implementation. The minor begins at the row
+    following the rows used for splitting the determinant into tasks. The result is stored in a sequence
+    containing the minors required to calculate the final determinant.
 
     Args:
         minor_calc_task (Minor_calc_task): contains information required to calculate the given minor
+        method (string): method used to calculate the minor (one of serial_det_calc.METHODS)
+        cache (Minor_cache): if specified, the memoized Laplace expansion is used and sub-minors are cached in it
+        matrix (list(list(float))|Attached_matrix): matrix to be used instead of the one held by the task,
+        when the task holds a handle of a matrix in shared memory
 
     Return:
-        None
+        value of the minor (float)
     """
-    result, _ = minor_calc(minor_calc_task.matrix, 1, minor_calc_task.column_indexes)
+    if matrix is None:
+        matrix = minor_calc_task.matrix
+    result = method_minor_calc(matrix, minor_calc_task.begin_row_index, minor_calc_task.column_indexes,
+                               method, cache, minor_calc_task.row_indexes)
     minor_calc_task.publish_result(result)
+    return result
+
+def minors_calculation(task_queue, results_holder=None, method=LAPLACE_METHOD, memoize=False,
+                       cache_size=DEFAULT_CACHE_SIZE, trace=False, trace_queue=None):
+    """
+    Calculates minors taken one by one from a queue shared by all processes, until None is taken.
+    Processes which finish their minors sooner simply take more of them, so the work is balanced
+    dynamically. When memoization is used, all tasks of the process share the same cache, so sub-minors
+    common to several tasks are calculated once. If the tasks hold a handle of a matrix in shared memory,
+    the process attaches to it once for all tasks.
+    If tracing is requested, the process records a span for attaching the matrix, for each wait
+    on the queue and for each calculated minor (see tracing module). Recorded events are put into
+    trace_queue if it is given, otherwise they are returned.
+
+    Args:
+        task_queue (multiprocessing.Queue): queue of tasks (Minor_calc_task) followed by None
+        results_holder (multiprocessing.Array|Exact_results_holder): sequence to write the minors in,
+        None if the minors are only returned
+        method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        cache_size (int): maximum number of cached sub-minors, used only if memoize is True
+        trace (bool): if true, spans of the process are recorded
+        trace_queue (multiprocessing.Queue): queue to put the recorded events in, used only if trace is True
+
+    Return:
+        indexes and values of calculated minors and recorded events, which are empty if tracing is
+        not requested or the events are put into trace_queue ( (list((int, float)), list(dict)) )
+    """
+    previous_tracer = tracing.start_worker_tracing() if trace else None
+    cache = Minor_cache(cache_size) if memoize and method in (LAPLACE_METHOD, SPARSE_METHOD) else None
+    attached_matrix = None
+    calculated_minors = []
+    try:
+        with tracing.span("get task", WAIT_CATEGORY):
+            task = task_queue.get()
+        while task is not None:
+            matrix = task.matrix
+            if isinstance(matrix, Shared_matrix_handle):
+                if attached_matrix is None:
+                    with tracing.span("attach matrix", TRANSFER_CATEGORY):
+                        attached_matrix = matrix.attach()
+                matrix = attached_matrix
+            task.results_holder = results_holder
+            with tracing.span("minor", COMPUTE_CATEGORY, idx=task.result_idx, columns=task.column_indexes):
+                calculated_minors.append((task.result_idx, serial_minor_calc(task, method, cache, matrix)))
+            with tracing.span("get task", WAIT_CATEGORY):
+                task = task_queue.get()
+    finally:
+        if attached_matrix is not None:
+            attached_matrix.detach()
+        trace_events = tracing.finish_worker_tracing(previous_tracer) if trace else []
+
+    if trace_queue is not None:
+        trace_queue.put(trace_events)
+        trace_events = []
+    return calculated_minors, trace_events
+
+def pooled_minors_calculation(method, memoize, cache_size, trace=False):
+    """
+    Calculates minors taken from the task queue of the Worker_pool which executes this function.
+
+    Args:
+        method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        cache_size (int): maximum number of cached sub-minors, used only if memoize is True
+        trace (bool): if true, spans of the worker are recorded and returned
+
+    Return:
+        indexes and values of calculated minors and recorded events ( (list((int, float)), list(dict)) )
+    """
+    return minors_calculation(worker_task_queue(), None, method, memoize, cache_size, trace)
+
+class Process_executor:
+    """
+    Executes minor calculation tasks in worker processes: processes of a started Worker_pool, or
+    new processes started for each calculation if no pool is given (see calculate_minors).
+    Each process has its own interpreter, so pure Python minor calculation runs in parallel, but
+    tasks and minors are pickled and the matrix is transferred to the processes (see det_parallel).
+
+    Attributes:
+        pool (Worker_pool): started pool of worker processes, None to start new processes
+    """
+    backend = PROCESS_BACKEND
+    # processes do not share the memory of the matrix, it has to be transferred to them
+    shares_memory = False
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+    def calculate_minors(self, tasks, tasks_num, method, memoize, cache_size):
+        return calculate_minors(tasks, tasks_num, method, memoize, cache_size, self.pool)
+
+class Thread_executor:
+    """
+    Executes minor calculation tasks in threads of the current process. Threads share the matrix
+    and write the minors into a plain preallocated list, so nothing is pickled, copied or started
+    in other processes. Pure Python minor calculation holds the GIL, so threads calculate in parallel
+    only when the calculation releases it (NumPy elimination) or on free-threaded CPython builds.
+    Like Worker_pool, the executor can be used as a context manager to keep its threads for many
+    calculations, otherwise threads are started for each calculation.
+
+    Attributes:
+        size (int): number of threads kept by the started executor
+    """
+    backend = THREAD_BACKEND
+    shares_memory = True
+
+    def __init__(self, size=None):
+        self.size = size
+        self._thread_pool = None
+
+    def start(self):
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(self.size, thread_name_prefix="minors")
+
+    def close(self):
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown()
+            self._thread_pool = None
+
+    def calculate_minors(self, tasks, tasks_num, method, memoize, cache_size):
+        """
+        Calculates the given minors using p threads (one of them is the current thread) which
+        take minors from a shared queue (see det_parallel).
+
+        Args:
+            tasks (list(Minor_calc_task)): information required to calculate the minors, the result index
+            of each task is its position in the list
+            tasks_num (int): number of threads to be used in parallel calculation
+            method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+            memoize (bool): if true, Laplace expansion in each thread caches and reuses calculated sub-minors
+            cache_size (int): maximum number of cached sub-minors per thread, used only if memoize is True
+
+        Return:
+            values of the minors (list(float))
+        """
+        minors = [0.0] * len(tasks)
+        task_queue = queue.SimpleQueue()
+        with tracing.span("put tasks", TRANSFER_CATEGORY, tasks=len(tasks)):
+            for task in tasks:
+                task_queue.put(task)
+            for _ in range(tasks_num):
+                task_queue.put(None)
+
+        # threads record their spans directly into the active tracer, with their own thread ids
+        args = (task_queue, minors, method, memoize, cache_size)
+        thread_pool = self._thread_pool
+        if thread_pool is None:
+            thread_pool = ThreadPoolExecutor(max(1, tasks_num - 1), thread_name_prefix="minors")
+        try:
+            with tracing.span("start threads", SPAWN_CATEGORY, threads=tasks_num - 1):
+                futures = [thread_pool.submit(minors_calculation, *args) for _ in range(tasks_num - 1)]
+            minors_calculation(*args)
+            with tracing.span("join", WAIT_CATEGORY, tasks_num=tasks_num):
+                for future in futures:
+                    future.result()
+        finally:
+            if thread_pool is not self._thread_pool:
+                thread_pool.shutdown()
+        return minors
+
+    def __enter__(self):
+        self.start()
+        return self
 
-def minors_calculation(calculation_tasks):
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def split_minors(matrix, split_depth, begin_row_index=0, column_indexes=None):
     """
-    Calculates all the minors assigned to a single process.
+    Applies Laplace expansion over the first split_depth rows of the matrix. Every choice of distinct
+    columns for these rows gives one minor (of the remaining rows and columns) and its coefficient:
+    the product of chosen elements with the signs of expansion. The determinant is the sum of
+    coefficient * minor over all n * (n - 1) * ... * (n - k + 1) choices.
+    A submatrix of consecutive rows (e.g. a diagonal block) can be split instead of the whole matrix.
 
     Args:
-        calculation_tasks (list(Minor_calc_task)): information required to calculate the minors and store the results
+        matrix (list(list(float)): matrix for which the determinant is calculated
+        split_depth (int): number of rows used for splitting (k)
+        begin_row_index (int): index of the first row of the submatrix to be split
+        column_indexes (list(int)): indexes of columns of the submatrix to be split, all columns by default
 
     Return:
-        None
+        coefficients and indexes of columns of the minors (list((float, list(int))))
+    """
+    splits = []
+    end_row_index = begin_row_index + split_depth
+
+    def expand(row, column_indexes, coefficient):
+        if row == end_row_index:
+            splits.append((coefficient, column_indexes))
+            return
+        sgn = 1
+        for idx, col in enumerate(column_indexes):
+            minor_cols = column_indexes[:idx] + column_indexes[idx + 1:]
+            expand(row + 1, minor_cols, coefficient * (sgn * matrix[row][col]))
+            sgn *= -1
+
+    if column_indexes is None:
+        column_indexes = [i for i in range(len(matrix))]
+    expand(begin_row_index, column_indexes, 1)
+    return splits
+
+class Split_plan:
+    """
+    Minors into which the determinant of a matrix is split, and the way their values are combined
+    into the determinant (see split_plan).
+
+    Attributes:
+        determinant (float): determinant of the matrix if it is known from its structure, None otherwise
+        blocks (list((int, int))): first and last (exclusive) indexes of diagonal blocks of the matrix
+        factor (float): product of elements of the blocks of order one
+        splits (list((int, float, int, list(int), list(int)))): for each minor, index of its block,
+        its coefficient, index of its first row, indexes of its rows (None for consecutive rows
+        from the first row) and indexes of its columns
     """
-    for task in calculation_tasks:
-        serial_minor_calc(task)
+
+    def __init__(self, determinant=None, blocks=None, factor=1, splits=None):
+        self.determinant = determinant
+        self.blocks = blocks
+        self.factor = factor
+        self.splits = splits if splits is not None else []
+
+    def reduce(self, minors):
+        """
+        Calculates the determinant from the values of the minors: sum of coefficient * minor for each
+        block, multiplied over the blocks and by the factor.
+
+        Args:
+            minors (list(float)): values of the minors, in the order of splits
+
+        Return:
+            value of the determinant (float)
+        """
+        with tracing.span("reduce", REDUCE_CATEGORY, minors=len(minors)):
+            block_determinants = {}
+            for (block_idx, coefficient, _, _, _), minor in zip(self.splits, minors):
+                block_determinants[block_idx] = block_determinants.get(block_idx, 0) + coefficient * minor
+            result = self.factor
+            for block_idx, (begin, end) in enumerate(self.blocks):
+                if end - begin > 1:
+                    # a block without minors (all coefficients are zero) has zero determinant
+                    result *= block_determinants.get(block_idx, 0)
+            return result
+
+def split_plan(matrix, method=LAPLACE_METHOD, split_depth=1, use_structure=True, structure=None):
+    """
+    Splits the determinant of given matrix into minors which can be calculated independently.
+    Unless disabled, the structure of the matrix is analyzed first (see structure.analyze_structure):
+    if it determines the determinant, there are no minors, and diagonal blocks of block triangular
+    matrices are split independently. Each block of order more than one is split over its first
+    k rows (see split_minors), or over its sparsest lines for the sparse method
+    (see sparse_det_calc.split_sparse_minors).
+
+    Args:
+        matrix (list(list(float)): matrix for which the determinant is calculated
+        method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        split_depth (int): number of rows used for splitting (k), it is limited to the order of block - 1
+        use_structure (bool): if true, structure of the matrix is used to shorten the calculation
+        structure (Matrix_structure): result of structure.analyze_structure of the matrix, if it was already
+        analyzed, by default the matrix is analyzed when use_structure is True
+
+    Return:
+        minors of the determinant (Split_plan)
+    """
+    n = len(matrix)
+    blocks = [(0, n)]
+    if use_structure:
+        if structure is None:
+            structure = analyze_structure(matrix)
+        if structure.determinant is not None:
+            return Split_plan(structure.determinant)
+        if structure.blocks is not None:
+            blocks = structure.blocks
+
+    # blocks of order one are not split, their only element is a factor of the determinant
+    plan = Split_plan(blocks=blocks)
+    with tracing.span("split", COMPUTE_CATEGORY, split_depth=split_depth):
+        for block_idx, (begin, end) in enumerate(blocks):
+            if end - begin == 1:
+                plan.factor *= matrix[begin][begin]
+                continue
+            block_split_depth = min(split_depth, end - begin - 1)
+            block_indexes = [i for i in range(begin, end)]
+            if method == SPARSE_METHOD:
+                for coefficient, minor_rows, minor_cols in split_sparse_minors(matrix, block_split_depth,
+                                                                               block_indexes, block_indexes):
+                    plan.splits.append((block_idx, coefficient, begin + block_split_depth, minor_rows, minor_cols))
+            else:
+                for coefficient, minor_cols in split_minors(matrix, block_split_depth, begin, block_indexes):
+                    plan.splits.append((block_idx, coefficient, begin + block_split_depth, None, minor_cols))
+    return plan
 
 @measure_exec_time
-def det_parallel(matrix, tasks_num):
+def det_parallel(matrix, tasks_num, method=LAPLACE_METHOD, memoize=False, cache_size=DEFAULT_CACHE_SIZE,
+                 pool=None, transport=SHARED_MEMORY_TRANSPORT, split_depth=1, use_structure=True, executor=None,
+                 structure=None):
     """
     Calculates the determinant of given matrix using parallel implementation with given number of tasks.
-    Task number parametrization is useful for scaling experiments. Let n be the order of the matrix
-    and let p be the number of tasks. To calculate the determinant the values of n minors are required.
-    The calculation of these n minors are assigned to p tasks using round Robin policy. After all tasks
-    are finished calculating the required minors, the final determinant is calculated and returned.
+    Task number parametrization is useful for scaling experiments. Let n be the order of the matrix,
+    let p be the number of tasks and let k be the split depth. Laplace expansion over the first k rows
+    gives n * (n - 1) * ... * (n - k + 1) minors required to calculate the determinant (see split_minors).
+    All minors are put into a shared queue and p tasks take them one by one until the queue is empty,
+    so tasks which finish sooner calculate more minors. After all minors are calculated, the final
+    determinant is calculated as a sum of minors multiplied by their coefficients and returned.
+    Deeper splitting gives more, smaller minors, which keeps more than n tasks busy and balances the work.
+    With the sparse method, each level of splitting expands over the row or column with the most zeros
+    and minors with zero coefficients are not calculated (see sparse_det_calc.split_sparse_minors).
+    Each minor is calculated using the given method. If a started Worker_pool is given, the p tasks
+    are submitted to its worker processes instead of starting new processes, so the process start-up
+    time is not a part of the execution time.
+    By default the matrix is copied once into shared memory as float64 buffer and the tasks only hold
+    its handle, so the matrix is not copied for every task. Exact Bareiss calculation of matrices with
+    int or Fraction elements always copies the matrix, since converting it to float64 would lose exactness.
     Since the methods is decorated with measure_exec_time, the execution time in milliseconds is also returned.
+    If tracing is enabled (see tracing.enable_tracing), spans of splitting, transferring the matrix and
+    tasks, starting processes, calculating each minor in each process, waiting for the processes and
+    the final reduction are recorded by the active tracer.
+    Unless disabled, the structure of the matrix is analyzed first (see structure.analyze_structure).
+    If it determines the determinant, no minors are calculated. Diagonal blocks of block triangular
+    matrices are split independently and minors of all blocks are calculated by the same p tasks,
+    the determinant is the product of determinants of the blocks.
+    The tasks are executed by the given executor: processes (Process_executor, the default) or threads
+    of the current process (Thread_executor), which share the matrix, so the transport is not used.
 
     Args:
         matrix (list(list(float)): matrix for which the determinant is calculated
         tasks_num (int): number of processes to be used in parallel calculation
+        method (string): one of serial_det_calc.METHODS: laplace (cofactor expansion), lu (Gaussian
+        elimination with partial pivoting), bareiss (exact fraction-free elimination) or sparse
+        (cofactor expansion over the sparsest lines)
+        memoize (bool): if true, Laplace expansion in each process caches and reuses calculated sub-minors
+        cache_size (int): maximum number of cached sub-minors per process, used only if memoize is True
+        pool (Worker_pool): started pool of worker processes to calculate the minors, by default
+        new processes are started for each call
+        transport (string): one of TRANSPORTS: shared_memory (matrix is placed in shared memory) or
+        copy (each task holds the matrix, which is copied into worker processes)
+        split_depth (int): number of first rows used for splitting the determinant into minors (k),
+        it is limited to n - 1
+        use_structure (bool): if true, structure of the matrix is used to shorten the calculation
+        executor (Process_executor|Thread_executor): executes the p tasks, by default they are executed
+        by processes (of the pool, if it is given)
+        structure (Matrix_structure): result of structure.analyze_structure of the matrix, if it was already
+        analyzed, by default the matrix is analyzed when use_structure is True
 
     Return:
         value of the determinant and execution time in milliseconds ( (float, float) )
     """
+    check_method(method)
+    if transport not in TRANSPORTS:
+        raise Exception("Unknown matrix transport: {}. Available transports are: {}."
+                        .format(transport, ", ".join(TRANSPORTS)))
+    if split_depth < 1:
+        raise Exception("Split depth must be positive, got {}.".format(split_depth))
     n = len(matrix)
-    column_indexes = [i for i in range(n)]
+    if n == 1:
+        return matrix[0][0]
+
+    plan = split_plan(matrix, method, split_depth, use_structure, structure)
+    if plan.determinant is not None:
+        return plan.determinant
+
+    if executor is None:
+        executor = Process_executor(pool)
+    shared_matrix = None
+    if not executor.shares_memory and transport == SHARED_MEMORY_TRANSPORT and \
+            (method != BAREISS_METHOD or is_float_matrix(matrix)):
+        with tracing.span("share matrix", TRANSFER_CATEGORY):
+            shared_matrix = Shared_matrix(matrix)
+    try:
+        task_matrix = matrix if shared_matrix is None else shared_matrix.handle
+        tasks = [Minor_calc_task(task_matrix, minor_cols, None, idx, begin_row_index, minor_rows)
+                 for idx, (_, _, begin_row_index, minor_rows, minor_cols) in enumerate(plan.splits)]
+        minors = executor.calculate_minors(tasks, tasks_num, method, memoize, cache_size)
+    finally:
+        if shared_matrix is not None:
+            shared_matrix.release()
+
+    return plan.reduce(minors)
+
+def is_float_matrix(matrix):
+    return all(isinstance(el, float) for row in matrix for el in row)
+
+def calculate_minors(tasks, tasks_num, method, memoize, cache_size, pool):
+    """
+    Calculates the given minors in parallel, using p tasks which take minors from a shared queue
+    (see det_parallel).
 
-    result = 0
-    minors = Array('d', n)
-    sgn = 1
+    Args:
+        tasks (list(Minor_calc_task)): information required to calculate the minors, the result index
+        of each task is its position in the list
+        tasks_num (int): number of processes to be used in parallel calculation
+        method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion in each process caches and reuses calculated sub-minors
+        cache_size (int): maximum number of cached sub-minors per process, used only if memoize is True
+        pool (Worker_pool): started pool of worker processes, or None to start new processes
+
+    Return:
+        values of the minors (list(float))
+    """
+    minors_num = len(tasks)
+    tracer = tracing.active_tracer()
+    trace = tracer is not None
+
+    if pool is not None:
+        # tasks are taken from the queue of the pool by p workers and minors are returned
+        task_queue = pool.task_queue
+        with tracing.span("put tasks", TRANSFER_CATEGORY, tasks=minors_num):
+            for task in tasks:
+                task_queue.put(task)
+            for _ in range(tasks_num):
+                task_queue.put(None)
 
-    # in order to calculate the determinant the minors must be calculated first
-    # each task calculates some of the minors
+        minors = [0.0] * minors_num
+        pool_args = [(method, memoize, cache_size, trace)] * tasks_num
+        with tracing.span("join", WAIT_CATEGORY, tasks_num=tasks_num):
+            pool_results = pool.starmap(pooled_minors_calculation, pool_args)
+        for calculated_minors, trace_events in pool_results:
+            for idx, minor in calculated_minors:
+                minors[idx] = minor
+            if trace:
+                tracer.add_events(trace_events)
+        return minors
+
+    if method == BAREISS_METHOD:
+        # exact minors calculated by Bareiss algorithm can not be stored in a float array
+        minors = Exact_results_holder(minors_num)
+    else:
+        minors = Array('d', minors_num)
+
+    task_queue = Queue()
+    with tracing.span("put tasks", TRANSFER_CATEGORY, tasks=minors_num):
+        for task in tasks:
+            task_queue.put(task)
+        for _ in range(tasks_num):
+            task_queue.put(None)
+
+    # start tasks to calculate minors (one of the tasks is executed by the current process)
+    trace_queue = Queue() if trace else None
     child_processes = []
-    tasks = [[] for i in range(tasks_num)]
-    for idx, col in enumerate(column_indexes):
-        # prepare the task holding information needed to calculate the given minor
-        minor_cols = list(filterfalse(lambda el: el == col, column_indexes))
-        minor_calc_task = Minor_calc_task(matrix, minor_cols, minors, idx)
-        # add this task to one of the processes, using round Robin policy
-        p_idx = idx % tasks_num
-        tasks[p_idx].append(minor_calc_task)
-
-    # start tasks to calculate minors (first task set is executed by the current process)
-    tasks_it = iter(tasks)
-    first_task = next(tasks_it)
-
-    for calc_tasks in tasks_it:
-        p = Process(target=minors_calculation, args=(calc_tasks, ))
-        child_processes.append(p)
-        p.start()
-
-    minors_calculation(first_task)
-
-    # wait for other tasks to finish calculating assigned minors
-    for p in child_processes:
-        p.join()
-
-    # calculate the determinant
-    for j in range(n):
-        result += sgn * matrix[0][column_indexes[j]] * minors[j]
-        sgn *= -1
+    with tracing.span("start processes", SPAWN_CATEGORY, processes=tasks_num - 1):
+        for _ in range(tasks_num - 1):
+            p = Process(target=minors_calculation,
+                        args=(task_queue, minors, method, memoize, cache_size, trace, trace_queue))
+            child_processes.append(p)
+            p.start()
 
-    return result
+    _, trace_events = minors_calculation(task_queue, minors, method, memoize, cache_size, trace)
+    with tracing.span("join", WAIT_CATEGORY, tasks_num=tasks_num):
+        if method == BAREISS_METHOD:
+            minors = minors.collect()
+        if trace:
+            tracer.add_events(trace_events)
+            # events must be taken from the queue before joining the processes which put them
+            for _ in child_processes:
+                tracer.add_events(trace_queue.get())
+
+        # wait for other tasks to finish calculating minors
+        for p in child_processes:
+            p.join()
+
+    return minors
 
 
 if __name__ == "__main__":
     test_matrix = read_matrix("../../test_data/matrica5x5.txt")
     determinant, exec_time_ms = det_parallel(test_matrix, 5)
     print('det(matrix) =', determinant)
-    print('Execution took: {} ms.'.format(exec_time_ms))
\ No newline at end of file
+    print('Execution took: {} ms.'.format(exec_time_ms))
@@ -2,7 +2,22 @@ from itertools import filterfalse
 from IO.matrix_reader import read_matrix
 import time
 
+from determinanat_calc import tracing
+from determinanat_calc.tracing import COMPUTE_CATEGORY
 from determinanat_calc.util import measure_exec_time
+from determinanat_calc.memo_det_calc import memo_minor_calc, Minor_cache, DEFAULT_CACHE_SIZE
+from determinanat_calc.elimination_det_calc import lu_det, bareiss_det, lu_minor_calc, bareiss_minor_calc
+from determinanat_calc.sparse_det_calc import sparse_det, sparse_minor_calc
+from determinanat_calc.iterative_laplace import iterative_det, iterative_minor_calc
+from determinanat_calc.structure import analyze_structure, block_matrix
+
+# available methods for calculating determinants (and minors)
+LAPLACE_METHOD = "laplace"
+LU_METHOD = "lu"
+BAREISS_METHOD = "bareiss"
+SPARSE_METHOD = "sparse"
+ITERATIVE_METHOD = "iterative"
+METHODS = [LAPLACE_METHOD, LU_METHOD, BAREISS_METHOD, SPARSE_METHOD, ITERATIVE_METHOD]
 
 def minor_calc(matrix, begin_row_index, column_indexes, measure_parallel_code = False):
     """
@@ -41,9 +56,10 @@ def minor_calc(matrix, begin_row_index, column_indexes, measure_parallel_code =
         minor_cols = list(filterfalse(lambda el: el == col, column_indexes))
         # calculate required minors (this can be done in parallel)
         if measure_parallel_code:
-            start_time = time.time()
-            minor, _ = minor_calc(matrix, begin_row_index + 1, minor_cols)
-            end_time = time.time()
+            start_time = time.perf_counter()
+            with tracing.span("minor", COMPUTE_CATEGORY, idx=idx):
+                minor, _ = minor_calc(matrix, begin_row_index + 1, minor_cols)
+            end_time = time.perf_counter()
             minor_calc_time = (end_time - start_time) * 1000
             minors[idx] = minor
             parallel_code_exec_time += minor_calc_time
@@ -58,23 +74,133 @@ def minor_calc(matrix, begin_row_index, column_indexes, measure_parallel_code =
 
     return result, parallel_code_exec_time
 
+def check_method(method):
+    if method not in METHODS:
+        raise Exception("Unknown determinant calculation method: {}. Available methods are: {}."
+                        .format(method, ", ".join(METHODS)))
+
+def method_minor_calc(matrix, begin_row_index, column_indexes, method=LAPLACE_METHOD, cache=None, row_indexes=None):
+    """
+    Calculates an arbitrary minor of given matrix using the given method. Laplace expansion is
+    memoized if a cache is specified. Minors of arbitrary rows (row_indexes) are supported only
+    by the sparse method.
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix of the minor
+        begin_row_index (int): index of the first row of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+        method (string): one of METHODS: laplace (cofactor expansion), lu (Gaussian elimination with
+        partial pivoting), bareiss (exact fraction-free elimination), sparse (cofactor expansion over
+        the sparsest lines, see sparse_det_calc.sparse_minor_calc) or iterative (non-recursive cofactor
+        expansion, see iterative_laplace.iterative_minor_calc)
+        cache (Minor_cache): cache of sub-minors used by the memoized Laplace expansion
+        row_indexes (list(int)): indexes of rows of the submatrix for the minor, used instead of
+        begin_row_index if specified
+
+    Return:
+        value of the given minor (float)
+    """
+    if method == SPARSE_METHOD:
+        if row_indexes is None:
+            row_indexes = [row for row in range(begin_row_index, begin_row_index + len(column_indexes))]
+        return sparse_minor_calc(matrix, row_indexes, column_indexes, cache)
+    if row_indexes is not None:
+        raise Exception("Minors of arbitrary rows are not supported by method {}.".format(method))
+    if method == LU_METHOD:
+        return lu_minor_calc(matrix, begin_row_index, column_indexes)
+    if method == BAREISS_METHOD:
+        return bareiss_minor_calc(matrix, begin_row_index, column_indexes)
+    if method == ITERATIVE_METHOD:
+        return iterative_minor_calc(matrix, begin_row_index, column_indexes)
+    if cache is not None:
+        result, _ = memo_minor_calc(matrix, begin_row_index, column_indexes, cache)
+    else:
+        result, _ = minor_calc(matrix, begin_row_index, column_indexes)
+    return result
+
 @measure_exec_time
-def det_serial(matrix):
+def det_serial(matrix, method=LAPLACE_METHOD, memoize=False, cache_size=DEFAULT_CACHE_SIZE, use_structure=True,
+               structure=None):
     """
     Calculates and returns the determinant of given matrix using serial implementation, as well
     as time in milliseconds, spent executing code that can be parallelized.
     Since it is decorated with measure_exec_time, the execution time in milliseonds is also returned.
+    Time spent executing code that can be parallelized is measured only for the laplace method.
+    If tracing is enabled (see tracing.enable_tracing), the calculation and each minor of the
+    expansion over the first row are recorded as spans.
+    Unless disabled, the structure of the matrix is analyzed first (see structure.analyze_structure):
+    if it determines the determinant (zero or duplicate line, permutation-like, diagonal or triangular
+    matrix), no expansion is done, and block triangular matrices are calculated block by block.
 
     Args:
         matrix (list(list(float)): matrix for which the determinant is calculated.
+        method (string): one of METHODS: laplace (cofactor expansion), lu (Gaussian elimination with
+        partial pivoting, for float matrices), bareiss (exact fraction-free elimination, for int or
+        Fraction matrices), sparse (cofactor expansion over the rows or columns with most zeros,
+        skipping zero elements, for sparse and banded matrices) or iterative (non-recursive
+        cofactor expansion with the same result as laplace, but faster)
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        (see memo_det_calc.memo_minor_calc)
+        cache_size (int): maximum number of cached sub-minors, used only if memoize is True
+        use_structure (bool): if true, structure of the matrix is used to shorten the calculation
+        structure (Matrix_structure): result of structure.analyze_structure of the matrix, if it was already
+        analyzed, by default the matrix is analyzed when use_structure is True
 
     Return:
         value of the determinant, time spent executing code that can be parallelized
         and total execution time in milliseconds ( (float, float, float) )
     """
+    check_method(method)
+    with tracing.span("det_serial", COMPUTE_CATEGORY, method=method, memoize=memoize):
+        if not use_structure:
+            return general_det(matrix, method, memoize, cache_size)
+
+        if structure is None:
+            structure = analyze_structure(matrix)
+        if structure.determinant is not None:
+            return structure.determinant, 0.0
+        if structure.blocks is None:
+            return general_det(matrix, method, memoize, cache_size)
+
+        determinant = 1
+        parallel_code_exec_time = 0.0
+        for begin, end in structure.blocks:
+            block_determinant, block_parallel_code_exec_time = general_det(block_matrix(matrix, begin, end), method,
+                                                                           memoize, cache_size)
+            determinant *= block_determinant
+            parallel_code_exec_time += block_parallel_code_exec_time
+        return determinant, parallel_code_exec_time
+
+def general_det(matrix, method=LAPLACE_METHOD, memoize=False, cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Calculates the determinant of given matrix using the given method, without looking at its structure
+    (see det_serial).
+
+    Args:
+        matrix (list(list(float)): matrix for which the determinant is calculated.
+        method (string): one of METHODS
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        cache_size (int): maximum number of cached sub-minors, used only if memoize is True
+
+    Return:
+        value of the determinant and time spent executing code that can be parallelized ( (float, float) )
+    """
+    if method == LU_METHOD:
+        return lu_det([[float(el) for el in row] for row in matrix]), 0.0
+    if method == BAREISS_METHOD:
+        return bareiss_det([list(row) for row in matrix]), 0.0
+    if method == SPARSE_METHOD:
+        return sparse_det(matrix, Minor_cache(cache_size) if memoize else None), 0.0
+    if method == ITERATIVE_METHOD:
+        return iterative_det(matrix), 0.0
+
     n = len(matrix)
     cols = list([i for i in range(n)])
-    determinant, parallel_code_exec_time = minor_calc(matrix, 0, cols, measure_parallel_code=True)
+    if memoize:
+        determinant, parallel_code_exec_time = memo_minor_calc(matrix, 0, cols, Minor_cache(cache_size),
+                                                               measure_parallel_code=True)
+    else:
+        determinant, parallel_code_exec_time = minor_calc(matrix, 0, cols, measure_parallel_code=True)
     return determinant, parallel_code_exec_time
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+from array import array
+from multiprocessing import shared_memory
+
+FLOAT64_SIZE = 8
+
+class Shared_matrix_handle:
+    """
+    Small picklable description of a matrix placed in shared memory. It is sent to worker
+    processes instead of the matrix itself, which is then accessed without copying.
+
+    Attributes:
+        name (string): name of the shared memory block
+        offset (int): index of the first element of the matrix in the block, counted in float64 elements
+        order (int): order of the matrix
+    """
+
+    def __init__(self, name, offset, order):
+        self.name = name
+        self.offset = offset
+        self.order = order
+
+    def attach(self):
+        """
+        Attaches to the shared memory block, making the matrix accessible in the current process.
+
+        Return:
+            matrix backed by shared memory (Attached_matrix)
+        """
+        return Attached_matrix(self)
+
+class Attached_matrix:
+    """
+    Matrix backed by a shared memory block. Rows are zero-copy views of the block, so elements are
+    accessed in the same way as in a list of lists: matrix[row][col]. The matrix must be detached
+    when it is no longer used.
+
+    Attributes:
+        handle (Shared_matrix_handle): description of the shared matrix
+    """
+
+    def __init__(self, handle):
+        self.handle = handle
+        # worker processes share the resource tracker of the owner process, so attaching
+        # does not register the block a second time
+        self._shm = shared_memory.SharedMemory(name=handle.name)
+        n = handle.order
+        self._flat = self._shm.buf.cast('d')
+        begin = handle.offset
+        self._rows = [self._flat[begin + row * n:begin + (row + 1) * n] for row in range(n)]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, row):
+        return self._rows[row]
+
+    def detach(self):
+        """
+        Releases the views of the shared memory block and closes it in the current process.
+
+        Return:
+            None
+        """
+        for row in self._rows:
+            row.release()
+        self._rows = []
+        self._flat.release()
+        self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.detach()
+        return False
+
+class Shared_matrix:
+    """
+    Owner of a matrix copied once into a shared memory block as flat row-major float64 buffer.
+    Worker processes attach to the block using the handle, instead of receiving their own copy
+    of the matrix. The block is removed when the shared matrix is released (it can be used as
+    a context manager).
+
+    Attributes:
+        order (int): order of the matrix
+        handle (Shared_matrix_handle): picklable description of the matrix for worker processes
+    """
+
+    def __init__(self, matrix):
+        n = len(matrix)
+        self.order = n
+        # shared memory block can not be empty
+        self._shm = shared_memory.SharedMemory(create=True, size=max(1, n * n * FLOAT64_SIZE))
+        flat = self._shm.buf.cast('d')
+        for row_idx, row in enumerate(matrix):
+            flat[row_idx * n:(row_idx + 1) * n] = memoryview_of_floats(row)
+        flat.release()
+        self.handle = Shared_matrix_handle(self._shm.name, 0, n)
+
+    def release(self):
+        """
+        Closes and removes the shared memory block. Worker processes must detach before.
+
+        Return:
+            None
+        """
+        if self._shm is None:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+def memoryview_of_floats(values):
+    return memoryview(array('d', [float(value) for value in values]))
@@ -0,0 +1,208 @@
+from determinanat_calc.memo_det_calc import columns_to_mask
+
+def nonzero_masks(matrix):
+    """
+    Precomputes the positions of non-zero elements of a matrix as bitmasks, so the number of
+    non-zero elements of any row or column of any submatrix is a single popcount.
+
+    Args:
+        matrix (list(list(float))): matrix for which the masks are calculated
+
+    Return:
+        bitmasks of columns with non-zero elements for each row, and bitmasks of rows with non-zero
+        elements for each column ( (list(int), list(int)) )
+    """
+    n = len(matrix)
+    row_masks = [0] * n
+    col_masks = [0] * n
+    for row in range(n):
+        row_cols = matrix[row]
+        for col in range(n):
+            if row_cols[col] != 0:
+                row_masks[row] |= 1 << col
+                col_masks[col] |= 1 << row
+    return row_masks, col_masks
+
+def sparsest_line(rows_mask, cols_mask, row_masks, col_masks):
+    """
+    Chooses the row or column of a submatrix with the fewest non-zero elements, which gives the
+    Laplace expansion with the fewest minors. Rows are preferred over columns and lower indexes
+    over higher ones, so a dense matrix is expanded over its first row, like in minor_calc.
+
+    Args:
+        rows_mask (int): bitmask of rows of the submatrix
+        cols_mask (int): bitmask of columns of the submatrix
+        row_masks (list(int)): bitmasks of non-zero elements of rows (see nonzero_masks)
+        col_masks (list(int)): bitmasks of non-zero elements of columns (see nonzero_masks)
+
+    Return:
+        True if the line is a row, index of the line and bitmask of its non-zero elements
+        within the submatrix ( (bool, int, int) )
+    """
+    best = None
+    best_count = None
+    remaining = rows_mask
+    while remaining:
+        lowest = remaining & -remaining
+        remaining ^= lowest
+        row = lowest.bit_length() - 1
+        nonzeros = row_masks[row] & cols_mask
+        count = nonzeros.bit_count()
+        if best_count is None or count < best_count:
+            best, best_count = (True, row, nonzeros), count
+            if count == 0:
+                return best
+    remaining = cols_mask
+    while remaining:
+        lowest = remaining & -remaining
+        remaining ^= lowest
+        col = lowest.bit_length() - 1
+        nonzeros = col_masks[col] & rows_mask
+        count = nonzeros.bit_count()
+        if count < best_count:
+            best, best_count = (False, col, nonzeros), count
+            if count == 0:
+                return best
+    return best
+
+def expansion_terms(matrix, rows_mask, cols_mask, row_masks, col_masks):
+    """
+    Expands a submatrix over its sparsest line (see sparsest_line). Only non-zero elements of the
+    line give terms, minors multiplied by zero are not calculated at all.
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix
+        rows_mask (int): bitmask of rows of the submatrix
+        cols_mask (int): bitmask of columns of the submatrix
+        row_masks (list(int)): bitmasks of non-zero elements of rows (see nonzero_masks)
+        col_masks (list(int)): bitmasks of non-zero elements of columns (see nonzero_masks)
+
+    Return:
+        signed elements of the line and bitmasks of rows and columns of their minors
+        (list((float, int, int))), empty if the line contains only zeros
+    """
+    is_row, line, nonzeros = sparsest_line(rows_mask, cols_mask, row_masks, col_masks)
+    terms = []
+    if is_row:
+        # position of the row within the submatrix gives the sign of the first element
+        line_position = (rows_mask & ((1 << line) - 1)).bit_count()
+        minor_rows = rows_mask ^ (1 << line)
+        while nonzeros:
+            lowest = nonzeros & -nonzeros
+            nonzeros ^= lowest
+            col = lowest.bit_length() - 1
+            position = (cols_mask & (lowest - 1)).bit_count()
+            element = matrix[line][col]
+            terms.append((-element if (line_position + position) & 1 else element, minor_rows, cols_mask ^ lowest))
+    else:
+        line_position = (cols_mask & ((1 << line) - 1)).bit_count()
+        minor_cols = cols_mask ^ (1 << line)
+        while nonzeros:
+            lowest = nonzeros & -nonzeros
+            nonzeros ^= lowest
+            row = lowest.bit_length() - 1
+            position = (rows_mask & (lowest - 1)).bit_count()
+            element = matrix[row][line]
+            terms.append((-element if (line_position + position) & 1 else element, rows_mask ^ lowest, minor_cols))
+    return terms
+
+def _sparse_minor(matrix, rows_mask, cols_mask, row_masks, col_masks, cache):
+    if rows_mask & (rows_mask - 1) == 0:
+        return matrix[rows_mask.bit_length() - 1][cols_mask.bit_length() - 1]
+
+    if cache is not None:
+        cached = cache.get((rows_mask, cols_mask))
+        if cached is not None:
+            return cached
+
+    result = 0
+    for element, minor_rows, minor_cols in expansion_terms(matrix, rows_mask, cols_mask, row_masks, col_masks):
+        result += element * _sparse_minor(matrix, minor_rows, minor_cols, row_masks, col_masks, cache)
+
+    if cache is not None:
+        cache.put((rows_mask, cols_mask), result)
+    return result
+
+def sparse_minor_calc(matrix, row_indexes, column_indexes, cache=None, masks=None):
+    """
+    Calculates an arbitrary minor of given matrix using Laplace expansion which, at each level,
+    expands over the row or column with the most zeros and skips zero elements entirely. A line
+    with only zeros ends the branch with zero. For sparse and banded matrices this visits only
+    a small part of the n! terms of minor_calc, for dense matrices the result is the same as
+    the result of minor_calc. Positions of non-zero elements are precomputed once (see nonzero_masks).
+
+    Args:
+        matrix (list(list(float))): matrix containing the submatrix of the minor
+        row_indexes (list(int)): indexes of rows of the submatrix for the minor, in the original matrix
+        column_indexes (list(int)): indexes of columns of the submatrix for the minor, in the original matrix
+        cache (Minor_cache): if specified, sub-minors are cached in it, keyed by bitmasks of their rows and columns
+        masks ((list(int), list(int))): precomputed result of nonzero_masks for the matrix, calculated if not given
+
+    Return:
+        value of the given minor (float)
+    """
+    if len(row_indexes) != len(column_indexes):
+        raise Exception("Minor requires the same number of rows and columns, got {} rows and {} columns."
+                        .format(len(row_indexes), len(column_indexes)))
+    if not column_indexes:
+        return 1
+    row_masks, col_masks = masks if masks is not None else nonzero_masks(matrix)
+    return _sparse_minor(matrix, columns_to_mask(row_indexes), columns_to_mask(column_indexes),
+                         row_masks, col_masks, cache)
+
+def sparse_det(matrix, cache=None):
+    """
+    Calculates the determinant of given matrix using sparsity-aware Laplace expansion (see sparse_minor_calc).
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        cache (Minor_cache): if specified, sub-minors are cached in it
+
+    Return:
+        value of the determinant (float)
+    """
+    indexes = [i for i in range(len(matrix))]
+    return sparse_minor_calc(matrix, indexes, indexes, cache)
+
+def split_sparse_minors(matrix, split_depth, row_indexes=None, column_indexes=None):
+    """
+    Applies sparsity-aware Laplace expansion (see sparse_minor_calc) over split_depth levels.
+    Every non-zero product of chosen elements gives one minor and its coefficient, and the determinant
+    is the sum of coefficient * minor. Unlike parallel_det_calc.split_minors, the minors do not have
+    to consist of consecutive rows, and branches with zero coefficients are not included, so there
+    can be far fewer minors (none, if the determinant is zero because of a zero line).
+    A submatrix (e.g. a diagonal block) can be split instead of the whole matrix.
+
+    Args:
+        matrix (list(list(float)): matrix for which the determinant is calculated
+        split_depth (int): number of expansion levels used for splitting (k)
+        row_indexes (list(int)): indexes of rows of the submatrix to be split, all rows by default
+        column_indexes (list(int)): indexes of columns of the submatrix to be split, all columns by default
+
+    Return:
+        coefficients and indexes of rows and columns of the minors (list((float, list(int), list(int))))
+    """
+    n = len(matrix)
+    row_masks, col_masks = nonzero_masks(matrix)
+    splits = []
+
+    def expand(depth, rows_mask, cols_mask, coefficient):
+        if depth == split_depth:
+            splits.append((coefficient, mask_to_indexes(rows_mask), mask_to_indexes(cols_mask)))
+            return
+        for element, minor_rows, minor_cols in expansion_terms(matrix, rows_mask, cols_mask, row_masks, col_masks):
+            expand(depth + 1, minor_rows, minor_cols, coefficient * element)
+
+    all_mask = (1 << n) - 1
+    rows_mask = all_mask if row_indexes is None else columns_to_mask(row_indexes)
+    cols_mask = all_mask if column_indexes is None else columns_to_mask(column_indexes)
+    expand(0, rows_mask, cols_mask, 1)
+    return splits
+
+def mask_to_indexes(mask):
+    indexes = []
+    while mask:
+        lowest = mask & -mask
+        mask ^= lowest
+        indexes.append(lowest.bit_length() - 1)
+    return indexes
@@ -0,0 +1,181 @@
+from determinanat_calc import tracing
+from determinanat_calc.tracing import COMPUTE_CATEGORY
+
+# calculation paths chosen by the structure analysis
+GENERAL_PATH = "general"
+ZERO_LINE_PATH = "zero line"
+DUPLICATE_LINE_PATH = "duplicate line"
+DIAGONAL_PATH = "diagonal"
+TRIANGULAR_PATH = "triangular"
+PERMUTATION_PATH = "permutation"
+BLOCK_TRIANGULAR_PATH = "block triangular"
+BLOCK_DIAGONAL_PATH = "block diagonal"
+
+class Matrix_structure:
+    """
+    Result of the structure analysis of a matrix (see analyze_structure).
+
+    Attributes:
+        path (string): calculation path, one of the *_PATH constants
+        determinant (float): value of the determinant if the structure alone determines it, None otherwise
+        blocks (list((int, int))): begin (inclusive) and end (exclusive) index of rows and columns of each
+        diagonal block if the matrix is block triangular, None otherwise
+    """
+
+    def __init__(self, path, determinant=None, blocks=None):
+        self.path = path
+        self.determinant = determinant
+        self.blocks = blocks
+
+    def description(self):
+        if self.blocks is not None:
+            return "{} ({} blocks of orders {})".format(self.path, len(self.blocks),
+                                                        ", ".join(str(end - begin) for begin, end in self.blocks))
+        return self.path
+
+def permutation_sign(permutation):
+    """
+    Calculates the sign of a permutation from the lengths of its cycles.
+
+    Args:
+        permutation (list(int)): image of each index
+
+    Return:
+        1 for even and -1 for odd permutation (int)
+    """
+    sign = 1
+    visited = [False] * len(permutation)
+    for start in range(len(permutation)):
+        if visited[start]:
+            continue
+        idx = start
+        cycle_length = 0
+        while not visited[idx]:
+            visited[idx] = True
+            idx = permutation[idx]
+            cycle_length += 1
+        if cycle_length % 2 == 0:
+            sign = -sign
+    return sign
+
+def diagonal_product(matrix, begin=0, end=None):
+    result = 1
+    for i in range(begin, len(matrix) if end is None else end):
+        result *= matrix[i][i]
+    return result
+
+def block_boundaries(first_nonzero_cols, last_nonzero_cols):
+    """
+    Finds the indexes k which split the matrix into diagonal blocks [0, k) and [k, n) with a zero
+    off-diagonal block. For block upper triangular matrices the rows k..n-1 have no non-zero elements
+    in the first k columns, which is checked for all k at once using suffix minimums of the first
+    non-zero column of rows. Block lower triangular matrices are checked using prefix maximums of the
+    last non-zero column of rows.
+
+    Args:
+        first_nonzero_cols (list(int)): index of the first non-zero column of each row
+        last_nonzero_cols (list(int)): index of the last non-zero column of each row
+
+    Return:
+        split indexes of block upper triangular and of block lower triangular structure ( (list(int), list(int)) )
+    """
+    n = len(first_nonzero_cols)
+    upper_splits = []
+    suffix_min = n
+    for k in range(n - 1, 0, -1):
+        suffix_min = min(suffix_min, first_nonzero_cols[k])
+        if suffix_min >= k:
+            upper_splits.append(k)
+    upper_splits.reverse()
+
+    lower_splits = []
+    prefix_max = -1
+    for k in range(1, n):
+        prefix_max = max(prefix_max, last_nonzero_cols[k - 1])
+        if prefix_max < k:
+            lower_splits.append(k)
+    return upper_splits, lower_splits
+
+def analyze_structure(matrix):
+    """
+    Detects structure of a matrix which makes its determinant cheap to calculate, in O(n^2) time:
+        1. a row or column of zeros, or two equal rows or columns: the determinant is zero
+        2. one non-zero element in every row and column (permutation-like matrix): the determinant is
+        the product of these elements with the sign of the permutation
+        3. diagonal or triangular matrix: the determinant is the product of the diagonal
+        4. block triangular (or block diagonal) matrix with consecutive diagonal blocks: the determinant
+        is the product of determinants of the diagonal blocks, which can be calculated independently
+    If no structure is found, the general path is returned.
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+
+    Return:
+        chosen calculation path, with the determinant or the blocks if they are known (Matrix_structure)
+    """
+    with tracing.span("analyze structure", COMPUTE_CATEGORY):
+        return _analyze_structure(matrix)
+
+def _analyze_structure(matrix):
+    n = len(matrix)
+    if n < 2:
+        return Matrix_structure(GENERAL_PATH)
+
+    first_nonzero_cols = [n] * n
+    last_nonzero_cols = [-1] * n
+    nonzeros_in_rows = [0] * n
+    nonzeros_in_cols = [0] * n
+    for row in range(n):
+        row_cols = matrix[row]
+        for col in range(n):
+            if row_cols[col] != 0:
+                if first_nonzero_cols[row] == n:
+                    first_nonzero_cols[row] = col
+                last_nonzero_cols[row] = col
+                nonzeros_in_rows[row] += 1
+                nonzeros_in_cols[col] += 1
+
+    if 0 in nonzeros_in_rows or 0 in nonzeros_in_cols:
+        return Matrix_structure(ZERO_LINE_PATH, 0)
+
+    if all(count == 1 for count in nonzeros_in_rows):
+        # no zero column, so the non-zero elements are in distinct columns
+        permutation = first_nonzero_cols
+        determinant = permutation_sign(permutation)
+        for row in range(n):
+            determinant *= matrix[row][permutation[row]]
+        path = DIAGONAL_PATH if all(permutation[row] == row for row in range(n)) else PERMUTATION_PATH
+        return Matrix_structure(path, determinant)
+
+    upper_triangular = all(first_nonzero_cols[row] >= row for row in range(n))
+    lower_triangular = all(last_nonzero_cols[row] <= row for row in range(n))
+    if upper_triangular or lower_triangular:
+        return Matrix_structure(TRIANGULAR_PATH, diagonal_product(matrix))
+
+    if len(set(tuple(row) for row in matrix)) < n or len(set(zip(*matrix))) < n:
+        return Matrix_structure(DUPLICATE_LINE_PATH, 0)
+
+    upper_splits, lower_splits = block_boundaries(first_nonzero_cols, last_nonzero_cols)
+    if not upper_splits and not lower_splits:
+        return Matrix_structure(GENERAL_PATH)
+    # the structure which gives more (smaller) blocks is used
+    splits = upper_splits if len(upper_splits) >= len(lower_splits) else lower_splits
+    path = BLOCK_DIAGONAL_PATH if upper_splits == lower_splits else BLOCK_TRIANGULAR_PATH
+
+    boundaries = [0] + splits + [n]
+    blocks = [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)]
+    return Matrix_structure(path, blocks=blocks)
+
+def block_matrix(matrix, begin, end):
+    """
+    Copies a diagonal block of the matrix.
+
+    Args:
+        matrix (list(list(float))): original matrix
+        begin (int): index of the first row and column of the block
+        end (int): index after the last row and column of the block
+
+    Return:
+        copy of the block (list(list(float)))
+    """
+    return [[matrix[row][col] for col in range(begin, end)] for row in range(begin, end)]
@@ -0,0 +1,235 @@
+import json
+import os
+import threading
+import time
+
+# categories of recorded spans
+SPAWN_CATEGORY = "spawn"
+TRANSFER_CATEGORY = "transfer"
+COMPUTE_CATEGORY = "compute"
+WAIT_CATEGORY = "wait"
+REDUCE_CATEGORY = "reduce"
+
+# tracer of the current process, None when tracing is disabled
+_tracer = None
+
+class Trace_span:
+    """
+    Context manager which records the time between entering and exiting it as a span of the tracer.
+
+    Attributes:
+        tracer (Tracer): tracer which records the span
+        name (string): name of the span, e.g. minor
+        category (string): category of the span, one of the *_CATEGORY constants
+        args (dict): additional information about the span, shown in the trace viewer
+    """
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start_us = 0.0
+
+    def __enter__(self):
+        self._start_us = time.perf_counter_ns() / 1000
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_us = time.perf_counter_ns() / 1000
+        self.tracer.record(self.name, self.category, self._start_us, end_us - self._start_us, self.args)
+        return False
+
+class Disabled_span:
+    """
+    Context manager returned by span when tracing is disabled, it records nothing.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_DISABLED_SPAN = Disabled_span()
+
+class Tracer:
+    """
+    Records spans of one or more processes as Chrome trace events (complete events, "ph": "X"),
+    which can be opened in chrome://tracing or https://ui.perfetto.dev. Spans of worker processes
+    are recorded by their own tracers and merged into the tracer of the main process (see add_events).
+    Times are taken from time.perf_counter, which uses the same monotonic clock in all processes.
+
+    Attributes:
+        process_name (string): name of the process shown in the trace viewer
+        events (list(dict)): recorded events
+    """
+
+    def __init__(self, process_name="main"):
+        self.process_name = process_name
+        self.events = []
+        self._pid = os.getpid()
+
+    def span(self, name, category, **args):
+        return Trace_span(self, name, category, args)
+
+    def record(self, name, category, start_us, duration_us, args=None):
+        self.events.append({"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": duration_us,
+                            "pid": self._pid, "tid": threading.get_ident(), "args": args or {}})
+
+    def add_events(self, events):
+        """
+        Merges the events recorded by another tracer (usually of a worker process). The name of the
+        process is kept only for other processes, so worker code executed by the current process does
+        not rename it.
+
+        Args:
+            events (list(dict)): events returned by Tracer.take_events
+
+        Return:
+            None
+        """
+        self.events.extend(event for event in events if event["ph"] != "M" or event["pid"] != self._pid)
+
+    def take_events(self):
+        """
+        Returns recorded events, together with the name of the process, and clears them.
+
+        Return:
+            recorded events (list(dict))
+        """
+        events = self.events
+        events.append({"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                       "args": {"name": "{} ({})".format(self.process_name, self._pid)}})
+        self.events = []
+        return events
+
+    def export_chrome_trace(self, trace_file_path):
+        """
+        Writes recorded events into a JSON file in Chrome trace event format.
+
+        Args:
+            trace_file_path (string): path of the trace file to be created
+
+        Return:
+            None
+        """
+        events = list(self.events)
+        events.append({"name": "process_name", "ph": "M", "pid": self._pid, "tid": 0,
+                       "args": {"name": "{} ({})".format(self.process_name, self._pid)}})
+        with open(trace_file_path, 'w') as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def summary(self):
+        """
+        Creates a table with the number of spans, total, mean and maximum duration of spans with the
+        same category and name, followed by the number of minors and the time spent calculating them
+        for each process, which shows how evenly the work was balanced.
+
+        Return:
+            summary table (string)
+        """
+        spans = {}
+        processes = {}
+        for event in self.events:
+            if event["ph"] != "X":
+                continue
+            durations = spans.setdefault((event["cat"], event["name"]), [])
+            durations.append(event["dur"] / 1000)
+            if event["cat"] == COMPUTE_CATEGORY and event["name"] == "minor":
+                process = processes.setdefault(event["pid"], [0, 0.0])
+                process[0] += 1
+                process[1] += event["dur"] / 1000
+
+        lines = ["{:<10} {:<20} {:>8} {:>12} {:>12} {:>12}"
+                 .format("category", "span", "count", "total_ms", "mean_ms", "max_ms")]
+        for (category, name), durations in sorted(spans.items()):
+            lines.append("{:<10} {:<20} {:>8} {:>12.3f} {:>12.3f} {:>12.3f}"
+                         .format(category, name, len(durations), sum(durations), sum(durations) / len(durations),
+                                 max(durations)))
+        lines.append("")
+        lines.append("{:<10} {:>8} {:>12}".format("pid", "minors", "compute_ms"))
+        for pid, (count, total_ms) in sorted(processes.items()):
+            lines.append("{:<10} {:>8} {:>12.3f}".format(pid, count, total_ms))
+        return "\n".join(lines)
+
+def enable_tracing(process_name="main"):
+    """
+    Starts recording spans in the current process. Spans are recorded only while tracing is enabled,
+    otherwise span returns a context manager which does nothing.
+
+    Args:
+        process_name (string): name of the process shown in the trace viewer
+
+    Return:
+        tracer which records the spans (Tracer)
+    """
+    global _tracer
+    _tracer = Tracer(process_name)
+    return _tracer
+
+def disable_tracing():
+    """
+    Stops recording spans in the current process.
+
+    Return:
+        tracer which recorded the spans, None if tracing was not enabled (Tracer)
+    """
+    global _tracer
+    tracer = _tracer
+    _tracer = None
+    return tracer
+
+def active_tracer():
+    return _tracer
+
+def is_tracing():
+    return _tracer is not None
+
+def span(name, category, **args):
+    """
+    Returns a context manager which records the enclosed code as a span of the active tracer.
+    When tracing is disabled, a shared context manager which does nothing is returned.
+
+    Args:
+        name (string): name of the span
+        category (string): category of the span, one of the *_CATEGORY constants
+        args: additional information about the span, shown in the trace viewer
+
+    Return:
+        context manager (Trace_span|Disabled_span)
+    """
+    if _tracer is None:
+        return _DISABLED_SPAN
+    return Trace_span(_tracer, name, category, args)
+
+def start_worker_tracing(process_name="worker"):
+    """
+    Starts recording spans of a worker into a separate tracer, whose events are later sent
+    to the main process. The previously active tracer is returned, so it can be restored.
+
+    Args:
+        process_name (string): name of the process shown in the trace viewer
+
+    Return:
+        previously active tracer, None if tracing was disabled (Tracer)
+    """
+    global _tracer
+    previous_tracer = _tracer
+    _tracer = Tracer(process_name)
+    return previous_tracer
+
+def finish_worker_tracing(previous_tracer):
+    """
+    Stops recording spans of a worker and restores the previously active tracer.
+
+    Args:
+        previous_tracer (Tracer): tracer returned by start_worker_tracing
+
+    Return:
+        events recorded by the worker (list(dict))
+    """
+    global _tracer
+    events = _tracer.take_events()
+    _tracer = previous_tracer
+    return events
@@ -13,9 +13,9 @@ def measure_exec_time(decorated_func):
     """
 
     def decorator(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = decorated_func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.perf_counter()
         exec_time_ms = (end_time - start_time) * 1000
         try:
             ret = []
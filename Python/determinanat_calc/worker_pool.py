@@ -0,0 +1,144 @@
+import multiprocessing
+from multiprocessing import resource_tracker
+import time
+
+# queue of tasks of the pool, in each worker process
+_task_queue = None
+
+def _init_worker(task_queue):
+    global _task_queue
+    _task_queue = task_queue
+
+def _warm_up(worker_idx):
+    return worker_idx
+
+def worker_task_queue():
+    """
+    Returns the task queue of the Worker_pool which runs the current worker process.
+
+    Return:
+        queue shared by the pool and its workers (multiprocessing.Queue)
+    """
+    return _task_queue
+
+class Worker_pool:
+    """
+    Long-lived pool of worker processes to which parallel determinant calculation submits minor
+    calculation tasks. Starting processes is expensive compared to calculating minors of small
+    matrices, so a pool is started once and reused for many det_parallel calls. The pool is used
+    as a context manager: processes are started when entering and stopped when leaving the block.
+    Time spent starting the processes is measured separately from the calculations.
+    The pool owns a queue shared with all its workers, from which they take tasks dynamically.
+    A pool must not be used by several calculations at the same time.
+
+    Attributes:
+        size (int): number of worker processes, by default the number of available CPUs
+        start_method (string): multiprocessing start method (fork, spawn or forkserver), by default
+        the platform default is used
+        warmup_time_ms (float): time in milliseconds spent starting the workers and waiting for
+        each of them to become ready
+        task_queue (multiprocessing.Queue): queue of tasks shared with the workers, None if the pool is not started
+    """
+
+    def __init__(self, size=None, start_method=None):
+        self.size = size if size is not None else multiprocessing.cpu_count()
+        if self.size < 1:
+            raise Exception("Worker pool size must be positive, got {}.".format(self.size))
+        self.start_method = start_method
+        self.warmup_time_ms = 0.0
+        self.task_queue = None
+        self._pool = None
+
+    def start(self):
+        """
+        Starts the worker processes and waits until all of them are ready to accept tasks.
+
+        Return:
+            None
+        """
+        if self._pool is not None:
+            return
+        start_time = time.perf_counter()
+        # workers must share the resource tracker of this process, otherwise shared memory blocks
+        # they attach to (see shared_matrix) would be tracked and reported as leaked by each worker
+        resource_tracker.ensure_running()
+        context = multiprocessing.get_context(self.start_method)
+        self.task_queue = context.Queue()
+        self._pool = context.Pool(self.size, initializer=_init_worker, initargs=(self.task_queue, ))
+        # one trivial task per worker, so that imports and process start-up are not measured later
+        self._pool.map(_warm_up, range(self.size), chunksize=1)
+        end_time = time.perf_counter()
+        self.warmup_time_ms = (end_time - start_time) * 1000
+
+    def close(self):
+        """
+        Waits for submitted tasks to finish and stops the worker processes.
+
+        Return:
+            None
+        """
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        self.task_queue = None
+
+    def terminate(self):
+        """
+        Stops the worker processes immediately, without waiting for submitted tasks.
+
+        Return:
+            None
+        """
+        if self._pool is None:
+            return
+        self._pool.terminate()
+        self._pool.join()
+        self._pool = None
+        self.task_queue = None
+
+    def starmap(self, func, args_list):
+        """
+        Calls the given function in worker processes once for each tuple of arguments
+        and waits for all the results.
+
+        Args:
+            func (function): function to be called, it must be importable by worker processes
+            args_list (list(tuple)): arguments for each call
+
+        Return:
+            results of the calls in the same order as the arguments (list)
+        """
+        if self._pool is None:
+            raise Exception("Worker pool is not started.")
+        return self._pool.starmap(func, args_list, chunksize=1)
+
+    def apply_async(self, func, args, callback=None, error_callback=None):
+        """
+        Calls the given function in a worker process without waiting for the result. Callbacks are
+        called in a thread of the current process when the call finishes.
+
+        Args:
+            func (function): function to be called, it must be importable by worker processes
+            args (tuple): arguments of the call
+            callback (function): called with the result of the call
+            error_callback (function): called with the exception if the call fails
+
+        Return:
+            result of the call, which can be waited for (multiprocessing.pool.AsyncResult)
+        """
+        if self._pool is None:
+            raise Exception("Worker pool is not started.")
+        return self._pool.apply_async(func, args, callback=callback, error_callback=error_callback)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
+        return False
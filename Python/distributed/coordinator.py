@@ -0,0 +1,248 @@
+import argparse
+import ipaddress
+import multiprocessing
+import secrets
+import threading
+import time
+from multiprocessing.managers import BaseManager
+
+from IO.matrix_reader import read_matrix
+from determinanat_calc.memo_det_calc import DEFAULT_CACHE_SIZE
+from determinanat_calc.parallel_det_calc import split_plan
+from determinanat_calc.serial_det_calc import check_method, METHODS, LAPLACE_METHOD
+from distributed.det_worker import run_worker, DEFAULT_HEARTBEAT_INTERVAL, DEFAULT_AUTHKEY
+from distributed.task_board import Task_board, DEFAULT_LEASE_TIMEOUT, WORKER_METHODS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+DEFAULT_SPLIT_DEPTH = 2
+
+# task board of the coordinator running in the current process
+_task_board = None
+
+def _get_task_board():
+    return _task_board
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+class Coordinator_manager(BaseManager):
+    """
+    Manager which serves the task board of the coordinator to workers.
+    """
+
+Coordinator_manager.register("task_board", callable=_get_task_board, exposed=WORKER_METHODS)
+
+class Det_coordinator:
+    """
+    Coordinator of determinant calculation on several hosts. It serves a task board (see task_board.Task_board)
+    through a multiprocessing manager listening on a TCP address, and workers started on any host
+    (see det_worker.run_worker) connect to it. The determinant is split into minors like in parallel
+    implementation (see parallel_det_calc.split_plan), the minors are put on the board and workers
+    take them one by one, so faster hosts calculate more minors. Each worker gets the matrix only
+    once per determinant, tasks only hold indexes of rows and columns of the minors. Workers which
+    stop sending heartbeats are considered lost and their minors are given to other workers.
+    The coordinator is used as a context manager: the server is started when entering the block and
+    workers are told to exit when leaving it. Only one coordinator can run in a process.
+    Workers send pickled data, so anyone who knows the key can run code on the coordinator. The public
+    default key (det_worker.DEFAULT_AUTHKEY) is used only on a loopback address, on other addresses
+    a random key is generated unless a key is given.
+
+    Attributes:
+        address ((string, int)): host and port the server listens on, port 0 selects a free port
+        authkey (bytes): key which workers need to connect
+        generated_authkey (bool): whether the key was generated, so it has to be given to workers
+        board (Task_board): task board shared with the workers
+    """
+
+    def __init__(self, address=(DEFAULT_HOST, DEFAULT_PORT), authkey=None, lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        self.address = address
+        self.generated_authkey = authkey is None and not is_loopback(address[0])
+        if authkey is None:
+            authkey = secrets.token_hex(16) if self.generated_authkey else DEFAULT_AUTHKEY
+        self.authkey = authkey.encode("utf-8") if isinstance(authkey, str) else authkey
+        if self.authkey == DEFAULT_AUTHKEY.encode("utf-8") and not is_loopback(address[0]):
+            raise Exception("The default key can be used only on a loopback address, {} requires another key."
+                            .format(address[0]))
+        self.board = Task_board(lease_timeout)
+        self._server = None
+        self._local_workers = []
+
+    def start(self):
+        """
+        Starts serving the task board in a background thread.
+
+        Return:
+            None
+        """
+        global _task_board
+        if self._server is not None:
+            return
+        if _task_board is not None:
+            raise Exception("A coordinator is already running in this process.")
+        _task_board = self.board
+        manager = Coordinator_manager(address=self.address, authkey=self.authkey)
+        self._server = manager.get_server()
+        self.address = self._server.address
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        """
+        Tells all workers to exit, waits for local workers and stops serving the task board.
+
+        Return:
+            None
+        """
+        global _task_board
+        if self._server is None:
+            return
+        self.board.stop()
+        for process in self._local_workers:
+            process.join()
+        self._local_workers = []
+        stop_event = getattr(self._server, "stop_event", None)
+        if stop_event is not None:
+            stop_event.set()
+        self._server = None
+        _task_board = None
+
+    def start_local_workers(self, workers_num, heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL):
+        """
+        Starts workers in processes of this host, which connect to the coordinator like remote workers.
+        Useful for testing.
+
+        Args:
+            workers_num (int): number of worker processes
+            heartbeat_interval (float): seconds between two heartbeats of a worker
+
+        Return:
+            started processes (list(multiprocessing.Process))
+        """
+        processes = []
+        for _ in range(workers_num):
+            process = multiprocessing.Process(target=run_worker, args=(self.address, self.authkey, heartbeat_interval))
+            process.start()
+            processes.append(process)
+        self._local_workers.extend(processes)
+        return processes
+
+    def det(self, matrix, method=LAPLACE_METHOD, memoize=False, cache_size=DEFAULT_CACHE_SIZE,
+            split_depth=DEFAULT_SPLIT_DEPTH, use_structure=True, timeout=None):
+        """
+        Calculates the determinant of given matrix using the connected workers. The minors are
+        put on the task board and the call waits until all of them are calculated, putting back
+        the minors of lost workers, and then reduces them to the determinant.
+
+        Args:
+            matrix (list(list(float)): matrix for which the determinant is calculated
+            method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+            memoize (bool): if true, Laplace expansion in each worker caches and reuses calculated sub-minors
+            cache_size (int): maximum number of cached sub-minors per worker, used only if memoize is True
+            split_depth (int): number of first rows used for splitting the determinant into minors
+            use_structure (bool): if true, structure of the matrix is used to shorten the calculation
+            timeout (float): maximum time to wait for the minors in seconds, no limit by default
+
+        Return:
+            value of the determinant (float)
+        """
+        check_method(method)
+        if split_depth < 1:
+            raise Exception("Split depth must be positive, got {}.".format(split_depth))
+        if self._server is None:
+            raise Exception("Coordinator is not started.")
+        if len(matrix) == 1:
+            return matrix[0][0]
+
+        plan = split_plan(matrix, method, split_depth, use_structure)
+        if plan.determinant is not None:
+            return plan.determinant
+        tasks = [(begin_row_index, minor_rows, minor_cols)
+                 for _, _, begin_row_index, minor_rows, minor_cols in plan.splits]
+        if not tasks:
+            return plan.reduce([])
+
+        job_id = self.board.add_job([list(row) for row in matrix], method, memoize, cache_size, tasks)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            # leases are checked a few times per lease timeout
+            check_interval = self.board.lease_timeout / 4
+            while not self.board.wait_job(job_id, check_interval):
+                self.board.requeue_expired()
+                if deadline is not None and time.monotonic() > deadline:
+                    raise Exception("Minors were not calculated in {} seconds.".format(timeout))
+        finally:
+            job = self.board.remove_job(job_id)
+        if job.error is not None:
+            raise Exception(job.error)
+        return plan.reduce(job.results)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def parse_address(address):
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Calculates determinants of given matrices using workers "
+                                                 "on several hosts.")
+    parser.add_argument("matrix_files", nargs="+", help="paths of text files containing the matrices")
+    parser.add_argument("--address", default="{}:{}".format(DEFAULT_HOST, DEFAULT_PORT),
+                        help="host:port the coordinator listens on (default: {}:{})".format(DEFAULT_HOST, DEFAULT_PORT))
+    parser.add_argument("--authkey", default=None,
+                        help="key which workers need to connect (default: {} on a loopback address, otherwise "
+                             "a random key, which is printed)".format(DEFAULT_AUTHKEY))
+    parser.add_argument("--local-workers", type=int, default=0,
+                        help="number of workers started on this host (default: 0, only remote workers)")
+    parser.add_argument("--method", choices=METHODS, default=LAPLACE_METHOD,
+                        help="method used to calculate minors (default: laplace)")
+    parser.add_argument("--memoize", action="store_true",
+                        help="cache and reuse calculated sub-minors in Laplace expansion")
+    parser.add_argument("--split-depth", type=int, default=DEFAULT_SPLIT_DEPTH,
+                        help="number of first rows used for splitting the determinant into minors (default: {})"
+                        .format(DEFAULT_SPLIT_DEPTH))
+    parser.add_argument("--lease-timeout", type=float, default=DEFAULT_LEASE_TIMEOUT,
+                        help="seconds without heartbeat after which a worker is considered lost (default: {})"
+                        .format(DEFAULT_LEASE_TIMEOUT))
+    return parser.parse_args()
+
+def coordinate():
+    """
+    Starts the coordinator and calculates determinants of matrices from given files using workers
+    which connect to it (python -m distributed.det_worker --address host:port on each host), or
+    workers started on this host with option --local-workers.
+
+    Return:
+        None
+    """
+    arguments = parse_arguments()
+    with Det_coordinator(parse_address(arguments.address), arguments.authkey, arguments.lease_timeout) as coordinator:
+        print("Coordinator listening on {}:{}.".format(*coordinator.address))
+        if coordinator.generated_authkey:
+            print("Workers connect with: python -m distributed.det_worker --address {}:{} --authkey {}"
+                  .format(coordinator.address[0], coordinator.address[1], coordinator.authkey.decode("utf-8")))
+        coordinator.start_local_workers(arguments.local_workers)
+        for matrix_file in arguments.matrix_files:
+            matrix = read_matrix(matrix_file)
+            start_time = time.perf_counter()
+            determinant = coordinator.det(matrix, arguments.method, arguments.memoize,
+                                          split_depth=arguments.split_depth)
+            end_time = time.perf_counter()
+            print("det({}) = {}, calculated by {} workers in {:.3f} ms."
+                  .format(matrix_file, determinant, len(coordinator.board.workers), (end_time - start_time) * 1000))
+        if coordinator.board.requeued:
+            print("{} tasks were put back to the board after losing workers.".format(coordinator.board.requeued))
+
+
+if __name__ == "__main__":
+    coordinate()
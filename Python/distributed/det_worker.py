@@ -0,0 +1,106 @@
+import argparse
+import os
+import socket
+import threading
+from multiprocessing.managers import BaseManager
+
+from determinanat_calc.memo_det_calc import Minor_cache
+from determinanat_calc.serial_det_calc import method_minor_calc, LAPLACE_METHOD, SPARSE_METHOD
+from distributed.task_board import STOP
+
+DEFAULT_HEARTBEAT_INTERVAL = 1.0
+DEFAULT_AUTHKEY = "determinant"
+
+class Worker_manager(BaseManager):
+    """
+    Manager which connects to the task board served by the coordinator.
+    """
+
+Worker_manager.register("task_board")
+
+def send_heartbeats(board, worker_id, interval, stopped):
+    # runs in its own thread, so leases are kept while a long minor is calculated
+    while not stopped.wait(interval):
+        try:
+            if not board.heartbeat(worker_id):
+                return
+        except (OSError, EOFError):
+            return
+
+def run_worker(address, authkey, heartbeat_interval=DEFAULT_HEARTBEAT_INTERVAL):
+    """
+    Connects to the coordinator (see coordinator.Det_coordinator) and calculates minors taken from
+    its task board until the coordinator tells it to exit. The matrix of each determinant is
+    fetched once, when the first of its minors is taken. A heartbeat is sent from another thread
+    every heartbeat_interval seconds, so the coordinator can tell a busy worker from a lost one.
+
+    Args:
+        address ((string, int)): host and port of the coordinator
+        authkey (bytes): key required by the coordinator
+        heartbeat_interval (float): seconds between two heartbeats
+
+    Return:
+        number of calculated minors (int)
+    """
+    manager = Worker_manager(address=address, authkey=authkey)
+    manager.connect()
+    board = manager.task_board()
+    worker_id = board.register_worker("{}/{}".format(socket.gethostname(), os.getpid()))
+
+    stopped = threading.Event()
+    heartbeat_thread = threading.Thread(target=send_heartbeats, args=(board, worker_id, heartbeat_interval, stopped),
+                                        daemon=True)
+    heartbeat_thread.start()
+
+    # matrix and calculation parameters of the current job, with the cache of sub-minors
+    job_id = None
+    job = None
+    cache = None
+    calculated_minors = 0
+    try:
+        while True:
+            task = board.take_task(worker_id)
+            if task == STOP:
+                break
+            if task is None:
+                continue
+            task_job_id, task_idx, begin_row_index, row_indexes, column_indexes = task
+            if task_job_id != job_id:
+                job_id = task_job_id
+                job = board.job_matrix(job_id)
+                if job is None:
+                    continue
+                _, method, memoize, cache_size = job
+                cache = Minor_cache(cache_size) if memoize and method in (LAPLACE_METHOD, SPARSE_METHOD) else None
+            if job is None:
+                continue
+            matrix, method, _, _ = job
+            try:
+                value = method_minor_calc(matrix, begin_row_index, column_indexes, method, cache, row_indexes)
+            except Exception as error:
+                board.fail_task(worker_id, job_id, task_idx, str(error))
+                continue
+            board.complete_task(worker_id, job_id, task_idx, value)
+            calculated_minors += 1
+    except (OSError, EOFError):
+        # the coordinator is gone
+        pass
+    finally:
+        stopped.set()
+    return calculated_minors
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Calculates minors for a determinant coordinator.")
+    parser.add_argument("--address", required=True, help="host:port of the coordinator")
+    parser.add_argument("--authkey", default=DEFAULT_AUTHKEY,
+                        help="key required by the coordinator (default: key of a coordinator on a loopback address)")
+    parser.add_argument("--heartbeat-interval", type=float, default=DEFAULT_HEARTBEAT_INTERVAL,
+                        help="seconds between two heartbeats (default: {})".format(DEFAULT_HEARTBEAT_INTERVAL))
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    host, _, port = arguments.address.rpartition(":")
+    minors_num = run_worker((host, int(port)), arguments.authkey.encode("utf-8"), arguments.heartbeat_interval)
+    print("Calculated {} minors.".format(minors_num))
@@ -0,0 +1,274 @@
+import collections
+import threading
+import time
+
+# seconds after the last heartbeat of a worker when its tasks are given to other workers
+DEFAULT_LEASE_TIMEOUT = 5.0
+# seconds a worker waits for a task before asking again
+DEFAULT_TAKE_TIMEOUT = 1.0
+# returned by take_task when the coordinator is stopping and the worker should exit
+STOP = "stop"
+# methods of the board which are called remotely by workers
+WORKER_METHODS = ["register_worker", "heartbeat", "job_matrix", "take_task", "complete_task", "fail_task"]
+
+class Job:
+    """
+    Determinant calculation submitted to the task board: a matrix and the minors which are calculated by workers.
+
+    Attributes:
+        job_id (int): identifier of the job
+        matrix (list(list(float))): matrix containing the minors, shipped once to each worker
+        method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion in each worker caches and reuses calculated sub-minors
+        cache_size (int): maximum number of cached sub-minors per worker
+        tasks (list((int, list(int), list(int)))): for each minor, index of its first row, indexes
+        of its rows (or None) and indexes of its columns
+        results (list(float)): values of calculated minors, None for minors which are not calculated yet
+        remaining (int): number of minors which are not calculated yet
+        error (string): error message if calculation of a minor failed, None otherwise
+    """
+
+    def __init__(self, job_id, matrix, method, memoize, cache_size, tasks):
+        self.job_id = job_id
+        self.matrix = matrix
+        self.method = method
+        self.memoize = memoize
+        self.cache_size = cache_size
+        self.tasks = tasks
+        self.results = [None] * len(tasks)
+        self.remaining = len(tasks)
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.remaining == 0 or self.error is not None
+
+class Task_board:
+    """
+    Board of minor calculation tasks, shared by the coordinator with workers on other hosts
+    (see coordinator.Det_coordinator). Workers take tasks one by one, so workers which finish sooner
+    take more of them. A taken task is leased to the worker: while the worker sends heartbeats the
+    lease is kept, and when no heartbeat arrives for lease_timeout seconds the worker is considered
+    lost and its tasks are put back to the board (see requeue_expired). A task may therefore be
+    calculated twice, the first result is kept.
+    All methods are called from threads of the manager server, so the board is guarded by a lock.
+
+    Attributes:
+        lease_timeout (float): seconds after the last heartbeat when a worker is considered lost
+        workers (dict): time of the last heartbeat of each registered worker, by worker identifier
+        requeued (int): number of tasks put back to the board because their worker was lost
+    """
+
+    def __init__(self, lease_timeout=DEFAULT_LEASE_TIMEOUT):
+        self.lease_timeout = lease_timeout
+        self.workers = {}
+        self.requeued = 0
+        self._jobs = {}
+        self._pending = collections.deque()
+        # (job_id, task_idx) -> worker_id
+        self._leases = {}
+        self._next_worker_id = 0
+        self._next_job_id = 0
+        self._stopping = False
+        self._condition = threading.Condition()
+
+    def register_worker(self, name):
+        """
+        Registers a new worker.
+
+        Args:
+            name (string): description of the worker, e.g. its host and process id
+
+        Return:
+            identifier of the worker (int)
+        """
+        with self._condition:
+            worker_id = self._next_worker_id
+            self._next_worker_id += 1
+            self.workers[worker_id] = time.monotonic()
+            print("Worker {} registered: {}.".format(worker_id, name))
+            return worker_id
+
+    def heartbeat(self, worker_id):
+        """
+        Renews the leases of all tasks taken by the worker.
+
+        Args:
+            worker_id (int): identifier of the worker
+
+        Return:
+            False if the coordinator is stopping, True otherwise (bool)
+        """
+        with self._condition:
+            self.workers[worker_id] = time.monotonic()
+            return not self._stopping
+
+    def job_matrix(self, job_id):
+        """
+        Returns the matrix of a job with the parameters of the calculation. Workers call it once per job.
+
+        Args:
+            job_id (int): identifier of the job
+
+        Return:
+            matrix, method, memoize and cache size, or None if the job is finished
+            ( (list(list(float)), string, bool, int) )
+        """
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            return job.matrix, job.method, job.memoize, job.cache_size
+
+    def take_task(self, worker_id, timeout=DEFAULT_TAKE_TIMEOUT):
+        """
+        Takes the next task from the board, waiting at most timeout seconds for one.
+
+        Args:
+            worker_id (int): identifier of the worker taking the task
+            timeout (float): maximum time to wait for a task in seconds
+
+        Return:
+            identifier of the job, index of the minor, index of its first row, indexes of its rows and
+            indexes of its columns, None if there is no task, or STOP if the worker should exit
+            ( (int, int, int, list(int), list(int)) )
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._stopping:
+                    return STOP
+                self.workers[worker_id] = time.monotonic()
+                while self._pending:
+                    job_id, task_idx = self._pending.popleft()
+                    job = self._jobs.get(job_id)
+                    if job is None or job.finished or job.results[task_idx] is not None:
+                        continue
+                    self._leases[(job_id, task_idx)] = worker_id
+                    begin_row_index, row_indexes, column_indexes = job.tasks[task_idx]
+                    return job_id, task_idx, begin_row_index, row_indexes, column_indexes
+                remaining_time = deadline - time.monotonic()
+                if remaining_time <= 0:
+                    return None
+                self._condition.wait(remaining_time)
+
+    def complete_task(self, worker_id, job_id, task_idx, value):
+        """
+        Stores the value of a calculated minor. Values of minors which are already calculated are ignored.
+
+        Args:
+            worker_id (int): identifier of the worker which calculated the minor
+            job_id (int): identifier of the job
+            task_idx (int): index of the minor
+            value (float): value of the minor
+
+        Return:
+            None
+        """
+        with self._condition:
+            self.workers[worker_id] = time.monotonic()
+            self._leases.pop((job_id, task_idx), None)
+            job = self._jobs.get(job_id)
+            if job is None or job.results[task_idx] is not None:
+                return
+            job.results[task_idx] = value
+            job.remaining -= 1
+            if job.finished:
+                self._condition.notify_all()
+
+    def fail_task(self, worker_id, job_id, task_idx, message):
+        """
+        Marks the job as failed, because the worker could not calculate one of its minors.
+
+        Args:
+            worker_id (int): identifier of the worker
+            job_id (int): identifier of the job
+            task_idx (int): index of the minor
+            message (string): description of the error
+
+        Return:
+            None
+        """
+        with self._condition:
+            self._leases.pop((job_id, task_idx), None)
+            job = self._jobs.get(job_id)
+            if job is not None and job.error is None:
+                job.error = "Worker {} failed to calculate minor {}: {}".format(worker_id, task_idx, message)
+                self._condition.notify_all()
+
+    def add_job(self, matrix, method, memoize, cache_size, tasks):
+        """
+        Puts the minors of a new job on the board. Called by the coordinator.
+
+        Return:
+            identifier of the job (int)
+        """
+        with self._condition:
+            job_id = self._next_job_id
+            self._next_job_id += 1
+            job = Job(job_id, matrix, method, memoize, cache_size, tasks)
+            self._jobs[job_id] = job
+            self._pending.extend((job_id, task_idx) for task_idx in range(len(tasks)))
+            self._condition.notify_all()
+            return job_id
+
+    def wait_job(self, job_id, timeout):
+        """
+        Waits at most timeout seconds for the job to finish. Called by the coordinator.
+
+        Return:
+            True if the job is finished (bool)
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self._jobs[job_id].finished, timeout)
+
+    def remove_job(self, job_id):
+        """
+        Removes a finished job from the board. Called by the coordinator.
+
+        Return:
+            the removed job (Job)
+        """
+        with self._condition:
+            job = self._jobs.pop(job_id)
+            for key in [key for key in self._leases if key[0] == job_id]:
+                del self._leases[key]
+            return job
+
+    def requeue_expired(self):
+        """
+        Puts the tasks of workers without a heartbeat for lease_timeout seconds back to the board and
+        forgets these workers. Called periodically by the coordinator.
+
+        Return:
+            number of tasks put back to the board (int)
+        """
+        with self._condition:
+            now = time.monotonic()
+            lost_workers = {worker_id for worker_id, last_heartbeat in self.workers.items()
+                            if now - last_heartbeat > self.lease_timeout}
+            if not lost_workers:
+                return 0
+            expired = [(key, worker_id) for key, worker_id in self._leases.items() if worker_id in lost_workers]
+            for key, _ in expired:
+                del self._leases[key]
+            # tasks of lost workers are calculated before other pending tasks
+            self._pending.extendleft(reversed([key for key, _ in expired]))
+            for lost_worker_id in lost_workers:
+                del self.workers[lost_worker_id]
+                print("Worker {} lost, {} tasks put back to the board.".format(
+                    lost_worker_id, sum(1 for _, worker_id in expired if worker_id == lost_worker_id)))
+            self.requeued += len(expired)
+            self._condition.notify_all()
+            return len(expired)
+
+    def stop(self):
+        """
+        Tells all workers to exit. Called by the coordinator.
+
+        Return:
+            None
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
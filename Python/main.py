@@ -1,40 +1,334 @@
-import sys
+import argparse
+import time
 
-from determinanat_calc.serial_det_calc import det_serial
+from determinanat_calc.serial_det_calc import det_serial, METHODS, LAPLACE_METHOD, LU_METHOD
 from determinanat_calc.parallel_det_calc import det_parallel
-from IO.matrix_reader import read_matrix
+from determinanat_calc.worker_pool import Worker_pool
+from determinanat_calc.structure import analyze_structure
+from determinanat_calc.dispatcher import det, PARALLEL_ENGINE
+from determinanat_calc.out_of_core import out_of_core_det, parse_memory_size
+from IO.matrix_reader import read_matrix_fast, iter_matrices
 from IO.result_writer import ExecutionResults, write_results
+from IO.binary_matrix import is_binary_matrix_file, load_binary_matrices, read_header
+from IO.result_cache import Result_cache, matrix_key, DEFAULT_MAX_ENTRIES
+from pipeline.batch_pipeline import run_pipeline, DEFAULT_READER_THREADS
 
-def execute_serial_calculation(matrix):
+# minimal number of matrix files for which batch calculation is used by default
+BATCH_MIN_FILES = 8
+
+def execute_serial_calculation(matrix, method=LAPLACE_METHOD, memoize=False, use_structure=True, structure=None):
     """
     Calculates the determinant of given regular matrix using serial implementation
     and measures the execution time.
 
     Args:
         matrix(list(list(float)): regular matrix for which the determinant is calculated
+        method(string): method used to calculate the determinant (one of serial_det_calc.METHODS)
+        memoize(bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        use_structure(bool): if true, structure of the matrix is used to shorten the calculation
+        structure(Matrix_structure): result of structure.analyze_structure of the matrix, if it was already analyzed
 
     Return:
         result object that can be stored in the results file (ExecutionResults)
     """
-    determinant, _, exec_time_ms = det_serial(matrix)
+    determinant, _, exec_time_ms = det_serial(matrix, method, memoize, use_structure=use_structure,
+                                              structure=structure)
 
     return ExecutionResults(len(matrix), determinant, exec_time_ms, True)
 
-def execute_parallel_calculation(matrix):
+def execute_parallel_calculation(matrix, method=LAPLACE_METHOD, memoize=False, pool=None, split_depth=1,
+                                 use_structure=True, structure=None):
     """
     Calculates the determinant od given regular matrix using parallel implementation
     and measures the execution time.
 
     Args:
         matrix(list(list(float)): regular matrix for which the determinant is calculated
+        method(string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        memoize(bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        pool(Worker_pool): started pool of worker processes used for the calculation
+        split_depth(int): number of first rows used for splitting the determinant into minors
+        use_structure(bool): if true, structure of the matrix is used to shorten the calculation
+        structure(Matrix_structure): result of structure.analyze_structure of the matrix, if it was already analyzed
 
     Return:
         result object that can be stored in the results file (ExecutionResults)
     """
-    determinant, exec_time_ms = det_parallel(matrix, len(matrix))
+    determinant, exec_time_ms = det_parallel(matrix, len(matrix), method, memoize, pool=pool,
+                                             split_depth=split_depth, use_structure=use_structure, structure=structure)
 
     return ExecutionResults(len(matrix), determinant, exec_time_ms, False)
 
+def execute_auto_calculation(matrix, method=None, pool=None, structure=None):
+    """
+    Calculates the determinant of given regular matrix using the implementation, number of tasks
+    and method chosen by the dispatcher, and measures the execution time.
+
+    Args:
+        matrix(list(list(float)): regular matrix for which the determinant is calculated
+        method(string): method used to calculate the determinant, chosen by the dispatcher if None
+        pool(Worker_pool): started pool of worker processes used if parallel calculation is chosen
+        structure(Matrix_structure): result of structure.analyze_structure of the matrix, if it was already analyzed
+
+    Return:
+        result object that can be stored in the results file and the chosen calculation
+        ( (ExecutionResults, dispatcher.Dispatch_plan) )
+    """
+    start_time = time.perf_counter()
+    determinant, plan = det(matrix, method, pool, structure=structure)
+    end_time = time.perf_counter()
+
+    return ExecutionResults(len(matrix), determinant, (end_time - start_time) * 1000,
+                            plan.engine != PARALLEL_ENGINE), plan
+
+def execute_cached_calculation(cache, matrix, engine, serial, calculation):
+    """
+    Takes the result of a determinant calculation from the result cache if it is there, otherwise
+    performs the calculation and stores its result in the cache.
+
+    Args:
+        cache(Result_cache): cache of determinant calculations, or None if caching is not used
+        matrix(list(list(float)): regular matrix for which the determinant is calculated
+        engine(string): description of implementation and method used for calculation (part of the cache key)
+        serial(bool): if true the implementation is serial, otherwise implementation is parallel
+        calculation(function): performs the calculation and returns its result object (ExecutionResults)
+
+    Return:
+        result object that can be stored in the results file (ExecutionResults)
+    """
+    if cache is None:
+        return calculation()
+
+    key = matrix_key(matrix, engine)
+    cached_result = cache.get(key)
+    if cached_result is not None:
+        return ExecutionResults(len(matrix), cached_result.determinant, cached_result.exec_time_ms, serial, True)
+
+    result = calculation()
+    cache.put(key, result.determinant, result.exec_time_ms)
+    return result
+
+def cached_label(result):
+    return " (taken from cache)" if result.cached else ""
+
+def load_matrices(matrix_file_path, all_text_matrices=False, as_arrays=False):
+    """
+    Loads matrices from a text or binary matrix file, the format is recognized from the file content.
+    All matrices of a binary file are memory-mapped. With as_arrays, they are returned as zero-copy
+    views of the file, for vectorized batch calculation. Otherwise each matrix is converted into lists,
+    since serial and parallel implementations calculate with Python floats, and arithmetic of NumPy
+    scalars is several times slower.
+    Only the first matrix of a text file is loaded, unless all_text_matrices is True.
+
+    Args:
+        matrix_file_path(string): path of the text or binary matrix file
+        all_text_matrices(bool): if true, all matrices of a text file are loaded (see matrix_reader.iter_matrices)
+        as_arrays(bool): if true, matrices are returned as NumPy arrays (for batch_det_calc.det_batch)
+
+    Return:
+        generator of matrix names and matrices (generator((string, list(list(float))|numpy.ndarray)))
+    """
+    if is_binary_matrix_file(matrix_file_path):
+        for matrix_idx, matrix in enumerate(load_binary_matrices(matrix_file_path)):
+            yield "{}[{}]".format(matrix_file_path, matrix_idx), matrix if as_arrays else matrix.tolist()
+    elif all_text_matrices:
+        for matrix_idx, matrix in enumerate(iter_matrices(matrix_file_path, as_array=as_arrays)):
+            yield "{}[{}]".format(matrix_file_path, matrix_idx), matrix
+    else:
+        yield matrix_file_path, read_matrix_fast(matrix_file_path, as_array=as_arrays)
+
+def execute_batch_calculation(matrices):
+    """
+    Calculates determinants of all given matrices at once, using vectorized batch implementation,
+    and measures the execution time. Since the determinants are calculated together, the execution
+    time of each matrix is the total execution time divided by the number of matrices.
+
+    Args:
+        matrices(list(numpy.ndarray)): regular matrices for which the determinants are calculated
+
+    Return:
+        result objects that can be stored in the results file (list(ExecutionResults))
+    """
+    # numpy is only needed for batch calculation
+    from determinanat_calc.batch_det_calc import det_batch
+
+    start_time = time.perf_counter()
+    determinants = det_batch(matrices)
+    end_time = time.perf_counter()
+    exec_time_ms = (end_time - start_time) * 1000 / len(matrices)
+
+    return [ExecutionResults(len(matrix), float(determinant), exec_time_ms, True)
+            for matrix, determinant in zip(matrices, determinants)]
+
+def process_batch(matrix_files):
+    """
+    Loads all matrices from given files and calculates their determinants using batch implementation.
+    Each file may contain several matrices, one after another (see matrix_reader.iter_matrices), or be
+    a binary matrix file (see binary_matrix).
+    Results are printed to the console.
+
+    Args:
+        matrix_files(list(string)): paths of files containing the matrices
+
+    Return:
+        information about calculations to be stored in the results file (list(ExecutionResults))
+    """
+    matrices = []
+    matrix_names = []
+    for matrix_file_path in matrix_files:
+        for matrix_name, matrix in load_matrices(matrix_file_path, all_text_matrices=True, as_arrays=True):
+            matrices.append(matrix)
+            matrix_names.append(matrix_name)
+    print("\nSuccessfully loaded {} matrices.\nCalculating determinants in batch...\n".format(len(matrices)))
+
+    execution_results = execute_batch_calculation(matrices)
+    for matrix_name, result in zip(matrix_names, execution_results):
+        print("{}: det(mat) = {}".format(matrix_name, result.determinant))
+    print("\nBatch calculation took {} ms per matrix.\n".format(execution_results[0].exec_time_ms))
+
+    return execution_results
+
+def process_out_of_core(arguments):
+    """
+    Calculates determinants of all matrices from binary matrix files using out-of-core elimination
+    within the given memory limit (see out_of_core.out_of_core_det), reporting the progress and
+    I/O statistics of each calculation, and appends the results to the results file.
+
+    Args:
+        arguments(argparse.Namespace): parsed arguments of the program
+
+    Return:
+        None
+    """
+    execution_results = []
+    for matrix_file_path in arguments.matrix_files:
+        if not is_binary_matrix_file(matrix_file_path):
+            raise Exception("Out-of-core calculation requires binary matrix files, {} is not one "
+                            "(see IO/binary_matrix.py for conversion).".format(matrix_file_path))
+        for matrix_idx in range(read_header(matrix_file_path).count):
+            print("\nCalculating determinant of {}[{}] out of core...".format(matrix_file_path, matrix_idx))
+
+            def report_progress(eliminated_columns, n):
+                print("Eliminated {} of {} columns ({:.1f}%).".format(eliminated_columns, n,
+                                                                      100.0 * eliminated_columns / n))
+
+            start_time = time.perf_counter()
+            result = out_of_core_det(matrix_file_path, matrix_idx, arguments.memory_limit, arguments.tile_size,
+                                     arguments.scratch_dir, report_progress)
+            end_time = time.perf_counter()
+            exec_time_ms = (end_time - start_time) * 1000
+            print("det(mat) = {} (sign {}, log|det| = {})\nPanels of {} columns, tiles of {} columns: {}."
+                  .format(result.determinant, result.sign, result.log_abs_determinant, result.panel_width,
+                          result.tile_size, result.stats.description()))
+            print("Out-of-core calculation took {} ms.".format(exec_time_ms))
+            execution_results.append(ExecutionResults(read_header(matrix_file_path).order, result.determinant,
+                                                      exec_time_ms, True))
+    write_results(execution_results, arguments.results_file)
+
+def process_pipeline(arguments):
+    """
+    Calculates determinants of all matrices from given files using the pipelined batch mode
+    (see batch_pipeline.run_pipeline). Unless option --serial-only is given, each determinant is
+    also calculated using parallel implementation, with minors calculated by a separate pool.
+
+    Args:
+        arguments(argparse.Namespace): parsed arguments to the program
+
+    Return:
+        None
+    """
+    pipeline_args = (arguments.matrix_files, arguments.results_file, load_matrices, arguments.method,
+                     arguments.memoize, arguments.workers)
+    pipeline_kwargs = {"split_depth": arguments.split_depth, "use_structure": arguments.use_structure,
+                       "readers_num": arguments.readers, "start_method": arguments.start_method}
+    if arguments.serial_only:
+        results_num = run_pipeline(*pipeline_args, **pipeline_kwargs)
+    else:
+        with Worker_pool(arguments.pool_size, arguments.start_method) as pool:
+            results_num = run_pipeline(*pipeline_args, parallel_pool=pool, **pipeline_kwargs)
+    print("\nSuccessfully written {} results.".format(results_num))
+
+def parse_arguments():
+    """
+    Parses the arguments to the program: paths of matrix files followed by the path of the results file,
+    and options which select the calculation method.
+
+    Return:
+        parsed arguments (argparse.Namespace)
+    """
+    parser = argparse.ArgumentParser(description="Calculates determinants of given matrices, both sequentially "
+                                                 "and parallel, and stores the execution times.")
+    parser.add_argument("matrix_files", nargs="+", help="paths of text or binary files containing the matrices")
+    parser.add_argument("results_file", help="path of the CSV file holding the execution times")
+    parser.add_argument("--method", choices=METHODS, default=None,
+                        help="method used to calculate determinants (default: laplace, or chosen by the "
+                             "dispatcher with --auto)")
+    parser.add_argument("--memoize", action="store_true",
+                        help="cache and reuse calculated sub-minors in Laplace expansion")
+    parser.add_argument("--batch", action=argparse.BooleanOptionalAction, default=None,
+                        help="calculate all determinants at once using vectorized batch implementation "
+                             "(default: only when at least {} matrix files are given and no option which batch "
+                             "implementation does not support is used)".format(BATCH_MIN_FILES))
+    parser.add_argument("--auto", action="store_true",
+                        help="calculate each determinant once, using serial or parallel implementation, number "
+                             "of tasks and method chosen from the calibration profile of the host")
+    parser.add_argument("--memory-limit", type=parse_memory_size, default=None,
+                        help="calculate determinants of binary matrix files out of core, using at most this much "
+                             "memory for the matrix, e.g. 512M or 2G (default: matrices are loaded into memory)")
+    parser.add_argument("--tile-size", type=int, default=None,
+                        help="with --memory-limit, number of columns of tiles of the trailing matrix "
+                             "(default: a third of the memory limit)")
+    parser.add_argument("--scratch-dir", default=None,
+                        help="with --memory-limit, directory of the scratch copy of the matrix (default: temp directory)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="read files, calculate determinants of different matrices in worker processes and "
+                             "write results concurrently")
+    parser.add_argument("--serial-only", action="store_true",
+                        help="with --pipeline, calculate each determinant once using serial implementation, "
+                             "without repeating it using parallel implementation")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="with --pipeline, number of worker processes calculating different matrices "
+                             "(default: number of CPUs)")
+    parser.add_argument("--readers", type=int, default=DEFAULT_READER_THREADS,
+                        help="with --pipeline, number of threads reading matrix files (default: {})"
+                        .format(DEFAULT_READER_THREADS))
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="number of worker processes used for parallel calculation (default: number of CPUs)")
+    parser.add_argument("--split-depth", type=int, default=1,
+                        help="number of first rows used for splitting the determinant into parallel minors (default: 1)")
+    parser.add_argument("--cache", default=None,
+                        help="path of the result cache file, results of already calculated matrices are "
+                             "taken from it (default: no caching)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="maximum number of results in the result cache (default: {})".format(DEFAULT_MAX_ENTRIES))
+    parser.add_argument("--no-structure", dest="use_structure", action="store_false",
+                        help="do not analyze the structure of matrices (triangular, block, permutation...)")
+    parser.add_argument("--start-method", choices=["fork", "spawn", "forkserver"], default=None,
+                        help="start method of worker processes (default: platform default)")
+    arguments = parser.parse_args()
+    if arguments.pipeline and arguments.cache is not None:
+        parser.error("--cache can not be used with --pipeline")
+    if arguments.pipeline and arguments.batch:
+        parser.error("--batch can not be used with --pipeline")
+    if arguments.auto and (arguments.pipeline or arguments.batch or arguments.cache is not None):
+        parser.error("--auto can not be used with --pipeline, --batch or --cache")
+    if arguments.memory_limit is not None and (arguments.pipeline or arguments.batch or arguments.auto
+                                                or arguments.cache is not None):
+        parser.error("--memory-limit can not be used with --pipeline, --batch, --auto or --cache")
+    # batch implementation always uses vectorized LU decomposition and does not cache results
+    batch_unsupported = [option for option, given in [("--method", arguments.method not in [None, LU_METHOD]),
+                                                      ("--memoize", arguments.memoize),
+                                                      ("--no-structure", not arguments.use_structure),
+                                                      ("--cache", arguments.cache is not None)] if given]
+    if arguments.batch and batch_unsupported:
+        parser.error("{} can not be used with --batch".format(", ".join(batch_unsupported)))
+    if arguments.batch is None:
+        arguments.batch = (len(arguments.matrix_files) >= BATCH_MIN_FILES and not batch_unsupported
+                           and not arguments.auto and not arguments.pipeline and arguments.memory_limit is None)
+    if arguments.method is None and not arguments.auto:
+        arguments.method = LAPLACE_METHOD
+    return arguments
+
 def process_matrices():
     """
     This is the main method. It will load matrices from files specified in arguments to the program,
@@ -46,37 +340,107 @@ def process_matrices():
     order of the matrix. The next n rows contain exactly n real numbers, separated by one or more
     space characters. The last argument to the program is a path to a csv file where information
     about the execution times for different matrices are stored.
+    Option --method selects the method used to calculate determinants: laplace (default),
+    lu, bareiss, sparse (Laplace expansion over the rows or columns with most zeros) or iterative
+    (non-recursive Laplace expansion with the same results as laplace), and option
+    --memoize enables caching of sub-minors in Laplace expansion.
+    With option --memory-limit, determinants of matrices from binary files are calculated out of core:
+    the matrix stays on disk and is eliminated in panels and tiles which fit into the memory limit.
+    With option --auto, each determinant is calculated once and the dispatcher chooses serial or parallel
+    implementation, the number of tasks and (unless --method is given) the method, from the structure and
+    order of the matrix and the calibration profile of the host (see dispatcher.plan_calculation).
+    When many matrix files are given (or option --batch is used), the determinants are calculated
+    all at once using vectorized batch implementation, instead of serial and parallel implementation,
+    unless options which batch implementation does not support (--method other than lu, --memoize,
+    --no-structure or --cache) are given.
+    In that case each file may contain several matrices, one after another.
+    Instead of text files, binary matrix files (see binary_matrix) can be given. All matrices from
+    a binary file are processed, without loading them into memory.
+    Parallel calculations of all matrices share one pool of worker processes, whose start-up time
+    is reported separately.
+    If option --cache is given, serial and parallel results are stored in a persistent result cache
+    and matrices which were already calculated with the same method are not calculated again.
+    With option --pipeline, files are read, determinants of different matrices are calculated and results
+    are written concurrently (see process_pipeline), which keeps all CPUs busy for many input files.
+    Before the calculation, the structure of each matrix is analyzed (unless option --no-structure is given)
+    and the chosen calculation path is printed: triangular, block triangular, permutation-like and
+    matrices with zero or duplicate lines are calculated without full expansion.
 
     Return:
         None
     """
 
-    arguments = sys.argv[1:]
-    results_file = arguments[-1]
+    arguments = parse_arguments()
+    matrix_files = arguments.matrix_files
     execution_results = []
 
-    for matrix_file_path in arguments[:-1]:
-        # load matrix
-        matrix = read_matrix(matrix_file_path)
-        print("\nSuccessfully loaded matrix: {}\nCalculating determinants...\n".format(matrix_file_path))
+    if arguments.pipeline:
+        process_pipeline(arguments)
+        return
+
+    if arguments.memory_limit is not None:
+        process_out_of_core(arguments)
+        return
+
+    if arguments.batch:
+        write_results(process_batch(matrix_files), arguments.results_file)
+        return
+
+    cache = Result_cache(arguments.cache, arguments.cache_size) if arguments.cache is not None else None
+    # all options which change the measured calculation are part of the cache key
+    options = "memoize{}/structure{}".format(int(arguments.memoize), int(arguments.use_structure))
+    serial_engine = "serial/{}/{}".format(arguments.method, options)
+    parallel_engine = "parallel/{}/depth{}/{}".format(arguments.method, arguments.split_depth, options)
+
+    try:
+        with Worker_pool(arguments.pool_size, arguments.start_method) as pool:
+            print("Started {} worker processes in {} ms.".format(pool.size, pool.warmup_time_ms))
+
+            for matrix_file_path in matrix_files:
+                for matrix_name, matrix in load_matrices(matrix_file_path):
+                    print("\nSuccessfully loaded matrix: {}\nCalculating determinants...\n".format(matrix_name))
+                    # the structure is analyzed once and given to all calculations of the matrix
+                    structure = analyze_structure(matrix) if arguments.use_structure else None
+                    if structure is not None:
+                        print("Calculation path: {}\n".format(structure.description()))
+
+                    if arguments.auto:
+                        auto_result, plan = execute_auto_calculation(matrix, arguments.method, pool, structure)
+                        execution_results.append(auto_result)
+                        print("Dispatcher chose: {}\ndet(mat) = {}\nCalculation took {} ms.\n"
+                              .format(plan.description(), auto_result.determinant, auto_result.exec_time_ms))
+                        if len(matrix_files) > 1:
+                            print("=" * 20)
+                        continue
 
-        # Serial calculation
-        serial_result = execute_serial_calculation(matrix)
-        execution_results.append(serial_result)
-        print("Serial calculation result:\ndet(mat) = {}\nSerial calculation took {} ms.\n"
-              .format(serial_result.determinant, serial_result.exec_time_ms))
+                    # Serial calculation
+                    serial_result = execute_cached_calculation(
+                        cache, matrix, serial_engine, True,
+                        lambda: execute_serial_calculation(matrix, arguments.method, arguments.memoize,
+                                                           arguments.use_structure, structure))
+                    execution_results.append(serial_result)
+                    print("Serial calculation result{}:\ndet(mat) = {}\nSerial calculation took {} ms.\n"
+                          .format(cached_label(serial_result), serial_result.determinant, serial_result.exec_time_ms))
 
-        # Parallel calculation
-        parallel_result = execute_parallel_calculation(matrix)
-        execution_results.append(parallel_result)
-        print("Parallel calculation result:\ndet(mat) = {}\nParallel calculation took {} ms.\n"
-              .format(parallel_result.determinant, parallel_result.exec_time_ms))
+                    # Parallel calculation
+                    parallel_result = execute_cached_calculation(
+                        cache, matrix, parallel_engine, False,
+                        lambda: execute_parallel_calculation(matrix, arguments.method, arguments.memoize, pool,
+                                                             arguments.split_depth, arguments.use_structure,
+                                                             structure))
+                    execution_results.append(parallel_result)
+                    print("Parallel calculation result{}:\ndet(mat) = {}\nParallel calculation took {} ms.\n"
+                          .format(cached_label(parallel_result), parallel_result.determinant,
+                                  parallel_result.exec_time_ms))
 
-        # Separate console output
-        if len(arguments) > 2:
-            print("=" * 20)
+                    # Separate console output
+                    if len(matrix_files) > 1:
+                        print("=" * 20)
+    finally:
+        if cache is not None:
+            cache.close()
 
-    write_results(execution_results, results_file)
+    write_results(execution_results, arguments.results_file)
 
 if __name__ == "__main__":
     process_matrices()
\ No newline at end of file
@@ -0,0 +1,248 @@
+import queue
+import threading
+
+from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc.serial_det_calc import det_serial, LAPLACE_METHOD
+from determinanat_calc.worker_pool import Worker_pool
+from IO.result_writer import ExecutionResults, Results_stream
+
+# bounds of queues between the stages, a full queue blocks the stage which produces its items
+MATRIX_QUEUE_SIZE = 16
+RESULT_QUEUE_SIZE = 64
+DEFAULT_READER_THREADS = 4
+# maximum number of matrices submitted to worker processes and not calculated yet, per worker
+IN_FLIGHT_PER_WORKER = 2
+
+class Pipeline_result:
+    """
+    Result of a calculation passed to the writer stage of the pipeline.
+
+    Attributes:
+        matrix_name (string): name of the matrix (path of the file and index within the file)
+        execution_result (ExecutionResults): result to be written into the results file, None if the calculation failed
+        error (Exception): reason of the failure, None if the calculation succeeded
+    """
+
+    def __init__(self, matrix_name, execution_result, error=None):
+        self.matrix_name = matrix_name
+        self.execution_result = execution_result
+        self.error = error
+
+def serial_calculation(matrix_name, matrix, method, memoize, use_structure):
+    """
+    Calculates the determinant of a matrix using serial implementation, in a worker process of the pipeline.
+
+    Args:
+        matrix_name (string): name of the matrix
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        method (string): method used to calculate the determinant (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        use_structure (bool): if true, structure of the matrix is used to shorten the calculation
+
+    Return:
+        result of the calculation (Pipeline_result)
+    """
+    determinant, _, exec_time_ms = det_serial(matrix, method, memoize, use_structure=use_structure)
+    return Pipeline_result(matrix_name, ExecutionResults(len(matrix), determinant, exec_time_ms, True))
+
+def read_matrix_files(file_queue, matrix_queue, load_matrices):
+    """
+    Reader stage: takes paths of matrix files from a queue until None is taken, loads all matrices
+    of each file and puts them into the matrix queue. None is put into the matrix queue at the end.
+
+    Args:
+        file_queue (queue.Queue): paths of matrix files followed by None
+        matrix_queue (queue.Queue): bounded queue of loaded matrix names and matrices
+        load_matrices (function): loads matrices from a file (see main.load_matrices)
+
+    Return:
+        None
+    """
+    try:
+        matrix_file_path = file_queue.get()
+        while matrix_file_path is not None:
+            try:
+                for matrix_name, matrix in load_matrices(matrix_file_path, all_text_matrices=True):
+                    matrix_queue.put((matrix_name, matrix))
+            except Exception as error:
+                matrix_queue.put((matrix_file_path, error))
+            matrix_file_path = file_queue.get()
+    finally:
+        matrix_queue.put(None)
+
+def parallel_calculations(parallel_queue, result_queue, method, memoize, pool, split_depth, use_structure,
+                          serial_slots, serial_slots_num):
+    """
+    Parallel stage: takes matrices from a queue until None is taken and calculates their determinants
+    one by one using parallel implementation, with minors calculated by the given pool. Before each
+    calculation all slots of serial calculations are taken, so the measured time is not affected by
+    serial calculations running on the same CPUs at the same time.
+
+    Args:
+        parallel_queue (queue.Queue): bounded queue of matrix names and matrices, followed by None
+        result_queue (queue.Queue): queue of results for the writer stage
+        method (string): method used to calculate the minors (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        pool (Worker_pool): started pool of worker processes used for the calculation
+        split_depth (int): number of first rows used for splitting the determinant into minors
+        use_structure (bool): if true, structure of the matrix is used to shorten the calculation
+        serial_slots (threading.BoundedSemaphore): slots of serial calculations submitted to worker processes
+        serial_slots_num (int): number of slots, each is released when its serial calculation finishes
+
+    Return:
+        None
+    """
+    item = parallel_queue.get()
+    while item is not None:
+        matrix_name, matrix = item
+        # wait until the running serial calculations finish, no new ones are submitted meanwhile
+        for _ in range(serial_slots_num):
+            serial_slots.acquire()
+        try:
+            determinant, exec_time_ms = det_parallel(matrix, len(matrix), method, memoize, pool=pool,
+                                                     split_depth=split_depth, use_structure=use_structure)
+            result_queue.put(Pipeline_result(matrix_name,
+                                             ExecutionResults(len(matrix), determinant, exec_time_ms, False)))
+        except Exception as error:
+            result_queue.put(Pipeline_result(matrix_name, None, error))
+        finally:
+            for _ in range(serial_slots_num):
+                serial_slots.release()
+        item = parallel_queue.get()
+
+def write_pipeline_results(result_queue, results_file_path, written, errors):
+    """
+    Writer stage: takes results from a queue until None is taken, prints them and appends them
+    to the results file as soon as they arrive. Failed calculations are printed and collected.
+
+    Args:
+        result_queue (queue.Queue): queue of results (Pipeline_result) followed by None
+        results_file_path (string): path of the CSV file holding the execution times
+        written (list(Pipeline_result)): list to which results written into the file are added
+        errors (list(Pipeline_result)): list to which failed calculations are added
+
+    Return:
+        None
+    """
+    with Results_stream(results_file_path) as results_stream:
+        result = result_queue.get()
+        while result is not None:
+            if result.error is not None:
+                errors.append(result)
+                print("{}: calculation failed: {}".format(result.matrix_name, result.error))
+            else:
+                exec_res = result.execution_result
+                results_stream.write(exec_res)
+                written.append(result)
+                print("{}: det(mat) = {}, {} calculation took {} ms."
+                      .format(result.matrix_name, exec_res.determinant, "serial" if exec_res.serial else "parallel",
+                              exec_res.exec_time_ms))
+            result = result_queue.get()
+
+def run_pipeline(matrix_files, results_file_path, load_matrices, method=LAPLACE_METHOD, memoize=False,
+                 workers_num=None, parallel_pool=None, split_depth=1, use_structure=True,
+                 readers_num=DEFAULT_READER_THREADS, start_method=None):
+    """
+    Calculates determinants of matrices from many files with overlapping stages:
+        1. reader threads load matrix files (several files at once, while calculations are running)
+        2. the current thread submits each matrix to a pool of worker processes, which calculate
+        determinants of different matrices concurrently using serial implementation
+        3. if a pool for parallel calculation is given, a thread also calculates each determinant using
+        parallel implementation, with minors calculated by that pool; serial calculations are paused
+        during each parallel calculation, so they do not compete for the CPUs
+        4. a writer thread appends results to the results file as soon as they are calculated
+    Stages are connected by bounded queues and the number of matrices submitted to workers is limited,
+    so fast readers wait for slow calculations instead of loading all matrices into memory.
+    Results are written in the order in which calculations finish.
+
+    Args:
+        matrix_files (list(string)): paths of text or binary files containing the matrices
+        results_file_path (string): path of the CSV file holding the execution times
+        load_matrices (function): loads matrices from a file (see main.load_matrices)
+        method (string): method used to calculate determinants (one of serial_det_calc.METHODS)
+        memoize (bool): if true, Laplace expansion caches and reuses calculated sub-minors
+        workers_num (int): number of worker processes for serial calculations, by default the number of CPUs
+        parallel_pool (Worker_pool): started pool used for parallel calculations, None to calculate each
+        determinant only once, using serial implementation
+        split_depth (int): number of first rows used for splitting the determinant into parallel minors
+        use_structure (bool): if true, structure of the matrices is used to shorten the calculation
+        readers_num (int): number of reader threads
+        start_method (string): multiprocessing start method of worker processes
+
+    Return:
+        number of written results (int)
+    """
+    file_queue = queue.Queue()
+    for matrix_file_path in matrix_files:
+        file_queue.put(matrix_file_path)
+    readers_num = max(1, min(readers_num, len(matrix_files)))
+    for _ in range(readers_num):
+        file_queue.put(None)
+
+    matrix_queue = queue.Queue(MATRIX_QUEUE_SIZE)
+    parallel_queue = queue.Queue(MATRIX_QUEUE_SIZE)
+    result_queue = queue.Queue(RESULT_QUEUE_SIZE)
+    written = []
+    errors = []
+
+    readers = [threading.Thread(target=read_matrix_files, args=(file_queue, matrix_queue, load_matrices), daemon=True)
+               for _ in range(readers_num)]
+    writer = threading.Thread(target=write_pipeline_results, args=(result_queue, results_file_path, written, errors))
+    parallel_thread = None
+
+    with Worker_pool(workers_num, start_method) as workers:
+        print("Started {} worker processes in {} ms.\n".format(workers.size, workers.warmup_time_ms))
+        max_in_flight = workers.size * IN_FLIGHT_PER_WORKER
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+        if parallel_pool is not None:
+            parallel_thread = threading.Thread(target=parallel_calculations,
+                                               args=(parallel_queue, result_queue, method, memoize, parallel_pool,
+                                                     split_depth, use_structure, in_flight, max_in_flight))
+
+        def calculation_finished(result):
+            result_queue.put(result)
+            in_flight.release()
+
+        def calculation_failed(matrix_name, error):
+            result_queue.put(Pipeline_result(matrix_name, None, error))
+            in_flight.release()
+
+        writer.start()
+        for reader in readers:
+            reader.start()
+        if parallel_thread is not None:
+            parallel_thread.start()
+
+        try:
+            finished_readers = 0
+            while finished_readers < readers_num:
+                item = matrix_queue.get()
+                if item is None:
+                    finished_readers += 1
+                    continue
+                matrix_name, matrix = item
+                if isinstance(matrix, Exception):
+                    result_queue.put(Pipeline_result(matrix_name, None, matrix))
+                    continue
+
+                in_flight.acquire()
+                workers.apply_async(serial_calculation, (matrix_name, matrix, method, memoize, use_structure),
+                                    callback=calculation_finished,
+                                    error_callback=lambda error, matrix_name=matrix_name:
+                                    calculation_failed(matrix_name, error))
+                if parallel_thread is not None:
+                    parallel_queue.put((matrix_name, matrix))
+        finally:
+            if parallel_thread is not None:
+                parallel_queue.put(None)
+                parallel_thread.join()
+            # wait for all submitted calculations to finish
+            for _ in range(max_in_flight):
+                in_flight.acquire()
+            result_queue.put(None)
+            writer.join()
+
+    if errors:
+        raise Exception("{} calculations failed: {}.".format(
+            len(errors), "; ".join("{}: {}".format(error.matrix_name, error.error) for error in errors)))
+    return len(written)
@@ -0,0 +1,305 @@
+import argparse
+import json
+import platform
+import random
+import statistics
+import time
+
+from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc.serial_det_calc import det_serial, METHODS, LAPLACE_METHOD, LU_METHOD, BAREISS_METHOD, \
+    SPARSE_METHOD, ITERATIVE_METHOD
+from determinanat_calc.worker_pool import Worker_pool
+
+try:
+    from determinanat_calc.batch_det_calc import det_batch
+except ImportError:
+    det_batch = None
+
+
+RESULTS_BASE_PATH = "../../results"
+DEFAULT_MATRIX_ORDERS = [3, 5, 8, 9, 10]
+DEFAULT_WARMUP_RUNS = 1
+DEFAULT_REPETITIONS = 5
+DEFAULT_SEED = 2020
+# share of non-zero elements in generated matrices, smaller values give sparse matrices
+DEFAULT_DENSITIES = [1.0]
+# Laplace expansion without memoization takes O(n!) time, larger orders are skipped
+MAX_LAPLACE_ORDER = 10
+# methods based on Laplace expansion, benchmarked only up to the maximum Laplace order
+LAPLACE_METHODS = [LAPLACE_METHOD, SPARSE_METHOD, ITERATIVE_METHOD]
+ELEMENT_RANGE = 100.0
+
+class Benchmark_engine:
+    """
+    Determinant calculation implementation to be benchmarked.
+
+    Attributes:
+        name (string): unique name of the engine, e.g. parallel/laplace/4
+        implementation (string): serial or parallel
+        method (string): method used to calculate the determinant (one of serial_det_calc.METHODS)
+        tasks_num (int): number of parallel tasks, 1 for serial implementation
+        calculate (function): calculates the determinant of given matrix
+        max_order (int): largest matrix order for which the engine is benchmarked, None if there is no limit
+    """
+
+    def __init__(self, name, implementation, method, tasks_num, calculate, max_order=None):
+        self.name = name
+        self.implementation = implementation
+        self.method = method
+        self.tasks_num = tasks_num
+        self.calculate = calculate
+        self.max_order = max_order
+
+class Benchmark_result:
+    """
+    Statistics of repeated execution of one engine on a matrix of certain order.
+
+    Attributes:
+        engine (Benchmark_engine): benchmarked engine
+        matrix_order (int): order of the matrix
+        density (float): share of non-zero elements of the matrix
+        determinant (float): calculated determinant
+        samples_ms (list(float)): execution times of all repetitions in milliseconds
+    """
+
+    def __init__(self, engine, matrix_order, density, determinant, samples_ms):
+        self.engine = engine
+        self.matrix_order = matrix_order
+        self.density = density
+        self.determinant = determinant
+        self.samples_ms = samples_ms
+
+    @property
+    def median_ms(self):
+        return statistics.median(self.samples_ms)
+
+    @property
+    def min_ms(self):
+        return min(self.samples_ms)
+
+    @property
+    def mean_ms(self):
+        return statistics.mean(self.samples_ms)
+
+    @property
+    def stddev_ms(self):
+        return statistics.stdev(self.samples_ms) if len(self.samples_ms) > 1 else 0.0
+
+    def to_dict(self):
+        return {
+            "engine": self.engine.name,
+            "implementation": self.engine.implementation,
+            "method": self.engine.method,
+            "tasks_num": self.engine.tasks_num,
+            "matrix_order": self.matrix_order,
+            "density": self.density,
+            "determinant": float(self.determinant),
+            "repetitions": len(self.samples_ms),
+            "median_ms": self.median_ms,
+            "min_ms": self.min_ms,
+            "mean_ms": self.mean_ms,
+            "stddev_ms": self.stddev_ms,
+            "samples_ms": self.samples_ms,
+        }
+
+def random_matrix(n, seed=DEFAULT_SEED, density=1.0):
+    """
+    Generates a matrix of given order with elements uniformly distributed in [-ELEMENT_RANGE, ELEMENT_RANGE].
+    Each element is non-zero with probability equal to the density, so densities below one give sparse
+    matrices. The same seed always gives the same matrix.
+
+    Args:
+        n (int): order of the matrix
+        seed (int): seed of the random number generator
+        density (float): probability that an element is non-zero
+
+    Return:
+        generated matrix (list(list(float)))
+    """
+    if density >= 1.0:
+        rng = random.Random("{}/{}".format(seed, n))
+        return [[rng.uniform(-ELEMENT_RANGE, ELEMENT_RANGE) for _ in range(n)] for _ in range(n)]
+    rng = random.Random("{}/{}/{}".format(seed, n, density))
+    return [[rng.uniform(-ELEMENT_RANGE, ELEMENT_RANGE) if rng.random() < density else 0.0 for _ in range(n)]
+            for _ in range(n)]
+
+def measure(calculate, matrix, warmup_runs, repetitions):
+    """
+    Executes a calculation several times, after warm-up runs which are not measured.
+
+    Args:
+        calculate (function): calculates the determinant of given matrix
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        warmup_runs (int): number of runs before measurement
+        repetitions (int): number of measured runs
+
+    Return:
+        calculated determinant, execution times of measured runs in milliseconds ( (float, list(float)) )
+    """
+    for _ in range(warmup_runs):
+        calculate(matrix)
+
+    determinant = None
+    samples_ms = []
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        determinant = calculate(matrix)
+        end_time = time.perf_counter()
+        samples_ms.append((end_time - start_time) * 1000)
+    return determinant, samples_ms
+
+def create_engines(pool, max_tasks, methods, max_laplace_order=MAX_LAPLACE_ORDER):
+    """
+    Creates the engines to be benchmarked: serial implementation with each method (and memoized Laplace
+    expansion), vectorized batch calculation if NumPy is available, and parallel implementation with each
+    method and each number of tasks from 1 to max_tasks.
+
+    Args:
+        pool (Worker_pool): started pool of worker processes used by parallel engines
+        max_tasks (int): largest number of parallel tasks
+        methods (list(string)): methods to be benchmarked
+        max_laplace_order (int): largest matrix order for which methods based on Laplace expansion are benchmarked
+
+    Return:
+        engines (list(Benchmark_engine))
+    """
+    engines = []
+    for method in methods:
+        max_order = max_laplace_order if method in LAPLACE_METHODS else None
+        engines.append(Benchmark_engine("serial/{}".format(method), "serial", method, 1,
+                                        lambda matrix, method=method: det_serial(matrix, method)[0], max_order))
+        if method == LAPLACE_METHOD:
+            engines.append(Benchmark_engine("serial/laplace-memo", "serial", method, 1,
+                                            lambda matrix: det_serial(matrix, LAPLACE_METHOD, True)[0]))
+    if det_batch is not None:
+        engines.append(Benchmark_engine("serial/batch", "serial", "batch", 1, lambda matrix: det_batch([matrix])[0]))
+
+    for method in methods:
+        max_order = max_laplace_order if method in LAPLACE_METHODS else None
+        for tasks_num in range(1, max_tasks + 1):
+            engines.append(Benchmark_engine(
+                "parallel/{}/{}".format(method, tasks_num), "parallel", method, tasks_num,
+                lambda matrix, method=method, tasks_num=tasks_num: det_parallel(matrix, tasks_num, method,
+                                                                                pool=pool)[0],
+                max_order))
+    return engines
+
+def run_benchmarks(engines, matrix_orders, warmup_runs, repetitions, seed, densities=DEFAULT_DENSITIES):
+    """
+    Benchmarks all engines on random matrices of given orders and densities. Progress is printed onto the console.
+
+    Args:
+        engines (list(Benchmark_engine)): engines to be benchmarked
+        matrix_orders (list(int)): orders of generated matrices
+        warmup_runs (int): number of runs before measurement
+        repetitions (int): number of measured runs
+        seed (int): seed of the random matrix generator
+        densities (list(float)): densities of generated matrices (see random_matrix)
+
+    Return:
+        statistics of all benchmarks (list(Benchmark_result))
+    """
+    results = []
+    for density in densities:
+        for n in matrix_orders:
+            matrix = random_matrix(n, seed, density)
+            for engine in engines:
+                if engine.max_order is not None and n > engine.max_order:
+                    continue
+                determinant, samples_ms = measure(engine.calculate, matrix, warmup_runs, repetitions)
+                result = Benchmark_result(engine, n, density, determinant, samples_ms)
+                results.append(result)
+                print("n = {}, density = {}, {}: median {:.3f} ms, min {:.3f} ms, stddev {:.3f} ms"
+                      .format(n, density, engine.name, result.median_ms, result.min_ms, result.stddev_ms))
+    return results
+
+def host_info():
+    return {
+        "host": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor(),
+    }
+
+def write_json_results(results_file_path, results, settings):
+    """
+    Writes benchmark statistics, benchmark settings and information about the host into a JSON file.
+
+    Args:
+        results_file_path (string): path of the JSON file
+        results (list(Benchmark_result)): statistics of all benchmarks
+        settings (dict): settings of the benchmark run (orders, repetitions, seed...)
+
+    Return:
+        None
+    """
+    with open(results_file_path, 'w') as file:
+        json.dump({"host": host_info(), "settings": settings, "results": [result.to_dict() for result in results]},
+                  file, indent=2)
+
+def write_csv_results(results_file_path, results):
+    """
+    Writes benchmark statistics into a CSV file, one row per engine and matrix order.
+
+    Args:
+        results_file_path (string): path of the CSV file
+        results (list(Benchmark_result)): statistics of all benchmarks
+
+    Return:
+        None
+    """
+    with open(results_file_path, 'w') as file:
+        file.write("matrix_order,density,engine,implementation,method,tasks_num,repetitions,median_ms,min_ms,mean_ms,stddev_ms\n")
+        for result in results:
+            file.write("{},{},{},{},{},{},{},{},{},{},{}\n"
+                       .format(result.matrix_order, result.density, result.engine.name, result.engine.implementation,
+                               result.engine.method, result.engine.tasks_num, len(result.samples_ms),
+                               result.median_ms, result.min_ms, result.mean_ms, result.stddev_ms))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmarks determinant calculation engines on random matrices.")
+    parser.add_argument("--orders", type=int, nargs="+", default=DEFAULT_MATRIX_ORDERS,
+                        help="orders of generated matrices")
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES,
+                        help="shares of non-zero elements of generated matrices, e.g. 1.0 0.3 0.1")
+    parser.add_argument("--methods", nargs="+", choices=METHODS,
+                        default=[LAPLACE_METHOD, LU_METHOD, BAREISS_METHOD, SPARSE_METHOD],
+                        help="methods to be benchmarked")
+    parser.add_argument("--max-laplace-order", type=int, default=MAX_LAPLACE_ORDER,
+                        help="largest matrix order for methods based on Laplace expansion")
+    parser.add_argument("--max-tasks", type=int, default=4, help="largest number of parallel tasks")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_RUNS, help="number of unmeasured runs")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS, help="number of measured runs")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the random matrix generator")
+    parser.add_argument("--output", default="{}/benchmark_results_python".format(RESULTS_BASE_PATH),
+                        help="path of the results files, without extension (.json and .csv are written)")
+    return parser.parse_args()
+
+def benchmark():
+    """
+    Benchmarks serial and parallel determinant calculation (with every number of tasks up to the given
+    maximum) for each method, on seeded random matrices of given orders and densities. Each configuration is executed
+    several times after warm-up runs and timed with time.perf_counter. Median, minimum, mean and standard
+    deviation of execution times are printed and written into JSON and CSV files.
+
+    Return:
+        None
+    """
+    arguments = parse_arguments()
+    settings = {"orders": arguments.orders, "densities": arguments.densities, "methods": arguments.methods, "max_tasks": arguments.max_tasks,
+                "warmup": arguments.warmup, "repetitions": arguments.repetitions, "seed": arguments.seed,
+                "max_laplace_order": arguments.max_laplace_order}
+
+    with Worker_pool(arguments.max_tasks) as pool:
+        print("Started {} worker processes in {} ms.\n".format(pool.size, pool.warmup_time_ms))
+        engines = create_engines(pool, arguments.max_tasks, arguments.methods, arguments.max_laplace_order)
+        results = run_benchmarks(engines, arguments.orders, arguments.warmup, arguments.repetitions, arguments.seed,
+                                 arguments.densities)
+
+    write_json_results("{}.json".format(arguments.output), results, settings)
+    write_csv_results("{}.csv".format(arguments.output), results)
+    print("\nSuccessfully finished benchmark.")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,143 @@
+import argparse
+import os
+import statistics
+
+from determinanat_calc.dispatcher import Calibration_profile, EXPANSION_METHODS, default_profile_path, \
+    method_operations
+from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc.serial_det_calc import det_serial, METHODS, LAPLACE_METHOD, BAREISS_METHOD
+from determinanat_calc.worker_pool import Worker_pool
+from scaling.benchmark import measure, random_matrix
+from scaling.scaling import STRONG_SCALING_SPLIT_DEPTH
+
+# orders of matrices used to measure the cost of each kind of method
+EXPANSION_ORDERS = [5, 6, 7, 8]
+ELIMINATION_ORDERS = [20, 40, 60, 80]
+# tiny matrix whose parallel calculation time is almost only the overhead of tasks
+OVERHEAD_MATRIX_ORDER = 3
+# order of the matrix used to measure the efficiency of parallel calculation (strong scaling)
+EFFICIENCY_MATRIX_ORDER = 9
+MAX_SPAWN_TASKS = 4
+DEFAULT_REPETITIONS = 3
+MIN_EFFICIENCY = 0.05
+
+def median_ms(calculate, matrix, repetitions):
+    _, samples_ms = measure(calculate, matrix, 1, repetitions)
+    return statistics.median(samples_ms)
+
+def fit_line(xs, ys):
+    """
+    Fits y = intercept + slope * x by least squares, with non-negative intercept and slope.
+    A line can not be fitted through less than two distinct values of x, in that case
+    the whole of y is attributed to the slope (or to the intercept when x is zero).
+
+    Return:
+        intercept and slope ( (float, float) )
+    """
+    if len(set(xs)) < 2:
+        x, y = xs[0], statistics.mean(ys)
+        return (0.0, max(y / x, 0.0)) if x != 0 else (max(y, 0.0), 0.0)
+    slope, intercept = statistics.linear_regression(xs, ys)
+    return max(intercept, 0.0), max(slope, 0.0)
+
+def calibrate_method(method, repetitions):
+    """
+    Measures serial calculation times of random matrices of several orders using the given method
+    and fits its fixed cost and cost per operation (see dispatcher.Calibration_profile).
+    Bareiss algorithm is measured with integer matrices, which it calculates exactly.
+
+    Args:
+        method (string): one of serial_det_calc.METHODS
+        repetitions (int): number of measured runs for each order
+
+    Return:
+        fixed cost in milliseconds (call_ms) and cost of one operation in nanoseconds (ns_per_op) (dict)
+    """
+    orders = EXPANSION_ORDERS if method in EXPANSION_METHODS else ELIMINATION_ORDERS
+    operations = []
+    times_ms = []
+    for n in orders:
+        matrix = random_matrix(n)
+        if method == BAREISS_METHOD:
+            matrix = [[round(el) for el in row] for row in matrix]
+        times_ms.append(median_ms(lambda m: det_serial(m, method, use_structure=False)[0], matrix, repetitions))
+        operations.append(method_operations(method, n))
+    call_ms, ms_per_op = fit_line(operations, times_ms)
+    print("{}: {:.4f} ms per call, {:.1f} ns per operation".format(method, call_ms, ms_per_op * 1e6))
+    return {"call_ms": call_ms, "ns_per_op": ms_per_op * 1e6}
+
+def calibrate_parallel(profile, max_tasks, repetitions):
+    """
+    Measures the overhead of parallel calculation: with a worker pool and when processes are started,
+    using a tiny matrix and increasing number of tasks, and the efficiency of parallel calculation
+    of a larger matrix, like in the strong scaling experiment.
+
+    Args:
+        profile (Calibration_profile): profile to be filled
+        max_tasks (int): maximum number of parallel tasks
+        repetitions (int): number of measured runs of each calculation
+
+    Return:
+        None
+    """
+    matrix = random_matrix(OVERHEAD_MATRIX_ORDER)
+    tasks_nums = [tasks_num for tasks_num in range(1, max_tasks + 1)]
+    with Worker_pool(max_tasks) as pool:
+        pool_times_ms = [median_ms(lambda m: det_parallel(m, tasks_num, pool=pool, use_structure=False)[0],
+                                   matrix, repetitions) for tasks_num in tasks_nums]
+        pool_call_ms, pool_task_ms = fit_line(tasks_nums, pool_times_ms)
+
+        # strong scaling of a larger matrix with as many tasks as can run at the same time
+        test_matrix = random_matrix(EFFICIENCY_MATRIX_ORDER)
+        tasks_num = min(max_tasks, profile.cpus)
+        serial_ms = median_ms(lambda m: det_serial(m, LAPLACE_METHOD, use_structure=False)[0], test_matrix, 1)
+        parallel_ms = median_ms(lambda m: det_parallel(m, tasks_num, pool=pool, split_depth=STRONG_SCALING_SPLIT_DEPTH,
+                                                       use_structure=False)[0], test_matrix, 1)
+    overhead_ms = pool_call_ms + pool_task_ms * tasks_num
+    efficiency = serial_ms / (tasks_num * max(parallel_ms - overhead_ms, serial_ms / tasks_num))
+    efficiency = min(max(efficiency, MIN_EFFICIENCY), 1.0)
+
+    spawn_tasks_nums = [tasks_num for tasks_num in range(1, max(2, min(max_tasks, MAX_SPAWN_TASKS)) + 1)]
+    spawn_times_ms = [median_ms(lambda m: det_parallel(m, tasks_num, use_structure=False)[0], matrix, repetitions)
+                      for tasks_num in spawn_tasks_nums]
+    _, spawn_task_ms = fit_line([tasks_num - 1 for tasks_num in spawn_tasks_nums], spawn_times_ms)
+
+    profile.parallel = {"pool_call_ms": pool_call_ms, "pool_task_ms": pool_task_ms, "spawn_task_ms": spawn_task_ms,
+                        "efficiency": efficiency}
+    print("parallel: {:.3f} ms per call and {:.3f} ms per task with a pool, {:.3f} ms per started process, "
+          "efficiency {:.2f}".format(pool_call_ms, pool_task_ms, spawn_task_ms, efficiency))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measures the costs of determinant calculation on this host and "
+                                                 "stores them as the calibration profile used by the dispatcher.")
+    parser.add_argument("--methods", nargs="+", choices=METHODS, default=METHODS, help="methods to be calibrated")
+    parser.add_argument("--max-tasks", type=int, default=os.cpu_count() or 1,
+                        help="maximum number of parallel tasks (default: number of CPUs)")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS,
+                        help="number of measured runs of each calculation")
+    parser.add_argument("--output", default=None,
+                        help="path of the profile (default: {})".format(default_profile_path()))
+    return parser.parse_args()
+
+def calibrate():
+    """
+    Measures the costs of serial calculation with each method and the overhead and efficiency of
+    parallel calculation on this host, and writes them into the calibration profile of the host,
+    which is used by the dispatcher (see dispatcher.det) to choose how determinants are calculated.
+
+    Return:
+        None
+    """
+    arguments = parse_arguments()
+    profile = Calibration_profile()
+    for method in arguments.methods:
+        profile.methods[method] = calibrate_method(method, arguments.repetitions)
+    calibrate_parallel(profile, arguments.max_tasks, arguments.repetitions)
+
+    profile_path = arguments.output if arguments.output is not None else default_profile_path()
+    profile.save(profile_path)
+    print("\nCalibration profile of host {} written into {}.".format(profile.host, profile_path))
+
+
+if __name__ == "__main__":
+    calibrate()
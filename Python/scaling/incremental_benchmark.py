@@ -0,0 +1,174 @@
+import argparse
+import math
+import random
+import time
+
+from determinanat_calc.elimination_det_calc import lu_det
+from determinanat_calc.incremental_det import DeterminantTracker
+from scaling.benchmark import random_matrix, ELEMENT_RANGE
+
+RESULTS_BASE_PATH = "../../results"
+DEFAULT_MATRIX_ORDERS = [25, 50, 100, 200]
+DEFAULT_EDITS = 50
+DEFAULT_SEED = 2020
+ROW_EDIT = "row"
+COLUMN_EDIT = "column"
+RANK_ONE_EDIT = "rank_one"
+# replaces a row with a copy of another row, which makes the matrix singular, replaces a copied row
+# with random values, so the matrix becomes regular again, or replaces any row with random values
+COPY_ROW_EDIT = "copy_row"
+EDIT_KINDS = [ROW_EDIT, COLUMN_EDIT, RANK_ONE_EDIT, COPY_ROW_EDIT]
+
+class Incremental_result:
+    """
+    Comparison of incremental determinant updates with full recalculation for one kind of edits.
+
+    Attributes:
+        matrix_order (int): order of the matrix
+        edit_kind (string): one of EDIT_KINDS
+        edits (int): number of edits
+        incremental_ms (float): mean time of an incremental update in milliseconds
+        recompute_ms (float): mean time of full recalculation (LU decomposition) in milliseconds
+        max_relative_error (float): largest relative difference between updated and recalculated determinant
+        refactors (int): number of refactorizations done by the tracker, including the initial one
+    """
+
+    def __init__(self, matrix_order, edit_kind, edits, incremental_ms, recompute_ms, max_relative_error, refactors):
+        self.matrix_order = matrix_order
+        self.edit_kind = edit_kind
+        self.edits = edits
+        self.incremental_ms = incremental_ms
+        self.recompute_ms = recompute_ms
+        self.max_relative_error = max_relative_error
+        self.refactors = refactors
+
+def equal_rows(matrix):
+    # rows which are equal to one of the previous rows
+    return [row for row in range(len(matrix)) if matrix[row] in matrix[:row]]
+
+def random_edit(rng, matrix, edit_kind):
+    """
+    Applies a random edit of given kind to the matrix.
+
+    Args:
+        rng (random.Random): random number generator
+        matrix (list(list(float))): matrix to be edited
+        edit_kind (string): one of EDIT_KINDS
+
+    Return:
+        function which applies the same edit to a DeterminantTracker (function)
+    """
+    n = len(matrix)
+    idx = rng.randrange(n)
+    values = [rng.uniform(-ELEMENT_RANGE, ELEMENT_RANGE) for _ in range(n)]
+    if edit_kind == COPY_ROW_EDIT:
+        copied_rows = equal_rows(matrix)
+        choice = rng.randrange(3)
+        if choice == 0:
+            values = list(matrix[rng.choice([row for row in range(n) if row != idx])])
+        elif choice == 1 and copied_rows:
+            idx = rng.choice(copied_rows)
+    if edit_kind in [ROW_EDIT, COPY_ROW_EDIT]:
+        matrix[idx] = list(values)
+        return lambda tracker: tracker.replace_row(idx, values)
+    if edit_kind == COLUMN_EDIT:
+        for row in range(n):
+            matrix[row][idx] = values[row]
+        return lambda tracker: tracker.replace_column(idx, values)
+    u = [rng.uniform(-1.0, 1.0) for _ in range(n)]
+    for row in range(n):
+        for col in range(n):
+            matrix[row][col] += u[row] * values[col]
+    return lambda tracker: tracker.rank_one_update(u, values)
+
+def incremental_experiment(n, edit_kind, edits, seed):
+    """
+    Applies random edits to a random matrix and measures the time of each incremental determinant
+    update and of full recalculation of the edited matrix using LU decomposition.
+
+    Args:
+        n (int): order of the matrix
+        edit_kind (string): one of EDIT_KINDS
+        edits (int): number of edits
+        seed (int): seed of the random number generator
+
+    Return:
+        result of the experiment (Incremental_result)
+    """
+    rng = random.Random("{}/{}/{}".format(seed, n, edit_kind))
+    matrix = random_matrix(n, seed)
+    tracker = DeterminantTracker(matrix)
+
+    incremental_ms = 0.0
+    recompute_ms = 0.0
+    max_relative_error = 0.0
+    for _ in range(edits):
+        apply_edit = random_edit(rng, matrix, edit_kind)
+
+        start_time = time.perf_counter()
+        updated = apply_edit(tracker)
+        end_time = time.perf_counter()
+        incremental_ms += (end_time - start_time) * 1000
+
+        start_time = time.perf_counter()
+        recomputed = lu_det([list(row) for row in matrix])
+        end_time = time.perf_counter()
+        recompute_ms += (end_time - start_time) * 1000
+
+        if equal_rows(matrix):
+            # the determinant of a matrix with equal rows is zero, the error is relative to the largest
+            # possible determinant of the matrix (Hadamard's bound, the product of lengths of rows)
+            hadamard_bound = math.prod(math.sqrt(sum(el * el for el in row)) for row in matrix)
+            max_relative_error = max(max_relative_error, abs(updated) / hadamard_bound)
+        elif recomputed != 0:
+            max_relative_error = max(max_relative_error, abs(updated - recomputed) / abs(recomputed))
+
+    return Incremental_result(n, edit_kind, edits, incremental_ms / edits, recompute_ms / edits, max_relative_error,
+                              tracker.refactors)
+
+def write_incremental_results(results_file_path, results):
+    with open(results_file_path, 'w') as file:
+        file.write("matrix_order,edit_kind,edits,incremental_ms,recompute_ms,speedup,max_relative_error,refactors\n")
+        for result in results:
+            file.write("{},{},{},{},{},{},{},{}\n"
+                       .format(result.matrix_order, result.edit_kind, result.edits, result.incremental_ms,
+                               result.recompute_ms, result.recompute_ms / result.incremental_ms,
+                               result.max_relative_error, result.refactors))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compares incremental determinant updates with full recalculation.")
+    parser.add_argument("--orders", type=int, nargs="+", default=DEFAULT_MATRIX_ORDERS, help="orders of matrices")
+    parser.add_argument("--edits", type=int, default=DEFAULT_EDITS, help="number of edits of each kind")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the random number generator")
+    parser.add_argument("--output", default="{}/incremental_results_python.csv".format(RESULTS_BASE_PATH),
+                        help="path of the CSV results file")
+    return parser.parse_args()
+
+def benchmark_incremental():
+    """
+    For each matrix order and each kind of edit (row replacement, column replacement, rank-one update,
+    copying a row, which makes the matrix singular, and replacing the copy),
+    compares the mean time of incremental determinant update (see incremental_det.DeterminantTracker)
+    with full recalculation using LU decomposition, and checks that both give the same determinant.
+    Results are printed onto the console and written into a CSV file.
+
+    Return:
+        None
+    """
+    arguments = parse_arguments()
+    results = []
+    for n in arguments.orders:
+        for edit_kind in EDIT_KINDS:
+            result = incremental_experiment(n, edit_kind, arguments.edits, arguments.seed)
+            results.append(result)
+            print("n = {}, {} edits: incremental {:.3f} ms, recompute {:.3f} ms ({:.1f}X), "
+                  "max relative error {:.2e}, {} refactors"
+                  .format(n, edit_kind, result.incremental_ms, result.recompute_ms,
+                          result.recompute_ms / result.incremental_ms, result.max_relative_error, result.refactors))
+
+    write_incremental_results(arguments.output, results)
+    print("\nSuccessfully finished incremental benchmark.")
+
+
+if __name__ == "__main__":
+    benchmark_incremental()
@@ -0,0 +1,110 @@
+import argparse
+import time
+
+from determinanat_calc.iterative_laplace import iterative_det, expansion_nodes
+from determinanat_calc.serial_det_calc import minor_calc
+from scaling.benchmark import random_matrix
+
+RESULTS_BASE_PATH = "../../results"
+DEFAULT_MATRIX_ORDERS = [6, 7, 8, 9]
+DEFAULT_REPETITIONS = 3
+DEFAULT_SEED = 2020
+
+class Kernel_result:
+    """
+    Comparison of the recursive and the iterative Laplace expansion kernel for one matrix order.
+
+    Attributes:
+        matrix_order (int): order of the matrix
+        nodes (int): number of submatrices visited by the expansion
+        recursive_ms (float): best time of serial_det_calc.minor_calc in milliseconds
+        iterative_ms (float): best time of iterative_laplace.iterative_det in milliseconds
+        identical (bool): whether both kernels gave exactly the same determinant
+    """
+
+    def __init__(self, matrix_order, nodes, recursive_ms, iterative_ms, identical):
+        self.matrix_order = matrix_order
+        self.nodes = nodes
+        self.recursive_ms = recursive_ms
+        self.iterative_ms = iterative_ms
+        self.identical = identical
+
+    def ns_per_node(self, exec_time_ms):
+        return exec_time_ms * 1e6 / self.nodes
+
+def best_time_ms(calculate, repetitions):
+    best_ms = None
+    value = None
+    for _ in range(repetitions):
+        start_time = time.perf_counter()
+        value = calculate()
+        end_time = time.perf_counter()
+        exec_time_ms = (end_time - start_time) * 1000
+        best_ms = exec_time_ms if best_ms is None else min(best_ms, exec_time_ms)
+    return value, best_ms
+
+def kernel_experiment(n, repetitions, seed):
+    """
+    Calculates the determinant of a random matrix of order n using both kernels and measures their best times.
+
+    Args:
+        n (int): order of the matrix
+        repetitions (int): number of measured runs of each kernel
+        seed (int): seed of the random matrix
+
+    Return:
+        result of the experiment (Kernel_result)
+    """
+    matrix = random_matrix(n, seed)
+    cols = [i for i in range(n)]
+    recursive_det, recursive_ms = best_time_ms(lambda: minor_calc(matrix, 0, cols)[0], repetitions)
+    iterative_value, iterative_ms = best_time_ms(lambda: iterative_det(matrix), repetitions)
+    return Kernel_result(n, expansion_nodes(n), recursive_ms, iterative_ms, recursive_det == iterative_value)
+
+def write_kernel_results(results_file_path, results):
+    with open(results_file_path, 'w') as file:
+        file.write("matrix_order,nodes,recursive_ms,iterative_ms,recursive_ns_per_node,iterative_ns_per_node,"
+                   "speedup,identical\n")
+        for result in results:
+            file.write("{},{},{},{},{},{},{},{}\n"
+                       .format(result.matrix_order, result.nodes, result.recursive_ms, result.iterative_ms,
+                               result.ns_per_node(result.recursive_ms), result.ns_per_node(result.iterative_ms),
+                               result.recursive_ms / result.iterative_ms, result.identical))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compares the per-node cost of recursive and iterative "
+                                                 "Laplace expansion kernels.")
+    parser.add_argument("--orders", type=int, nargs="+", default=DEFAULT_MATRIX_ORDERS, help="orders of matrices")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS,
+                        help="number of measured runs of each kernel")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of random matrices")
+    parser.add_argument("--output", default="{}/kernel_results_python.csv".format(RESULTS_BASE_PATH),
+                        help="path of the CSV results file")
+    return parser.parse_args()
+
+def benchmark_kernels():
+    """
+    For each matrix order, calculates the determinant of a random matrix using the recursive Laplace
+    expansion (serial_det_calc.minor_calc) and the iterative one (iterative_laplace.iterative_det),
+    checks that the results are identical and reports the time per visited submatrix of both kernels.
+    Results are printed onto the console and written into a CSV file.
+
+    Return:
+        None
+    """
+    arguments = parse_arguments()
+    results = []
+    for n in arguments.orders:
+        result = kernel_experiment(n, arguments.repetitions, arguments.seed)
+        results.append(result)
+        print("n = {} ({} nodes): recursive {:.1f} ns/node, iterative {:.1f} ns/node ({:.2f}X), {}"
+              .format(n, result.nodes, result.ns_per_node(result.recursive_ms), result.ns_per_node(result.iterative_ms),
+                      result.recursive_ms / result.iterative_ms,
+                      "identical results" if result.identical else "RESULTS DIFFER"))
+
+    write_kernel_results(arguments.output, results)
+    print("\nSuccessfully finished kernel benchmark.")
+
+
+if __name__ == "__main__":
+    benchmark_kernels()
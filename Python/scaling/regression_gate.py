@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from IO.matrix_reader import read_matrix
+from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc.serial_det_calc import det_serial
+from determinanat_calc.worker_pool import Worker_pool
+from scaling.scaling import read_scaling_results, STRONG_SCALING_MATRIX_ORDER, STRONG_SCALING_SPLIT_DEPTH, \
+    AVAILABLE_MATRIX_ORDERS, default_strong_scaling_max_tasks
+
+# paths are relative to the repository, so the gate can be run from any directory
+REPOSITORY_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+MATRIX_PATH_TEMPLATE = os.path.join(REPOSITORY_PATH, "test_data", "matrica{}x{}.txt")
+RESULTS_BASE_PATH = os.path.join(REPOSITORY_PATH, "results")
+
+STRONG_EXPERIMENT = "strong"
+WEAK_EXPERIMENT = "weak"
+EXPERIMENTS = [STRONG_EXPERIMENT, WEAK_EXPERIMENT]
+# serial calculation of the matrix of order 11 takes minutes, so it is left out by default
+DEFAULT_WEAK_ORDERS = [n for n in AVAILABLE_MATRIX_ORDERS if n <= STRONG_SCALING_MATRIX_ORDER]
+DEFAULT_REPETITIONS = 3
+# a configuration regressed if it is slower than the baseline by more than the relative tolerance
+# and by more than the minimum difference, which hides the noise of very short calculations
+DEFAULT_TOLERANCE = 0.15
+DEFAULT_MIN_DIFFERENCE_MS = 5.0
+REGRESSION_EXIT_CODE = 1
+# exit code 2 is used by argparse for invalid arguments
+MISSING_BASELINE_EXIT_CODE = 3
+
+class Gate_measurement:
+    """
+    Execution time of one configuration of a scaling experiment.
+
+    Attributes:
+        experiment (string): strong or weak
+        matrix_order (int): order of the matrix
+        tasks_num (int): number of parallel tasks, 1 for serial calculation
+        exec_time_ms (float): best execution time in milliseconds
+    """
+
+    def __init__(self, experiment, matrix_order, tasks_num, exec_time_ms):
+        self.experiment = experiment
+        self.matrix_order = matrix_order
+        self.tasks_num = tasks_num
+        self.exec_time_ms = exec_time_ms
+
+    def key(self):
+        return "{}/{}/{}".format(self.experiment, self.matrix_order, self.tasks_num)
+
+    def description(self):
+        calculation = "serial" if self.tasks_num == 1 else "{} tasks".format(self.tasks_num)
+        return "{} n={} {}".format(self.experiment, self.matrix_order, calculation)
+
+def load_matrix(matrix_order):
+    return read_matrix(MATRIX_PATH_TEMPLATE.format(matrix_order, matrix_order))
+
+def best_exec_time_ms(calculate, repetitions):
+    # the best time is the least affected by other load of the host
+    return min(calculate() for _ in range(repetitions))
+
+def measure_strong_scaling(matrix_order, max_tasks, repetitions, pool):
+    """
+    Measures the configurations of the strong scaling experiment (see scaling.strong_scaling_experiment):
+    serial calculation and parallel calculation with two to max_tasks tasks of the same matrix.
+
+    Return:
+        measured configurations (list(Gate_measurement))
+    """
+    matrix = load_matrix(matrix_order)
+    serial_exec_time_ms = best_exec_time_ms(lambda: det_serial(matrix, use_structure=False)[2], repetitions)
+    measurements = [Gate_measurement(STRONG_EXPERIMENT, matrix_order, 1, serial_exec_time_ms)]
+    for tasks_num in range(2, max_tasks + 1):
+        exec_time_ms = best_exec_time_ms(lambda: det_parallel(matrix, tasks_num, pool=pool,
+                                                              split_depth=STRONG_SCALING_SPLIT_DEPTH,
+                                                              use_structure=False)[1], repetitions)
+        measurements.append(Gate_measurement(STRONG_EXPERIMENT, matrix_order, tasks_num, exec_time_ms))
+    return measurements
+
+def measure_weak_scaling(matrix_orders, repetitions, pool):
+    """
+    Measures the configurations of the weak scaling experiment (see scaling.weak_scaling_experiment):
+    serial calculation and parallel calculation with n tasks of matrices of each order n.
+
+    Return:
+        measured configurations (list(Gate_measurement))
+    """
+    measurements = []
+    for n in matrix_orders:
+        matrix = load_matrix(n)
+        serial_exec_time_ms = best_exec_time_ms(lambda: det_serial(matrix, use_structure=False)[2], repetitions)
+        parallel_exec_time_ms = best_exec_time_ms(lambda: det_parallel(matrix, n, pool=pool, use_structure=False)[1],
+                                                  repetitions)
+        measurements.append(Gate_measurement(WEAK_EXPERIMENT, n, 1, serial_exec_time_ms))
+        measurements.append(Gate_measurement(WEAK_EXPERIMENT, n, n, parallel_exec_time_ms))
+    return measurements
+
+def default_baseline_path():
+    return os.path.join(RESULTS_BASE_PATH, "regression_baseline_python_{}.json".format(platform.node()))
+
+def load_baseline(baseline_path):
+    """
+    Loads the execution times of a baseline written by save_baseline.
+
+    Return:
+        execution time of each configuration by its key, or None if there is no baseline (dict)
+    """
+    if not os.path.exists(baseline_path):
+        return None
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    if baseline["host"] != platform.node():
+        raise Exception("Baseline {} was measured on host {}, execution times of host {} can not be compared "
+                        "with it.".format(baseline_path, baseline["host"], platform.node()))
+    return baseline["exec_times_ms"]
+
+def save_baseline(baseline_path, measurements):
+    directory = os.path.dirname(baseline_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    baseline = {"host": platform.node(), "cpus": os.cpu_count() or 1,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "exec_times_ms": {measurement.key(): measurement.exec_time_ms for measurement in measurements}}
+    with open(baseline_path, 'w') as file:
+        json.dump(baseline, file, indent=2)
+
+def compare_with_baseline(measurements, baseline, tolerance, min_difference_ms):
+    """
+    Compares measured execution times with the baseline and prints the difference of each configuration.
+
+    Args:
+        measurements (list(Gate_measurement)): measured configurations
+        baseline (dict): execution time of each configuration by its key (see load_baseline)
+        tolerance (float): allowed relative slowdown, e.g. 0.15 for 15%
+        min_difference_ms (float): slowdowns of at most this many milliseconds are always allowed
+
+    Return:
+        number of regressed configurations (int)
+    """
+    regressions = 0
+    print("{:<26}{:>14}{:>14}{:>10}  {}".format("configuration", "baseline ms", "current ms", "change", "status"))
+    for measurement in measurements:
+        baseline_ms = baseline.get(measurement.key())
+        if baseline_ms is None:
+            print("{:<26}{:>14}{:>14.3f}{:>10}  new".format(measurement.description(), "-",
+                                                            measurement.exec_time_ms, "-"))
+            continue
+        difference_ms = measurement.exec_time_ms - baseline_ms
+        change = "{:+.1f}%".format(100.0 * difference_ms / baseline_ms) if baseline_ms > 0 else "-"
+        if difference_ms > tolerance * baseline_ms and difference_ms > min_difference_ms:
+            status = "REGRESSION"
+            regressions += 1
+        elif -difference_ms > tolerance * baseline_ms and -difference_ms > min_difference_ms:
+            status = "improved"
+        else:
+            status = "ok"
+        print("{:<26}{:>14.3f}{:>14.3f}{:>10}  {}".format(measurement.description(), baseline_ms,
+                                                          measurement.exec_time_ms, change, status))
+    return regressions
+
+def language_ratio_report(results_base_path):
+    """
+    Prints the ratio of execution times of the Python and the Go implementation for each configuration
+    of the scaling experiments, using the results files of both implementations.
+
+    Args:
+        results_base_path (string): directory of the results files
+
+    Return:
+        None
+    """
+    for experiment in EXPERIMENTS:
+        python_path = os.path.join(results_base_path, "{}_scaling_results_python.csv".format(experiment))
+        go_path = os.path.join(results_base_path, "{}_scaling_results_go.csv".format(experiment))
+        if not os.path.exists(python_path) or not os.path.exists(go_path):
+            print("\nNo {} scaling results of both implementations in {}.".format(experiment, results_base_path))
+            continue
+        go_results = {(result.matrix_order, result.parallel_tasks_num): result
+                      for result in read_scaling_results(go_path)}
+        print("\nPython / Go execution time, {} scaling:".format(experiment))
+        print("{:<20}{:>16}{:>16}".format("configuration", "serial", "parallel"))
+        for python_result in read_scaling_results(python_path):
+            go_result = go_results.get((python_result.matrix_order, python_result.parallel_tasks_num))
+            if go_result is None:
+                continue
+            # Go results are in whole milliseconds, so very short calculations have no ratio
+            serial_ratio = "{:.1f}X".format(python_result.serial_exec_time_ms / go_result.serial_exec_time_ms) \
+                if go_result.serial_exec_time_ms > 0 else "-"
+            parallel_ratio = "{:.1f}X".format(python_result.parallel_exec_time_ms / go_result.parallel_exec_time_ms) \
+                if go_result.parallel_exec_time_ms > 0 else "-"
+            print("{:<20}{:>16}{:>16}".format("n={} {} tasks".format(python_result.matrix_order,
+                                                                     python_result.parallel_tasks_num),
+                                              serial_ratio, parallel_ratio))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Reruns the scaling experiments and compares execution times with "
+                                                 "the baseline of this host. Exits with code {} if any configuration "
+                                                 "regressed and with code {} if there is no baseline."
+                                     .format(REGRESSION_EXIT_CODE, MISSING_BASELINE_EXIT_CODE))
+    parser.add_argument("--experiments", nargs="+", choices=EXPERIMENTS, default=EXPERIMENTS,
+                        help="scaling experiments to be run")
+    parser.add_argument("--strong-order", type=int, default=STRONG_SCALING_MATRIX_ORDER,
+                        help="order of the matrix of the strong scaling experiment")
+    parser.add_argument("--max-tasks", type=int, default=default_strong_scaling_max_tasks(),
+                        help="maximum number of tasks of the strong scaling experiment (default: number of CPUs, "
+                             "at least the order of the matrix)")
+    parser.add_argument("--weak-orders", type=int, nargs="+", choices=AVAILABLE_MATRIX_ORDERS,
+                        default=DEFAULT_WEAK_ORDERS, help="orders of matrices of the weak scaling experiment")
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS,
+                        help="number of measured runs of each configuration, the best time is used")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown (default: {})".format(DEFAULT_TOLERANCE))
+    parser.add_argument("--min-difference-ms", type=float, default=DEFAULT_MIN_DIFFERENCE_MS,
+                        help="slowdowns of at most this many milliseconds are allowed (default: {})"
+                        .format(DEFAULT_MIN_DIFFERENCE_MS))
+    parser.add_argument("--baseline", default=None,
+                        help="path of the baseline (default: {})".format(default_baseline_path()))
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the measured execution times as the new baseline instead of comparing them")
+    parser.add_argument("--results-dir", default=RESULTS_BASE_PATH,
+                        help="directory of the Python and Go scaling results used for the ratio report")
+    arguments = parser.parse_args()
+    if arguments.tolerance < 0:
+        parser.error("--tolerance must not be negative, got {}".format(arguments.tolerance))
+    if arguments.min_difference_ms < 0:
+        parser.error("--min-difference-ms must not be negative, got {}".format(arguments.min_difference_ms))
+    return arguments
+
+def regression_gate():
+    """
+    Measures the configurations of the strong and weak scaling experiments (best of several runs),
+    without the structure analysis like the experiments and the Go implementation, and compares them
+    with the baseline of this host. The baseline is a JSON file tagged with the name of the host, since
+    execution times of different hosts can not be compared. A per-configuration diff is printed,
+    followed by the ratio of Python and Go execution times from the results files.
+    With --update-baseline the measured times become the baseline instead. A missing baseline is an
+    error, so the gate does not silently pass on hosts which were never measured.
+
+    Return:
+        exit code: 0, REGRESSION_EXIT_CODE if any configuration regressed or MISSING_BASELINE_EXIT_CODE
+        if there is no baseline of this host (int)
+    """
+    arguments = parse_arguments()
+    baseline_path = arguments.baseline if arguments.baseline is not None else default_baseline_path()
+    baseline = None
+    if not arguments.update_baseline:
+        baseline = load_baseline(baseline_path)
+        if baseline is None:
+            print("There is no baseline of host {} in {}. Run the gate with --update-baseline to create it."
+                  .format(platform.node(), baseline_path))
+            return MISSING_BASELINE_EXIT_CODE
+
+    measurements = []
+    pool_size = max([arguments.max_tasks] + arguments.weak_orders)
+    with Worker_pool(pool_size) as pool:
+        if STRONG_EXPERIMENT in arguments.experiments:
+            print("Measuring strong scaling of matrix of order {}...".format(arguments.strong_order))
+            measurements += measure_strong_scaling(arguments.strong_order, arguments.max_tasks,
+                                                   arguments.repetitions, pool)
+        if WEAK_EXPERIMENT in arguments.experiments:
+            print("Measuring weak scaling of matrices of orders {}...".format(arguments.weak_orders))
+            measurements += measure_weak_scaling(arguments.weak_orders, arguments.repetitions, pool)
+
+    regressions = 0
+    if arguments.update_baseline:
+        save_baseline(baseline_path, measurements)
+        print("\nBaseline of host {} with {} configurations written into {}."
+              .format(platform.node(), len(measurements), baseline_path))
+    else:
+        print("\nComparison with baseline {} (tolerance {:.0f}%, at least {} ms):\n"
+              .format(baseline_path, 100 * arguments.tolerance, arguments.min_difference_ms))
+        regressions = compare_with_baseline(measurements, baseline, arguments.tolerance, arguments.min_difference_ms)
+
+    language_ratio_report(arguments.results_dir)
+
+    if regressions > 0:
+        print("\n{} of {} configurations regressed.".format(regressions, len(measurements)))
+        return REGRESSION_EXIT_CODE
+    print("\nNo performance regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(regression_gate())
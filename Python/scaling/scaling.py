@@ -1,12 +1,27 @@
+import argparse
+import os
+import statistics
+
 from IO.matrix_reader import read_matrix
-from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc import tracing
+from determinanat_calc.parallel_det_calc import det_parallel, Process_executor, Thread_executor, PROCESS_BACKEND, \
+    THREAD_BACKEND
 from determinanat_calc.serial_det_calc import det_serial
+from determinanat_calc.worker_pool import Worker_pool
+from scaling.benchmark import measure
 
 
 MATRIX_PATH_TEMPLATE = "../../test_data/matrica{}x{}.txt"
 RESULTS_BASE_PATH = "../../results"
 STRONG_SCALING_MATRIX_ORDER = 10
+# number of first rows used for splitting the determinant into minors, with depth 2 there are
+# n * (n - 1) minors, so more than n tasks can be used
+STRONG_SCALING_SPLIT_DEPTH = 2
+STRONG_SCALING_MINORS = STRONG_SCALING_MATRIX_ORDER * (STRONG_SCALING_MATRIX_ORDER - 1)
 AVAILABLE_MATRIX_ORDERS = [3, 5, 8, 9, 10, 11]
+# each calculation is executed after unmeasured warm-up runs, and the median of measured runs is reported
+DEFAULT_WARMUP_RUNS = 1
+DEFAULT_REPETITIONS = 3
 
 SERIAL_CODE_SHARE = 0
 PARALLEL_CODE_SHARE = 1
@@ -60,6 +75,29 @@ def write_scaling_results(results_file_path, scaling_results):
                        .format(result.matrix_order, result.serial_exec_time_ms, result.parallel_tasks_num,
                                result.parallel_exec_time_ms, result.achieved_speedup, result.max_theoretical_speedup))
 
+def read_scaling_results(results_file_path):
+    """
+    Loads results from a CSV file written by write_scaling_results, or by the Go implementation,
+    which uses the same header.
+
+    Args:
+        results_file_path (string): path of the CSV results file
+
+    Return:
+        information about determinant calculation attempts (list(Scaling_result))
+    """
+    scaling_results = []
+    with open(results_file_path) as file:
+        # skip header
+        file.readline()
+        for line in file:
+            if not line.strip():
+                continue
+            values = line.strip().split(",")
+            scaling_results.append(Scaling_result(int(values[0]), float(values[1]), int(values[2]), float(values[3]),
+                                                  float(values[4]), float(values[5])))
+    return scaling_results
+
 def load_test_matrix(matrix_order):
     """
     Loads a test matrix of given order from a predefined directory.
@@ -77,29 +115,117 @@ def load_test_matrix(matrix_order):
 
 # Scaling experiment functions
 
+def default_strong_scaling_max_tasks():
+    """
+    Returns the default maximum number of tasks of the strong scaling experiment: the number of CPUs,
+    so scaling past the order of the matrix is measured on hosts with more CPUs, but at least the order
+    of the matrix and at most the number of minors, since each task needs at least one minor.
+    """
+    return min(STRONG_SCALING_MINORS, max(STRONG_SCALING_MATRIX_ORDER, os.cpu_count() or 1))
+
 def max_speedup_Amdahl(processes_num):
     return 1.0 / (SERIAL_CODE_SHARE + PARALLEL_CODE_SHARE / processes_num)
 
 def max_speedup_Gustafson(processes_num):
     return SERIAL_CODE_SHARE + PARALLEL_CODE_SHARE * processes_num
 
-def strong_scaling_experiment():
+def measure_serial(matrix, warmup_runs, repetitions):
+    """
+    Measures serial calculation of the determinant (see benchmark.measure) and the share of its
+    execution time spent in code that can be run in parallel.
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        warmup_runs (int): number of runs before measurement
+        repetitions (int): number of measured runs
+
+    Return:
+        determinant, median execution time in milliseconds and median parallel code share
+        ( (float, float, float) )
+    """
+    parallel_code_shares = []
+
+    def calculate(matrix):
+        determinant, potential_parallel_code_exec_time_ms, exec_time_ms = det_serial(matrix, use_structure=False)
+        parallel_code_shares.append(potential_parallel_code_exec_time_ms / exec_time_ms)
+        return determinant
+
+    determinant, samples_ms = measure(calculate, matrix, warmup_runs, repetitions)
+    return determinant, statistics.median(samples_ms), statistics.median(parallel_code_shares[warmup_runs:])
+
+def measure_parallel(matrix, tasks_num, warmup_runs, repetitions, **kwargs):
+    """
+    Measures parallel calculation of the determinant (see benchmark.measure).
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        tasks_num (int): number of parallel tasks
+        warmup_runs (int): number of runs before measurement
+        repetitions (int): number of measured runs
+        kwargs: other arguments of parallel_det_calc.det_parallel
+
+    Return:
+        determinant and median execution time in milliseconds ( (float, float) )
+    """
+    determinant, samples_ms = measure(lambda matrix: det_parallel(matrix, tasks_num, use_structure=False, **kwargs)[0],
+                                      matrix, warmup_runs, repetitions)
+    return determinant, statistics.median(samples_ms)
+
+def finish_tracing(trace_file_path):
+    """
+    Stops tracing, writes recorded spans into a Chrome trace file and prints their summary.
+
+    Args:
+        trace_file_path (string): path of the trace file to be created
+
+    Return:
+        None
+    """
+    tracer = tracing.disable_tracing()
+    tracer.export_chrome_trace(trace_file_path)
+    print("Trace summary:\n{}\n".format(tracer.summary()))
+    print("Trace written into {}.".format(trace_file_path))
+
+def strong_scaling_experiment(trace=False, max_tasks=None, warmup_runs=DEFAULT_WARMUP_RUNS,
+                              repetitions=DEFAULT_REPETITIONS):
     """
     Loads a predefined matrix for strong scaling and calculates the determinant
-    using parallel implementation with number of tasks ranging from one to the
-    order of the matrix. Statistics about calculations are printed onto the console
-    and written into a predefined results file: strong_scaling_results_python.csv.
+    using parallel implementation with number of tasks ranging from two to
+    max_tasks. All parallel calculations use the same pool of worker processes.
+    Each calculation is repeated after warm-up runs and the median execution time
+    is reported (see benchmark.measure).
+    Statistics about calculations are printed onto the console and written into
+    a predefined results file: strong_scaling_results_python.csv.
+    Each calculation is repeated with tasks executed by threads of this process
+    instead of worker processes (see parallel_det_calc.Thread_executor), and these
+    results are written into strong_scaling_results_python_threads.csv, so both
+    backends can be compared.
+
+    Args:
+        trace (bool): if true, spans of all calculations are recorded and written into
+        strong_scaling_trace_python.json (see tracing module)
+        max_tasks (int): maximum number of tasks, at most STRONG_SCALING_MINORS, by default
+        default_strong_scaling_max_tasks()
+        warmup_runs (int): number of unmeasured runs of each calculation
+        repetitions (int): number of measured runs of each calculation
 
     Return:
         None
     """
+    if max_tasks is None:
+        max_tasks = default_strong_scaling_max_tasks()
+    if not 2 <= max_tasks <= STRONG_SCALING_MINORS:
+        raise Exception("Maximum number of tasks must be between 2 and {} (number of minors), got {}."
+                        .format(STRONG_SCALING_MINORS, max_tasks))
     print("==========================")
     print("Strong scaling experiment:")
     print("==========================\n\n")
     matrix = load_test_matrix(STRONG_SCALING_MATRIX_ORDER)
+    if trace:
+        tracing.enable_tracing()
 
-    determinant, potential_parallel_code_exec_time_ms, serial_exec_time_ms = det_serial(matrix)
-    PARALLEL_CODE_SHARE = potential_parallel_code_exec_time_ms / serial_exec_time_ms
+    determinant, serial_exec_time_ms, PARALLEL_CODE_SHARE = measure_serial(matrix, warmup_runs, repetitions)
+    potential_parallel_code_exec_time_ms = PARALLEL_CODE_SHARE * serial_exec_time_ms
     SERIAL_CODE_SHARE = 1 - PARALLEL_CODE_SHARE
     print("Serial determinant calculation of matrix of order {} took {} ms."
           .format(len(matrix), serial_exec_time_ms))
@@ -107,28 +233,48 @@ def strong_scaling_experiment():
     print("Parallel code share is: {}\nSerial code share is: {}\n".format(PARALLEL_CODE_SHARE, SERIAL_CODE_SHARE))
 
 
-    results = []
-    for tasks_num in range(2, STRONG_SCALING_MATRIX_ORDER + 1):
-        determinant, parallel_exec_time_ms = det_parallel(matrix, tasks_num)
-        achieved_speedup = serial_exec_time_ms / parallel_exec_time_ms
-        max_speedup = max_speedup_Amdahl(tasks_num)
-        result = Scaling_result(STRONG_SCALING_MATRIX_ORDER, serial_exec_time_ms, tasks_num,
-                                parallel_exec_time_ms, achieved_speedup, max_speedup)
-        results.append(result)
-
-        print("Parallel determinant calculation of matrix of order {} with {} tasks took {} ms."
-              .format(STRONG_SCALING_MATRIX_ORDER, tasks_num, parallel_exec_time_ms))
-        print("Achieved speedup is: {}X.\nMaximum speedup according to Amdahl’s law is: {}X.\n".format(achieved_speedup, max_speedup))
-
-    write_scaling_results("{}/strong_scaling_results_python.csv".format(RESULTS_BASE_PATH), results)
+    results = {PROCESS_BACKEND: [], THREAD_BACKEND: []}
+    with Worker_pool(max_tasks) as pool, Thread_executor(max_tasks) as thread_executor:
+        print("Started {} worker processes in {} ms.\n".format(pool.size, pool.warmup_time_ms))
+        executors = [(PROCESS_BACKEND, Process_executor(pool)), (THREAD_BACKEND, thread_executor)]
+
+        for tasks_num in range(2, max_tasks + 1):
+            for backend, executor in executors:
+                determinant, parallel_exec_time_ms = measure_parallel(matrix, tasks_num, warmup_runs, repetitions,
+                                                                      split_depth=STRONG_SCALING_SPLIT_DEPTH,
+                                                                      executor=executor)
+                achieved_speedup = serial_exec_time_ms / parallel_exec_time_ms
+                max_speedup = max_speedup_Amdahl(tasks_num)
+                result = Scaling_result(STRONG_SCALING_MATRIX_ORDER, serial_exec_time_ms, tasks_num,
+                                        parallel_exec_time_ms, achieved_speedup, max_speedup)
+                results[backend].append(result)
+
+                print("Parallel determinant calculation of matrix of order {} with {} {} tasks took {} ms."
+                      .format(STRONG_SCALING_MATRIX_ORDER, tasks_num, backend, parallel_exec_time_ms))
+                print("Achieved speedup is: {}X.\nMaximum speedup according to Amdahl’s law is: {}X.\n".format(achieved_speedup, max_speedup))
+
+    write_scaling_results("{}/strong_scaling_results_python.csv".format(RESULTS_BASE_PATH), results[PROCESS_BACKEND])
+    write_scaling_results("{}/strong_scaling_results_python_threads.csv".format(RESULTS_BASE_PATH),
+                          results[THREAD_BACKEND])
+    if trace:
+        finish_tracing("{}/strong_scaling_trace_python.json".format(RESULTS_BASE_PATH))
     print("Successfully finished strong scaling experiment.")
 
-def weak_scaling_experiment():
+def weak_scaling_experiment(trace=False, warmup_runs=DEFAULT_WARMUP_RUNS, repetitions=DEFAULT_REPETITIONS):
     """
     Loads matrices of different orders from predefined files and calculates
     their determinants using parallel implementation where the number of tasks is
-    equal to the order of matrix. Statistics about calculations are printed onto the console
-    and written into a predefined results file: weak_scaling_results_python.csv.
+    equal to the order of matrix. All parallel calculations use the same pool of
+    worker processes. Each calculation is repeated after warm-up runs and the median
+    execution time is reported (see benchmark.measure). Statistics about calculations
+    are printed onto the console and written into a predefined results file:
+    weak_scaling_results_python.csv.
+
+    Args:
+        trace (bool): if true, spans of all calculations are recorded and written into
+        weak_scaling_trace_python.json (see tracing module)
+        warmup_runs (int): number of unmeasured runs of each calculation
+        repetitions (int): number of measured runs of each calculation
 
     Return:
         None
@@ -136,28 +282,48 @@ def weak_scaling_experiment():
     print("\n\n========================")
     print("Weak scaling experiment:")
     print("========================\n\n")
-
+    if trace:
+        tracing.enable_tracing()
 
     results = []
-    for n in AVAILABLE_MATRIX_ORDERS:
-        matrix = load_test_matrix(n)
-        determinant, _, serial_exec_time_ms = det_serial(matrix)
-        print("Serial determinant calculation of matrix of order {} took {} ms."
-              .format(len(matrix), serial_exec_time_ms))
-
-        determinant, parallel_exec_time_ms = det_parallel(matrix, n)
-        achieved_speedup = serial_exec_time_ms / parallel_exec_time_ms
-        max_speedup = max_speedup_Gustafson(n)
-        result = Scaling_result(n, serial_exec_time_ms, n, parallel_exec_time_ms, achieved_speedup, max_speedup)
-        results.append(result)
-        print("Parallel determinant calculation of matrix of order {} with {} tasks took {} ms."
-              .format(n, n, parallel_exec_time_ms))
-        print("Achieved speedup is: {}X.\nMaximum speedup according to Gustafson’s law is: {}X.\n".format(achieved_speedup, max_speedup))
+    with Worker_pool(max(AVAILABLE_MATRIX_ORDERS)) as pool:
+        print("Started {} worker processes in {} ms.\n".format(pool.size, pool.warmup_time_ms))
+
+        for n in AVAILABLE_MATRIX_ORDERS:
+            matrix = load_test_matrix(n)
+            determinant, serial_exec_time_ms, _ = measure_serial(matrix, warmup_runs, repetitions)
+            print("Serial determinant calculation of matrix of order {} took {} ms."
+                  .format(len(matrix), serial_exec_time_ms))
+
+            determinant, parallel_exec_time_ms = measure_parallel(matrix, n, warmup_runs, repetitions, pool=pool)
+            achieved_speedup = serial_exec_time_ms / parallel_exec_time_ms
+            max_speedup = max_speedup_Gustafson(n)
+            result = Scaling_result(n, serial_exec_time_ms, n, parallel_exec_time_ms, achieved_speedup, max_speedup)
+            results.append(result)
+            print("Parallel determinant calculation of matrix of order {} with {} tasks took {} ms."
+                  .format(n, n, parallel_exec_time_ms))
+            print("Achieved speedup is: {}X.\nMaximum speedup according to Gustafson’s law is: {}X.\n".format(achieved_speedup, max_speedup))
 
     write_scaling_results("{}/weak_scaling_results_python.csv".format(RESULTS_BASE_PATH), results)
+    if trace:
+        finish_tracing("{}/weak_scaling_trace_python.json".format(RESULTS_BASE_PATH))
     print("Successfully finished weak scaling experiment.")
 
 
 if __name__ == "__main__":
-    strong_scaling_experiment()
-    weak_scaling_experiment()
+    parser = argparse.ArgumentParser(description="Runs strong and weak scaling experiments.")
+    parser.add_argument("--trace", action="store_true",
+                        help="record spans of calculations and write them as Chrome trace files into results")
+    parser.add_argument("--max-tasks", type=int, default=None,
+                        help="maximum number of tasks of the strong scaling experiment, at most {} (default: number "
+                             "of CPUs, at least {})".format(STRONG_SCALING_MINORS, STRONG_SCALING_MATRIX_ORDER))
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_RUNS,
+                        help="number of unmeasured runs of each calculation (default: {})".format(DEFAULT_WARMUP_RUNS))
+    parser.add_argument("--repetitions", type=int, default=DEFAULT_REPETITIONS,
+                        help="number of measured runs of each calculation, the median is reported (default: {})"
+                        .format(DEFAULT_REPETITIONS))
+    arguments = parser.parse_args()
+    if arguments.warmup < 0 or arguments.repetitions < 1:
+        parser.error("--warmup must be non-negative and --repetitions positive")
+    strong_scaling_experiment(arguments.trace, arguments.max_tasks, arguments.warmup, arguments.repetitions)
+    weak_scaling_experiment(arguments.trace, arguments.warmup, arguments.repetitions)
@@ -0,0 +1,107 @@
+import pickle
+import random
+import time
+
+from determinanat_calc.parallel_det_calc import det_parallel, Minor_calc_task, SHARED_MEMORY_TRANSPORT, COPY_TRANSPORT
+from determinanat_calc.serial_det_calc import LU_METHOD
+from determinanat_calc.shared_matrix import Shared_matrix
+from determinanat_calc.worker_pool import Worker_pool
+
+
+RESULTS_BASE_PATH = "../../results"
+MATRIX_ORDERS = [10, 25, 50, 100]
+POOL_SIZE = 4
+REPETITIONS = 3
+
+class Transport_result:
+    """
+    Holds the cost of making a matrix available to minor calculation tasks, for one matrix order
+    and one transport.
+
+    Attributes:
+        matrix_order (int): order of the matrix
+        transport (string): copy or shared_memory
+        payload_bytes (int): total size of pickled tasks sent to worker processes
+        serialization_time_ms (float): time spent pickling and unpickling the tasks
+        parallel_exec_time_ms (float): execution time of parallel determinant calculation (LU minors) using a worker pool
+    """
+
+    def __init__(self, matrix_order, transport, payload_bytes, serialization_time_ms, parallel_exec_time_ms):
+        self.matrix_order = matrix_order
+        self.transport = transport
+        self.payload_bytes = payload_bytes
+        self.serialization_time_ms = serialization_time_ms
+        self.parallel_exec_time_ms = parallel_exec_time_ms
+
+def random_matrix(n, seed=0):
+    rng = random.Random(seed)
+    return [[rng.uniform(-100, 100) for _ in range(n)] for _ in range(n)]
+
+def minor_tasks(task_matrix, n):
+    # same decomposition as in det_parallel: one task per minor of the first row
+    return [Minor_calc_task(task_matrix, [el for el in range(n) if el != col], None, col) for col in range(n)]
+
+def measure_serialization(tasks):
+    """
+    Pickles and unpickles each task, as it is done when the task is sent to a worker process through a queue.
+
+    Args:
+        tasks (list(Minor_calc_task)): minor calculation tasks
+
+    Return:
+        total size of pickled tasks in bytes, time spent in milliseconds ( (int, float) )
+    """
+    payload_bytes = 0
+    start_time = time.perf_counter()
+    for task in tasks:
+        payload = pickle.dumps(task)
+        pickle.loads(payload)
+        payload_bytes += len(payload)
+    end_time = time.perf_counter()
+    return payload_bytes, (end_time - start_time) * 1000
+
+def transport_experiment():
+    """
+    Compares copying the matrix into every task with placing it once into shared memory, for matrices
+    of different orders. For each order, the size and serialization time of the tasks sent to worker
+    processes is measured, as well as the total execution time of parallel calculation (with LU minors,
+    so that large orders are feasible). Statistics are printed onto the console and written into
+    transport_results_python.csv.
+
+    Return:
+        None
+    """
+    print("====================================")
+    print("Matrix transport benchmark:")
+    print("====================================\n")
+
+    results = []
+    with Worker_pool(POOL_SIZE) as pool:
+        for n in MATRIX_ORDERS:
+            matrix = random_matrix(n)
+
+            with Shared_matrix(matrix) as shared_matrix:
+                for transport, task_matrix in [(COPY_TRANSPORT, matrix), (SHARED_MEMORY_TRANSPORT, shared_matrix.handle)]:
+                    payload_bytes, serialization_time_ms = measure_serialization(minor_tasks(task_matrix, n))
+
+                    exec_times = []
+                    for _ in range(REPETITIONS):
+                        _, exec_time_ms = det_parallel(matrix, POOL_SIZE, LU_METHOD, pool=pool, transport=transport)
+                        exec_times.append(exec_time_ms)
+                    parallel_exec_time_ms = min(exec_times)
+
+                    results.append(Transport_result(n, transport, payload_bytes, serialization_time_ms,
+                                                    parallel_exec_time_ms))
+                    print("n = {}, transport = {}: payload {} bytes, serialization {:.3f} ms, parallel calculation {:.3f} ms"
+                          .format(n, transport, payload_bytes, serialization_time_ms, parallel_exec_time_ms))
+
+    with open("{}/transport_results_python.csv".format(RESULTS_BASE_PATH), 'w') as file:
+        file.write("matrix_order,transport,payload_bytes,serialization_time_ms,parallel_exec_time_ms\n")
+        for result in results:
+            file.write("{},{},{},{},{}\n".format(result.matrix_order, result.transport, result.payload_bytes,
+                                                 result.serialization_time_ms, result.parallel_exec_time_ms))
+    print("\nSuccessfully finished matrix transport benchmark.")
+
+
+if __name__ == "__main__":
+    transport_experiment()
@@ -0,0 +1,444 @@
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import statistics
+import time
+from fractions import Fraction
+
+from determinanat_calc.parallel_det_calc import det_parallel
+from determinanat_calc.serial_det_calc import det_serial, check_method, LU_METHOD
+from determinanat_calc.worker_pool import Worker_pool
+
+try:
+    from determinanat_calc.batch_det_calc import det_batch
+except ImportError:
+    det_batch = None
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# requests are JSON objects, one per line, and may contain large matrices
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+# small matrices are collected for at most this long and calculated together (see Request_coalescer)
+DEFAULT_COALESCE_WINDOW_MS = 2.0
+DEFAULT_MAX_BATCH_SIZE = 256
+# largest order of matrices which are coalesced into batches
+DEFAULT_BATCH_MAX_ORDER = 8
+# number of latest latencies kept for percentiles
+LATENCY_WINDOW = 10000
+
+SERIAL_ENGINE = "serial"
+PARALLEL_ENGINE = "parallel"
+BATCH_ENGINE = "batch"
+ENGINES = [SERIAL_ENGINE, PARALLEL_ENGINE, BATCH_ENGINE]
+
+class Service_stats:
+    """
+    Counters of the determinant service.
+
+    Attributes:
+        started (float): time when the service was started (seconds since epoch)
+        requests (int): number of answered requests
+        errors (int): number of requests which failed
+        batches (int): number of coalesced batches
+        batched_requests (int): number of requests calculated in coalesced batches
+        engine_requests (dict): number of requests per engine
+        latencies_ms (collections.deque): latest request latencies in milliseconds
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.engine_requests = {engine: 0 for engine in ENGINES}
+        self.latencies_ms = collections.deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, engine, latency_ms, failed):
+        self.requests += 1
+        if failed:
+            self.errors += 1
+        if engine in self.engine_requests:
+            self.engine_requests[engine] += 1
+        self.latencies_ms.append(latency_ms)
+
+    def to_dict(self):
+        uptime_s = time.time() - self.started
+        stats = {
+            "uptime_s": uptime_s,
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": self.requests / uptime_s if uptime_s > 0 else 0.0,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "mean_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+            "engine_requests": self.engine_requests,
+        }
+        stats.update(latency_percentiles(list(self.latencies_ms)))
+        return stats
+
+def latency_percentiles(latencies_ms):
+    """
+    Calculates median, 95th and 99th percentile and maximum of latencies.
+
+    Args:
+        latencies_ms (list(float)): latencies in milliseconds
+
+    Return:
+        percentiles named p50_ms, p95_ms, p99_ms and max_ms, zeros if there are no latencies (dict)
+    """
+    if not latencies_ms:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    if len(latencies_ms) == 1:
+        latency = latencies_ms[0]
+        return {"p50_ms": latency, "p95_ms": latency, "p99_ms": latency, "max_ms": latency}
+    percentiles = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    return {"p50_ms": statistics.median(latencies_ms), "p95_ms": percentiles[94], "p99_ms": percentiles[98],
+            "max_ms": max(latencies_ms)}
+
+def determinant_to_json(determinant):
+    if isinstance(determinant, Fraction):
+        return {"determinant": float(determinant), "exact": str(determinant)}
+    if isinstance(determinant, int):
+        return {"determinant": determinant}
+    return {"determinant": float(determinant)}
+
+def serial_service_calculation(matrix, method):
+    """
+    Calculates the determinant using serial implementation, in a worker process of the service.
+
+    Args:
+        matrix (list(list(float))): matrix for which the determinant is calculated
+        method (string): method used to calculate the determinant (one of serial_det_calc.METHODS)
+
+    Return:
+        value of the determinant (float)
+    """
+    return det_serial(matrix, method)[0]
+
+def validate_matrix(matrix):
+    if not isinstance(matrix, list) or not matrix:
+        raise Exception("Matrix must be a non-empty list of rows.")
+    n = len(matrix)
+    for row_idx, row in enumerate(matrix):
+        if not isinstance(row, list) or len(row) != n:
+            raise Exception("Sqared matrix is required. Found {} columns in row {}, expected {}."
+                            .format(len(row) if isinstance(row, list) else 0, row_idx + 1, n))
+        for col_idx, el in enumerate(row):
+            # bool is a subclass of int, but true and false are not matrix elements
+            if isinstance(el, bool) or not isinstance(el, (int, float)):
+                raise Exception("Matrix elements must be numbers. Found {} in row {}, column {}."
+                                .format(json.dumps(el), row_idx + 1, col_idx + 1))
+
+def isolated_det_batch(matrices):
+    """
+    Calculates determinants of a batch of matrices (see batch_det_calc.det_batch). If the batch fails,
+    each matrix is calculated on its own, so only the matrices which cause the failure get the error.
+
+    Args:
+        matrices (list(list(list(float)))): matrices for which the determinants are calculated
+
+    Return:
+        value of the determinant, or the error, of each matrix (list(float|Exception))
+    """
+    try:
+        return [float(determinant) for determinant in det_batch(matrices)]
+    except Exception:
+        results = []
+        for matrix in matrices:
+            try:
+                results.append(float(det_batch([matrix])[0]))
+            except Exception as error:
+                results.append(error)
+        return results
+
+class Request_coalescer:
+    """
+    Collects small matrices from concurrent requests and calculates their determinants together
+    using vectorized batch implementation (see batch_det_calc.det_batch). A batch is calculated when
+    it reaches the maximum size, or when the coalescing window since its first matrix expires, so a
+    single request waits at most one window. Batches are calculated in an executor, so the event loop
+    is not blocked.
+
+    Attributes:
+        window_ms (float): maximum time in milliseconds a matrix waits for other matrices
+        max_batch_size (int): maximum number of matrices in a batch
+    """
+
+    def __init__(self, executor, stats, window_ms=DEFAULT_COALESCE_WINDOW_MS, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._executor = executor
+        self._stats = stats
+        self._pending = []
+        self._timer = None
+
+    async def calculate(self, matrix):
+        """
+        Adds the matrix to the current batch and waits for its determinant.
+
+        Args:
+            matrix (list(list(float))): matrix for which the determinant is calculated
+
+        Return:
+            value of the determinant (float)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((matrix, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._stats.batches += 1
+        self._stats.batched_requests += len(batch)
+
+        loop = asyncio.get_running_loop()
+        calculation = loop.run_in_executor(self._executor, isolated_det_batch, [matrix for matrix, _ in batch])
+
+        def distribute(calculation):
+            error = calculation.exception()
+            for idx, (_, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                elif isinstance(calculation.result()[idx], Exception):
+                    future.set_exception(calculation.result()[idx])
+                else:
+                    future.set_result(calculation.result()[idx])
+
+        calculation.add_done_callback(distribute)
+
+class Determinant_service:
+    """
+    Long-running determinant service. Clients connect over TCP or a Unix socket and send JSON
+    requests, one per line:
+        {"id": 1, "matrix": [[1, 2], [3, 4]], "engine": "serial", "method": "lu"}
+    and receive JSON responses, one per line, in the order in which calculations finish:
+        {"id": 1, "determinant": -2.0, "engine": "batch", "latency_ms": 0.4}
+    or {"id": 1, "error": "..."} if the request fails. Request {"command": "stats"} returns the counters
+    of the service (see Service_stats). Several requests can be sent without waiting for responses.
+    Engine is chosen by the client or automatically: small matrices calculated by LU method are coalesced
+    into vectorized batches (see Request_coalescer), other matrices are calculated by serial implementation in a pool
+    of worker processes, which is started once and kept warm. The parallel engine calculates minors
+    of one matrix in a second pool, one matrix at a time. CPU work never runs on the event loop.
+
+    Attributes:
+        pool_size (int): number of worker processes of each pool, by default the number of CPUs
+        batch_max_order (int): largest order of matrices which are coalesced into batches
+        stats (Service_stats): counters of the service
+    """
+
+    def __init__(self, pool_size=None, window_ms=DEFAULT_COALESCE_WINDOW_MS, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 batch_max_order=DEFAULT_BATCH_MAX_ORDER, start_method=None):
+        self.pool_size = pool_size
+        self.batch_max_order = batch_max_order if det_batch is not None else 0
+        self.stats = Service_stats()
+        self._serial_pool = Worker_pool(pool_size, start_method)
+        self._parallel_pool = Worker_pool(pool_size, start_method)
+        # batches are calculated in a thread, parallel calculations in another one, since
+        # a Worker_pool must not be used by several calculations at the same time
+        self._batch_executor = concurrent.futures.ThreadPoolExecutor(1)
+        self._parallel_executor = concurrent.futures.ThreadPoolExecutor(1)
+        self._coalescer = Request_coalescer(self._batch_executor, self.stats, window_ms, max_batch_size)
+
+    def start_pools(self):
+        self._serial_pool.start()
+        self._parallel_pool.start()
+        return self._serial_pool.warmup_time_ms + self._parallel_pool.warmup_time_ms
+
+    def close(self):
+        self._batch_executor.shutdown()
+        self._parallel_executor.shutdown()
+        self._serial_pool.close()
+        self._parallel_pool.close()
+
+    def choose_engine(self, matrix, engine, method):
+        # batches are calculated by vectorized LU decomposition in floating point, so requests for
+        # other methods (e.g. exact Bareiss algorithm) are never coalesced
+        if engine is None:
+            return BATCH_ENGINE if method == LU_METHOD and len(matrix) <= self.batch_max_order else SERIAL_ENGINE
+        if engine not in ENGINES:
+            raise Exception("Unknown engine: {}. Available engines are: {}.".format(engine, ", ".join(ENGINES)))
+        if engine == BATCH_ENGINE and det_batch is None:
+            raise Exception("NumPy is required for batch engine.")
+        if engine == BATCH_ENGINE and method != LU_METHOD:
+            raise Exception("Batch engine supports only {} method, got {}.".format(LU_METHOD, method))
+        return engine
+
+    async def calculate(self, matrix, engine, method):
+        """
+        Calculates the determinant of a matrix using the given engine, without blocking the event loop.
+
+        Args:
+            matrix (list(list(float))): matrix for which the determinant is calculated
+            engine (string): one of ENGINES
+            method (string): method used by serial and parallel engines (one of serial_det_calc.METHODS)
+
+        Return:
+            value of the determinant (float)
+        """
+        if engine == BATCH_ENGINE:
+            return await self._coalescer.calculate(matrix)
+
+        loop = asyncio.get_running_loop()
+        if engine == PARALLEL_ENGINE:
+            return await loop.run_in_executor(
+                self._parallel_executor,
+                lambda: det_parallel(matrix, len(matrix), method, pool=self._parallel_pool)[0])
+
+        future = loop.create_future()
+
+        def set_result(result):
+            if not future.done():
+                future.set_result(result)
+
+        def set_error(error):
+            if not future.done():
+                future.set_exception(error)
+
+        self._serial_pool.apply_async(serial_service_calculation, (matrix, method),
+                                      callback=lambda result: loop.call_soon_threadsafe(set_result, result),
+                                      error_callback=lambda error: loop.call_soon_threadsafe(set_error, error))
+        return await future
+
+    async def handle_request(self, request):
+        """
+        Answers a single request (see Determinant_service).
+
+        Args:
+            request (dict): parsed JSON request
+
+        Return:
+            response (dict)
+        """
+        start_time = time.perf_counter()
+        response = {"id": request.get("id")}
+        if request.get("command") == "stats":
+            response["stats"] = self.stats.to_dict()
+            return response
+
+        engine = None
+        try:
+            matrix = request.get("matrix")
+            validate_matrix(matrix)
+            method = request.get("method", LU_METHOD)
+            check_method(method)
+            engine = self.choose_engine(matrix, request.get("engine"), method)
+            response["engine"] = engine
+            response.update(determinant_to_json(await self.calculate(matrix, engine, method)))
+        except Exception as error:
+            response["error"] = str(error)
+
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        response["latency_ms"] = latency_ms
+        self.stats.record(engine, latency_ms, "error" in response)
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """
+        Reads requests of one client until it disconnects. Each request is answered by a separate
+        task, so slow requests do not delay the others.
+
+        Args:
+            reader (asyncio.StreamReader): stream of requests
+            writer (asyncio.StreamWriter): stream of responses
+
+        Return:
+            None
+        """
+        pending = set()
+
+        async def answer(line):
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("expected a JSON object, got {}".format(type(request).__name__))
+                response = await self.handle_request(request)
+            except ValueError as error:
+                response = {"id": None, "error": "Invalid request: {}".format(error)}
+            writer.write((json.dumps(response) + "\n").encode("utf-8"))
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.create_task(answer(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """
+        Starts the worker pools and answers requests until cancelled.
+
+        Args:
+            host (string): address to listen on for TCP connections
+            port (int): TCP port
+            unix_path (string): path of the Unix socket, used instead of TCP if given
+
+        Return:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        warmup_time_ms = await loop.run_in_executor(None, self.start_pools)
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path, limit=MAX_REQUEST_BYTES)
+            address = unix_path
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_REQUEST_BYTES)
+            address = "{}:{}".format(host, port)
+        print("Started worker processes in {} ms.\nDeterminant service listening on {}.".format(warmup_time_ms, address))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Runs the determinant service.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on (default: {})".format(DEFAULT_HOST))
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port (default: {})".format(DEFAULT_PORT))
+    parser.add_argument("--unix", default=None, help="path of a Unix socket to listen on instead of TCP")
+    parser.add_argument("--pool-size", type=int, default=None,
+                        help="number of worker processes in each pool (default: number of CPUs)")
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_COALESCE_WINDOW_MS,
+                        help="time small requests wait to be coalesced into a batch")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="maximum number of coalesced requests in a batch")
+    parser.add_argument("--batch-max-order", type=int, default=DEFAULT_BATCH_MAX_ORDER,
+                        help="largest order of matrices which are coalesced into batches")
+    parser.add_argument("--start-method", choices=["fork", "spawn", "forkserver"], default=None,
+                        help="start method of worker processes (default: platform default)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_arguments()
+    service = Determinant_service(arguments.pool_size, arguments.window_ms, arguments.max_batch,
+                                  arguments.batch_max_order, arguments.start_method)
+    try:
+        asyncio.run(service.serve(arguments.host, arguments.port, arguments.unix))
+    except KeyboardInterrupt:
+        print("\nDeterminant service stopped.")
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import json
+import time
+
+from scaling.benchmark import random_matrix
+from service.det_server import DEFAULT_HOST, DEFAULT_PORT, MAX_REQUEST_BYTES, latency_percentiles
+
+DEFAULT_CONNECTIONS = 8
+DEFAULT_REQUESTS = 200
+DEFAULT_MATRIX_ORDER = 4
+# number of requests sent by a connection before waiting for their responses
+DEFAULT_IN_FLIGHT = 4
+# number of different random matrices sent by each connection
+DISTINCT_MATRICES = 16
+
+async def open_connection(host, port, unix_path):
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path, limit=MAX_REQUEST_BYTES)
+    return await asyncio.open_connection(host, port, limit=MAX_REQUEST_BYTES)
+
+async def send_request(reader, writer, request):
+    writer.write((json.dumps(request) + "\n").encode("utf-8"))
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+async def run_connection(connection_idx, arguments, latencies_ms, errors):
+    """
+    Sends requests with random matrices over one connection, keeping at most a given number of
+    requests without response, and records the latency of each request as seen by the client.
+
+    Args:
+        connection_idx (int): index of the connection, used as seed of random matrices
+        arguments (argparse.Namespace): parsed arguments of the load generator
+        latencies_ms (list(float)): list to which latencies in milliseconds are added
+        errors (list(string)): list to which error messages of failed requests are added
+
+    Return:
+        None
+    """
+    reader, writer = await open_connection(arguments.host, arguments.port, arguments.unix)
+    matrices = [random_matrix(arguments.order, connection_idx * DISTINCT_MATRICES + i) for i in range(DISTINCT_MATRICES)]
+    sent_times = {}
+
+    async def receive(count):
+        for _ in range(count):
+            response = json.loads(await reader.readline())
+            latencies_ms.append((time.perf_counter() - sent_times.pop(response["id"])) * 1000)
+            if "error" in response:
+                errors.append(response["error"])
+
+    in_flight = 0
+    for request_idx in range(arguments.requests):
+        request = {"id": request_idx, "matrix": matrices[request_idx % DISTINCT_MATRICES], "method": arguments.method}
+        if arguments.engine is not None:
+            request["engine"] = arguments.engine
+        sent_times[request_idx] = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode("utf-8"))
+        in_flight += 1
+        if in_flight == arguments.in_flight:
+            await writer.drain()
+            await receive(in_flight)
+            in_flight = 0
+    await writer.drain()
+    await receive(in_flight)
+    writer.close()
+
+async def generate_load(arguments):
+    """
+    Opens the given number of connections to the determinant service, sends requests over all of them
+    concurrently and prints throughput and latency percentiles, followed by the counters of the service.
+
+    Args:
+        arguments (argparse.Namespace): parsed arguments of the load generator
+
+    Return:
+        None
+    """
+    latencies_ms = []
+    errors = []
+    start_time = time.perf_counter()
+    await asyncio.gather(*[run_connection(idx, arguments, latencies_ms, errors)
+                           for idx in range(arguments.connections)])
+    elapsed_s = time.perf_counter() - start_time
+
+    percentiles = latency_percentiles(latencies_ms)
+    print("Sent {} requests over {} connections in {:.3f} s: {:.1f} requests/s, {} errors."
+          .format(len(latencies_ms), arguments.connections, elapsed_s, len(latencies_ms) / elapsed_s, len(errors)))
+    print("Latency: p50 {:.3f} ms, p95 {:.3f} ms, p99 {:.3f} ms, max {:.3f} ms."
+          .format(percentiles["p50_ms"], percentiles["p95_ms"], percentiles["p99_ms"], percentiles["max_ms"]))
+    if errors:
+        print("First error: {}".format(errors[0]))
+
+    reader, writer = await open_connection(arguments.host, arguments.port, arguments.unix)
+    stats = await send_request(reader, writer, {"id": "stats", "command": "stats"})
+    writer.close()
+    print("Service stats: {}".format(json.dumps(stats["stats"], indent=2)))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measures throughput and latency of the determinant service.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address of the service")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port of the service")
+    parser.add_argument("--unix", default=None, help="path of the Unix socket of the service, instead of TCP")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="number of concurrent connections")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="number of requests per connection")
+    parser.add_argument("--in-flight", type=int, default=DEFAULT_IN_FLIGHT,
+                        help="number of requests a connection sends before waiting for responses")
+    parser.add_argument("--order", type=int, default=DEFAULT_MATRIX_ORDER, help="order of random matrices")
+    parser.add_argument("--method", default="lu", help="method used by serial and parallel engines")
+    parser.add_argument("--engine", default=None, help="engine requested from the service (default: chosen by service)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(generate_load(parse_arguments()))